@@ -7,6 +7,7 @@ from rakuten_competitor_analysis import RakutenCompetitorAnalysis
 from rakuten_item_details import RakutenItemDetails
 from rakuten_js_item_details import RakutenJSItemDetails
 from rakuten_item_info import RakutenItemInfo
+from rakuten_review_index import get_review_index
 import base64
 from datetime import datetime
 import traceback
@@ -108,7 +109,10 @@ with st.sidebar:
     # 詳細設定
     st.subheader("詳細設定")
     headless = st.checkbox("ヘッドレスモード", value=True, help="ブラウザを表示せずに実行します")
+    scrape_profile = st.checkbox("軽量スクレイプモード", value=False, help="画像・フォント・広告計測タグを読み込まずにページを取得します")
     debug_mode = st.checkbox("デバッグモード", value=False, help="詳細なログを表示します")
+    batch_workers = st.number_input("並列ワーカー数", min_value=1, max_value=os.cpu_count() or 1, value=1, help="複数の商品をChromeを持つワーカープロセスに分けて同時に取得します")
+    incremental_reviews = st.checkbox("新着レビューのみ取得", value=False, help="前回までに取得したレビューに達した時点でページを辿るのをやめ、新しいレビューだけを取得します")
 
 # メイン画面
 st.markdown("<h1 class='main-header'>楽天商品情報取得ツール</h1>", unsafe_allow_html=True)
@@ -175,7 +179,8 @@ if page == "競合分析":
                     
                     try:
                         # 競合分析ツールの初期化
-                        analyzer = RakutenCompetitorAnalysis(st.session_state.api_key)
+                        analyzer = RakutenCompetitorAnalysis(st.session_state.api_key, scrape_profile=scrape_profile)
+                        analyzer.incremental_reviews = incremental_reviews
                         
                         # 進捗コールバック
                         def progress_callback(current, total, message):
@@ -191,7 +196,8 @@ if page == "競合分析":
                             max_items=max_items, 
                             sort_order=sort_order,
                             progress_callback=progress_callback,
-                            headless=headless
+                            headless=headless,
+                            workers=batch_workers
                         )
                         
                         # 結果の表示
@@ -239,8 +245,9 @@ if page == "競合分析":
                                     st.write(f"最高評価: {rating_stats['max']:.2f}点")
                                     st.write(f"最低評価: {rating_stats['min']:.2f}点")
 
-                            # レビュー情報の表示とCSVダウンロード
-                            if any(col.startswith('review_1_') for col in results.columns):
+                            # レビュー情報の表示とCSVダウンロード（レビューは1行1レビューの縦持ちの表）
+                            review_table = analyzer.review_table
+                            if review_table is not None and not review_table.empty:
                                 st.subheader("レビュー情報")
                                 
                                 # レビュー情報をCSVに保存
@@ -251,63 +258,51 @@ if page == "競合分析":
                                 
                                 with review_tabs[0]:
                                     # レビューサンプル（最初の3商品の最初の3レビュー）
-                                    for i, row in results.iterrows():
-                                        if i < 3:  # 最初の3商品のみ表示
-                                            st.markdown(f"**{row['itemName']}**")
-                                            for j in range(1, 4):  # 最初の3レビュー
-                                                review_comment_col = f'review_{j}_comment'
-                                                if review_comment_col in row and pd.notna(row[review_comment_col]) and row[review_comment_col]:
-                                                    rating_col = f'review_{j}_rating'
-                                                    title_col = f'review_{j}_title'
-                                                    date_col = f'review_{j}_date'
-                                                    
-                                                    rating = row[rating_col] if rating_col in row and pd.notna(row[rating_col]) else "不明"
-                                                    title = row[title_col] if title_col in row and pd.notna(row[title_col]) else "タイトルなし"
-                                                    date = row[date_col] if date_col in row and pd.notna(row[date_col]) else ""
-                                                    
-                                                    st.markdown(f"⭐ {rating} - **{title}**")
-                                                    st.markdown(f"_{row[review_comment_col]}_")
-                                                    if date:
-                                                        st.markdown(f"({date})")
-                                                    st.markdown("---")
+                                    sample = review_table[review_table['review_no'] <= 3]
+                                    for item_code in results['itemCode'].head(3):
+                                        item_reviews = sample[sample['itemCode'] == item_code]
+                                        if item_reviews.empty:
+                                            continue
+                                        st.markdown(f"**{item_reviews['itemName'].iloc[0]}**")
+                                        for review in item_reviews.itertuples():
+                                            rating = review.rating if pd.notna(review.rating) else "不明"
+                                            title = review.title if pd.notna(review.title) and review.title else "タイトルなし"
+                                            date = review.date if pd.notna(review.date) else ""
+                                            
+                                            st.markdown(f"⭐ {rating} - **{title}**")
+                                            st.markdown(f"_{review.comment}_")
+                                            if date:
+                                                st.markdown(f"({date})")
+                                            st.markdown("---")
                                 
                                 with review_tabs[1]:
                                     # レビュー統計
                                     st.markdown("### レビュー評価の分布")
                                     
                                     # レビュー評価の分布を計算
-                                    rating_columns = [col for col in results.columns if col.startswith('review_') and col.endswith('_rating')]
-                                    if rating_columns:
-                                        all_ratings = []
-                                        for col in rating_columns:
-                                            ratings = results[col].dropna().tolist()
-                                            all_ratings.extend(ratings)
+                                    all_ratings = pd.to_numeric(review_table['rating'], errors='coerce').dropna().tolist()
+                                    if all_ratings:
+                                        # ヒストグラムを表示
+                                        import matplotlib.pyplot as plt
+                                        import numpy as np
                                         
-                                        if all_ratings:
-                                            # ヒストグラムを表示
-                                            import matplotlib.pyplot as plt
-                                            import numpy as np
-                                            
-                                            fig, ax = plt.subplots(figsize=(10, 6))
-                                            bins = np.arange(0.5, 6.0, 0.5)  # 0.5刻みでビンを作成
-                                            ax.hist(all_ratings, bins=bins, alpha=0.7, color='#bf0000')
-                                            ax.set_xlabel('レビュー評価')
-                                            ax.set_ylabel('レビュー数')
-                                            ax.set_title(f'{keyword} のレビュー評価分布')
-                                            ax.grid(True, linestyle='--', alpha=0.7)
-                                            st.pyplot(fig)
-                                            
-                                            # 基本統計量
-                                            import numpy as np
-                                            st.markdown("### レビュー評価の統計")
-                                            st.write(f"平均評価: {np.mean(all_ratings):.2f}点")
-                                            st.write(f"最高評価: {np.max(all_ratings):.2f}点")
-                                            st.write(f"最低評価: {np.min(all_ratings):.2f}点")
-                                            st.write(f"中央値: {np.median(all_ratings):.2f}点")
-                                            st.write(f"標準偏差: {np.std(all_ratings):.2f}")
-                                            st.write(f"レビュー総数: {len(all_ratings)}件")
-                                        else:
-                                            st.write("レビュー評価データがありません。")
+                                        fig, ax = plt.subplots(figsize=(10, 6))
+                                        bins = np.arange(0.5, 6.0, 0.5)  # 0.5刻みでビンを作成
+                                        ax.hist(all_ratings, bins=bins, alpha=0.7, color='#bf0000')
+                                        ax.set_xlabel('レビュー評価')
+                                        ax.set_ylabel('レビュー数')
+                                        ax.set_title(f'{keyword} のレビュー評価分布')
+                                        ax.grid(True, linestyle='--', alpha=0.7)
+                                        st.pyplot(fig)
+                                        
+                                        # 基本統計量
+                                        st.markdown("### レビュー評価の統計")
+                                        st.write(f"平均評価: {np.mean(all_ratings):.2f}点")
+                                        st.write(f"最高評価: {np.max(all_ratings):.2f}点")
+                                        st.write(f"最低評価: {np.min(all_ratings):.2f}点")
+                                        st.write(f"中央値: {np.median(all_ratings):.2f}点")
+                                        st.write(f"標準偏差: {np.std(all_ratings):.2f}")
+                                        st.write(f"レビュー総数: {len(all_ratings)}件")
                                     else:
                                         st.write("レビュー評価データがありません。")
                                 
@@ -315,34 +310,15 @@ if page == "競合分析":
                                     # 全レビューをテーブルとして表示
                                     st.markdown("### 全レビュー一覧")
                                     
-                                    # レビューデータを収集
-                                    review_data = []
-                                    for i, row in results.iterrows():
-                                        item_name = row.get('itemName', '不明')
-                                        shop_name = row.get('shopName', '不明')
-                                        
-                                        for j in range(1, 6):  # 最大5件のレビュー
-                                            rating_col = f'review_{j}_rating'
-                                            title_col = f'review_{j}_title'
-                                            comment_col = f'review_{j}_comment'
-                                            date_col = f'review_{j}_date'
-                                            
-                                            if all(col in row for col in [rating_col, title_col, comment_col, date_col]):
-                                                if pd.notna(row[comment_col]) and row[comment_col]:
-                                                    review_data.append({
-                                                        '商品名': item_name,
-                                                        'ショップ名': shop_name,
-                                                        '評価': row.get(rating_col),
-                                                        'タイトル': row.get(title_col),
-                                                        'コメント': row.get(comment_col),
-                                                        '日付': row.get(date_col)
-                                                    })
-                                    
-                                    if review_data:
-                                        reviews_df = pd.DataFrame(review_data)
-                                        st.dataframe(reviews_df, use_container_width=True)
-                                    else:
-                                        st.write("レビューデータがありません。")
+                                    reviews_df = review_table[['itemName', 'shopName', 'rating', 'title', 'comment', 'date']].rename(columns={
+                                        'itemName': '商品名',
+                                        'shopName': 'ショップ名',
+                                        'rating': '評価',
+                                        'title': 'タイトル',
+                                        'comment': 'コメント',
+                                        'date': '日付'
+                                    })
+                                    st.dataframe(reviews_df, use_container_width=True)
                                     
                                     # レビューCSVのダウンロードボタン
                                     if reviews_file and os.path.exists(reviews_file):
@@ -415,10 +391,11 @@ if page == "競合分析":
                         try:
                             # 商品情報取得ツールの初期化
                             #js_item_details = RakutenJSItemDetails(st.session_state.api_key)
-                            item_info = RakutenItemInfo(st.session_state.api_key)
+                            item_info = RakutenItemInfo(st.session_state.api_key, scrape_profile=scrape_profile)
+                            item_info.incremental_reviews = incremental_reviews
                             # URLから商品情報を取得
-                            #results = js_item_details.process_urls(urls, update_progress)
-                            results = item_info.process_urls(urls, update_progress)
+                            #results = js_item_details.process_urls(urls, update_progress, workers=batch_workers)
+                            results = item_info.process_urls(urls, update_progress, workers=batch_workers, wide_reviews=True)
                             # リソースの解放
                             #js_item_details.close()
                             item_info.close()
@@ -492,7 +469,7 @@ if page == "競合分析":
                     
                     try:
                         # 商品情報取得ツールの初期化
-                        item_details = RakutenItemDetails(st.session_state.api_key)
+                        item_details = RakutenItemDetails(st.session_state.api_key, scrape_profile=scrape_profile)
                         
                         # 進捗コールバック
                         def progress_callback(current, total, message):
@@ -506,7 +483,8 @@ if page == "競合分析":
                         results = item_details.get_items_details(
                             item_codes,
                             progress_callback=progress_callback,
-                            headless=headless
+                            headless=headless,
+                            workers=batch_workers
                         )
                         
                         # 結果の表示
@@ -598,6 +576,35 @@ elif page == "CSVファイル一覧":
     if not os.path.exists(output_dir):
         os.makedirs(output_dir, exist_ok=True)
     
+    # 保存済みレビューの全文検索（新しいレビューCSVは検索時に索引へ追加する）
+    st.subheader("レビュー検索")
+    review_query = st.text_input("レビューのタイトル・本文を検索", placeholder="例: 香り 泡立ち（空白区切りですべて含むレビュー）")
+    if review_query:
+        review_index = get_review_index()
+        with st.spinner("レビューの索引を更新中..."):
+            review_index.update(output_dir)
+        
+        start = time.perf_counter()
+        found = review_index.search(review_query, limit=100)
+        elapsed = (time.perf_counter() - start) * 1000
+        st.caption(f"{len(found)}件のレビューが見つかりました（{elapsed:.0f}ミリ秒、最大100件）")
+        
+        if found:
+            st.dataframe(pd.DataFrame(found).rename(columns={
+                'keyword': 'キーワード',
+                'item_name': '商品名',
+                'shop_name': 'ショップ名',
+                'rating': '評価',
+                'title': 'タイトル',
+                'comment': 'コメント',
+                'date': '日付',
+                'file': 'ファイル'
+            }), use_container_width=True)
+        else:
+            st.write("該当するレビューはありません。")
+    
+    st.markdown("---")
+    
     csv_files = [f for f in os.listdir(output_dir) if f.endswith('.csv')]
     
     if not csv_files:
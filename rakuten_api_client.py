@@ -0,0 +1,164 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rakuten_rate_limiter import get_rate_limiter
+from rakuten_response_cache import get_response_cache
+
+# 楽天APIへの接続設定
+DEFAULT_TIMEOUT = (3.05, 15)  # (接続タイムアウト, 読み込みタイムアウト) 秒
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 1.0  # 429応答時の最初の待機秒数（再試行ごとに2倍）
+MAX_BACKOFF = 60.0
+
+
+class RakutenApiClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, max_retries=DEFAULT_MAX_RETRIES, rate_limiter=None,
+                 response_cache=None):
+        """
+        楽天API共通クライアントの初期化
+
+        Keep-Aliveの接続プールを持つセッションを使い回すことで、
+        API呼び出しごとのTCP/TLSハンドシェイクを省略する
+
+        Args:
+            timeout (float or tuple): デフォルトのタイムアウト（秒）
+            pool_connections (int): ホストごとに保持する接続プール数
+            pool_maxsize (int): 1つの接続プールで保持する最大接続数
+            max_retries (int): 接続エラー・429・5xx応答時の再試行回数（429はレート制限を通して再試行する）
+            rate_limiter (RateLimiter): リクエスト前に予算を確認するレート制限（省略時は共有インスタンス）
+            response_cache (ResponseCache): get_jsonで使う応答キャッシュ（省略時は共有インスタンス）
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.response_cache = response_cache
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+        # 429はセッション内で再試行するとレート制限を通らないため、getで待機してから再試行する
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, response, attempt):
+        """
+        429応答のあとに待機する秒数（Retry-Afterヘッダーがあればその値）
+
+        Args:
+            response (requests.Response): 429応答
+            attempt (int): 何回目の再試行か（0から）
+
+        Returns:
+            float: 待機する秒数
+        """
+        retry_after = response.headers.get("Retry-After")
+        try:
+            wait = float(retry_after)
+        except (TypeError, ValueError):
+            wait = DEFAULT_BACKOFF * (2 ** attempt)
+        return min(MAX_BACKOFF, max(0.0, wait))
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """
+        共有セッションでGETリクエストを送信
+
+        429応答の場合は待機したうえで、再度レート制限からトークンを取得して再試行する
+
+        Args:
+            url (str): リクエスト先URL
+            params (dict): クエリパラメータ
+            timeout (float or tuple): この呼び出しのタイムアウト（省略時はデフォルト値）
+
+        Returns:
+            requests.Response: レスポンス
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            response = self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+
+            wait = self._backoff(response, attempt)
+            print(f"リクエストが制限されたため{wait:.1f}秒待機して再試行します: {url}")
+            response.close()
+            time.sleep(wait)
+            attempt += 1
+
+    def get_json(self, url, params=None, timeout=None, use_cache=True):
+        """
+        GETリクエストを送信し、JSONとして解析した結果を返す
+
+        use_cacheがTrueの場合は応答キャッシュを先に確認し、
+        正常な応答のみをキャッシュに保存する
+
+        Args:
+            url (str): リクエスト先URL
+            params (dict): クエリパラメータ
+            timeout (float or tuple): この呼び出しのタイムアウト
+            use_cache (bool): 応答キャッシュを使用するかどうか
+
+        Returns:
+            dict: API応答
+        """
+        cache = None
+        if use_cache:
+            if self.response_cache is None:
+                self.response_cache = get_response_cache()
+            cache = self.response_cache
+            cached = cache.get(url, params)
+            if cached is not None:
+                return cached
+
+        response = self.get(url, params=params, timeout=timeout)
+        result = response.json()
+
+        if cache is not None and response.ok and isinstance(result, dict) and 'error' not in result:
+            cache.set(url, params, result)
+
+        return result
+
+    def close(self):
+        """
+        接続プールを解放
+        """
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """
+    プロセス内で共有するAPIクライアントを取得
+
+    Returns:
+        RakutenApiClient: 共有APIクライアント
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = RakutenApiClient()
+    return _shared_client
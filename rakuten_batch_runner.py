@@ -0,0 +1,258 @@
+import os
+import queue
+import traceback
+import multiprocessing
+from collections import Counter, deque
+
+# 並列実行の設定（環境変数で上書き可能）
+DEFAULT_BATCH_WORKERS = 1
+DEFAULT_MAX_ATTEMPTS = 2
+RESULT_POLL_INTERVAL = 1.0  # 秒（ワーカーの異常終了を確認する間隔）
+WORKER_JOIN_TIMEOUT = 30  # 秒
+
+
+def get_batch_workers(workers=None):
+    """
+    並列実行するワーカー数を決定
+
+    Args:
+        workers (int): 指定されたワーカー数（省略時は環境変数 RAKUTEN_BATCH_WORKERS、既定は1）
+
+    Returns:
+        int: ワーカー数（1の場合は並列実行しない）
+    """
+    if workers is None:
+        workers = int(os.environ.get('RAKUTEN_BATCH_WORKERS', DEFAULT_BATCH_WORKERS))
+    return max(1, min(int(workers), os.cpu_count() or 1))
+
+
+def has_error(result):
+    """
+    処理結果がエラーを示しているか（別のワーカーで再試行する対象か）
+    """
+    return isinstance(result, dict) and 'error' in result
+
+
+def _worker_main(worker_id, scraper_spec, method, inbox, outbox):
+    """
+    ワーカープロセスの本体
+
+    スクレイパーを1つ作成してドライバーを保持し、受け取った商品を順に処理して結果を返す
+    """
+    # ワーカー自体が並列実行の単位なので、HTML解析用のプロセスはさらに起動しない
+    os.environ['RAKUTEN_PARSER_WORKERS'] = '0'
+
+    scraper_class, args, kwargs, attributes = scraper_spec
+    try:
+        scraper = scraper_class(*args, **kwargs)
+        for name, value in attributes.items():
+            setattr(scraper, name, value)
+    except Exception as e:
+        traceback.print_exc()
+        outbox.put(("closed", worker_id, None, {"error": f"スクレイパーの初期化に失敗しました: {e}"}))
+        return
+
+    try:
+        while True:
+            task = inbox.get()
+            if task is None:
+                break
+
+            index, item = task
+            try:
+                outbox.put(("done", worker_id, index, getattr(scraper, method)(item)))
+            except Exception as e:
+                traceback.print_exc()
+                outbox.put(("failed", worker_id, index, str(e)))
+    finally:
+        try:
+            scraper.close()
+        except Exception as e:
+            print(f"ワーカー{worker_id}の終了処理中にエラー: {e}")
+        outbox.put(("closed", worker_id, None, {"counts": dict(scraper.fetcher.counts)}))
+
+
+class BatchRunner:
+    def __init__(self, scraper_class, args=(), kwargs=None, attributes=None, workers=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        商品ごとの処理を複数のワーカープロセスに分散して実行するランナー
+
+        各ワーカーはスクレイパー（とドライバー）を1つずつ保持し、キューから受け取った商品を処理する。
+        結果は元の順序に並べ直して返し、失敗した商品は別のワーカーで再試行する
+
+        Args:
+            scraper_class (type): ワーカーで作成するスクレイパーのクラス
+            args (tuple): スクレイパーのコンストラクタ引数
+            kwargs (dict): スクレイパーのコンストラクタのキーワード引数
+            attributes (dict): 作成後に設定する属性（headlessなど）
+            workers (int): ワーカー数（省略時は環境変数 RAKUTEN_BATCH_WORKERS）
+            max_attempts (int): 1件あたりの最大試行回数
+        """
+        self.scraper_spec = (scraper_class, tuple(args), dict(kwargs or {}), dict(attributes or {}))
+        self.workers = get_batch_workers(workers)
+        self.max_attempts = max(1, max_attempts)
+        self.counts = Counter()
+
+    def _start_worker(self, context, worker_id, method, outbox):
+        """
+        ワーカープロセスを1つ起動
+
+        Returns:
+            tuple: (プロセス, 受信キュー)
+        """
+        inbox = context.Queue()
+        process = context.Process(
+            target=_worker_main,
+            args=(worker_id, self.scraper_spec, method, inbox, outbox),
+            daemon=True
+        )
+        process.start()
+        return process, inbox
+
+    def _stop_workers(self, workers, outbox):
+        """
+        ワーカープロセスを終了し、項目ごとの取得方法の件数を受け取る
+        """
+        for process, inbox in workers.values():
+            if process.is_alive():
+                inbox.put(None)
+
+        remaining = {worker_id for worker_id, (process, _) in workers.items() if process.is_alive()}
+        while remaining:
+            try:
+                kind, worker_id, _, value = outbox.get(timeout=WORKER_JOIN_TIMEOUT)
+            except queue.Empty:
+                break
+            if kind == "closed":
+                remaining.discard(worker_id)
+                self.counts.update((value or {}).get("counts", {}))
+
+        for process, _ in workers.values():
+            process.join(timeout=WORKER_JOIN_TIMEOUT)
+            if process.is_alive():
+                print(f"ワーカープロセス{process.pid}が終了しないため強制終了します")
+                process.terminate()
+
+    def run(self, method, items, progress_callback=None, describe=None, on_failure=None, retry_if=has_error):
+        """
+        スクレイパーのメソッドを各商品に対して並列に実行
+
+        Args:
+            method (str): 商品1件を処理するスクレイパーのメソッド名（引数は商品1件）
+            items (list): 処理する商品のリスト（プロセス間で受け渡せる値）
+            progress_callback (callable): 進捗を報告するコールバック関数（完了件数, 全件数, メッセージ）
+            describe (callable): 進捗メッセージに表示する商品の説明を返す関数
+            on_failure (callable): すべての試行に失敗した商品の結果を作る関数（商品, エラーメッセージ）
+            retry_if (callable): 正常に返った結果でも再試行する条件
+
+        Returns:
+            list: 元の順序に並べた処理結果
+        """
+        items = list(items)
+        total = len(items)
+        results = [None] * total
+        if total == 0:
+            return results
+
+        describe = describe or str
+        context = multiprocessing.get_context('spawn')
+        outbox = context.Queue()
+        count = min(self.workers, total)
+        workers = {worker_id: self._start_worker(context, worker_id, method, outbox) for worker_id in range(count)}
+        print(f"{count}個のワーカープロセスで並列処理します")
+        # 異常終了したワーカーの代わりに起動できる数
+        restarts = count * self.max_attempts
+        next_worker_id = count
+
+        # (商品の番号, 試行回数, 前回失敗したワーカー)
+        pending = deque((index, 0, None) for index in range(total))
+        in_flight = {}
+        idle = set(workers)
+        finished = 0
+
+        def finish(index, result, worker_id):
+            nonlocal finished
+            results[index] = result
+            finished += 1
+            message = f"{describe(items[index])} の処理が完了しました（ワーカー{worker_id}）"
+            if progress_callback:
+                progress_callback(finished, total, message)
+            else:
+                print(f"[{finished}/{total}] {message}")
+
+        def fail(index, attempts, worker_id, result, error):
+            attempts += 1
+            if attempts < self.max_attempts and workers:
+                print(f"{describe(items[index])} の処理に失敗したため別のワーカーで再試行します: {error}")
+                pending.appendleft((index, attempts, worker_id))
+                return
+            print(f"{describe(items[index])} の処理に{attempts}回失敗しました: {error}")
+            if result is None and on_failure is not None:
+                result = on_failure(items[index], error)
+            finish(index, result, worker_id)
+
+        def dispatch():
+            for worker_id in sorted(idle):
+                # 前回失敗したワーカーは避ける（ほかに生きているワーカーがない場合を除く）
+                for position, (index, attempts, failed_on) in enumerate(pending):
+                    if failed_on != worker_id or len(workers) == 1:
+                        del pending[position]
+                        workers[worker_id][1].put((index, items[index]))
+                        in_flight[worker_id] = (index, attempts)
+                        idle.discard(worker_id)
+                        break
+
+        def drop(worker_id, reason):
+            # 処理中だった商品は別のワーカーに回す
+            del workers[worker_id]
+            idle.discard(worker_id)
+            if worker_id in in_flight:
+                index, attempts = in_flight.pop(worker_id)
+                fail(index, attempts, worker_id, None, reason)
+            if not workers:
+                print("すべてのワーカーが終了したため、残りの商品を処理できませんでした")
+                while pending:
+                    index, _, failed_on = pending.popleft()
+                    fail(index, self.max_attempts, failed_on, None, "処理できるワーカーがありません")
+
+        try:
+            while finished < total:
+                for worker_id, (process, _) in list(workers.items()):
+                    if not process.is_alive():
+                        print(f"ワーカー{worker_id}が終了しました（終了コード: {process.exitcode}）")
+                        if restarts > 0 and finished < total:
+                            # ドライバーのクラッシュなどに備えて代わりのワーカーを起動する
+                            restarts -= 1
+                            workers[next_worker_id] = self._start_worker(context, next_worker_id, method, outbox)
+                            idle.add(next_worker_id)
+                            next_worker_id += 1
+                        drop(worker_id, "ワーカーが異常終了しました")
+
+                dispatch()
+                try:
+                    kind, worker_id, index, value = outbox.get(timeout=RESULT_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+                if kind == "closed":
+                    # 初期化に失敗したワーカー
+                    print(f"ワーカー{worker_id}を利用できません: {(value or {}).get('error')}")
+                    if worker_id in workers:
+                        drop(worker_id, "ワーカーを初期化できませんでした")
+                    continue
+
+                if worker_id not in in_flight:
+                    # すでに異常終了として処理したワーカーからの結果
+                    continue
+                _, attempts = in_flight.pop(worker_id)
+                idle.add(worker_id)
+                if kind == "failed":
+                    fail(index, attempts, worker_id, None, value)
+                elif retry_if is not None and retry_if(value):
+                    fail(index, attempts, worker_id, value, value.get('error') if isinstance(value, dict) else value)
+                else:
+                    finish(index, value, worker_id)
+        finally:
+            self._stop_workers(workers, outbox)
+
+        return results
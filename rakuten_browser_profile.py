@@ -0,0 +1,223 @@
+import os
+import time
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windowsなどfcntlが使えない環境ではプロセス内のみで排他する
+    fcntl = None
+
+# 永続プロファイルの設定（環境変数で上書き可能）
+DEFAULT_PROFILE_ROOT = os.path.join(".cache", "chrome-profiles")
+DEFAULT_PROFILE_CACHE_MB = 200
+DEFAULT_MAX_PROFILES = 16
+DEFAULT_PROFILE_MAX_AGE_DAYS = 7
+
+# プロファイル全体がディスクキャッシュ上限の何倍を超えたら作り直すか
+PROFILE_SIZE_FACTOR = 2
+
+# Chromeが起動中に作るロックファイル（クラッシュすると残る）
+SINGLETON_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+_held_slots = set()
+_held_slots_lock = threading.Lock()
+_cleaned_roots = set()
+
+
+def is_persistent_profile_enabled():
+    """
+    永続プロファイルを使うかどうか（環境変数 RAKUTEN_PERSISTENT_PROFILE、既定は無効）
+    """
+    return os.environ.get('RAKUTEN_PERSISTENT_PROFILE', '0') != '0'
+
+
+def get_profile_root():
+    """
+    永続プロファイルを保存するディレクトリ（環境変数 RAKUTEN_PROFILE_DIR で変更可能）
+    """
+    return os.environ.get('RAKUTEN_PROFILE_DIR', DEFAULT_PROFILE_ROOT)
+
+
+def directory_size(path):
+    """
+    ディレクトリ内のファイルの合計サイズ（バイト）
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class BrowserProfile:
+    def __init__(self, root=None, cache_mb=None, max_profiles=DEFAULT_MAX_PROFILES):
+        """
+        ドライバーごとに使う永続的なChromeプロファイル（ディスクキャッシュを実行をまたいで再利用する）
+
+        同じプロファイルを複数のChromeで同時に使うとロックが競合するため、
+        プロファイルごとにロックファイルを取り、空いているものを1つ割り当てる
+
+        Args:
+            root (str): プロファイルを保存するディレクトリ（省略時は環境変数 RAKUTEN_PROFILE_DIR）
+            cache_mb (int): ディスクキャッシュの上限（MB、省略時は環境変数 RAKUTEN_PROFILE_CACHE_MB）
+            max_profiles (int): 作成するプロファイルの最大数
+        """
+        if cache_mb is None:
+            cache_mb = int(os.environ.get('RAKUTEN_PROFILE_CACHE_MB', DEFAULT_PROFILE_CACHE_MB))
+        self.root = root or get_profile_root()
+        self.cache_mb = cache_mb
+        self.max_profiles = max_profiles
+        self.slot = None
+        self.path = None
+        self.lock_file = None
+
+    def _try_lock(self, slot):
+        """
+        プロファイルのロックを取得
+
+        Returns:
+            bool: 取得できた場合はTrue
+        """
+        key = (os.path.abspath(self.root), slot)
+        with _held_slots_lock:
+            if key in _held_slots:
+                return False
+
+            if fcntl is not None:
+                lock_file = open(os.path.join(self.root, f"profile-{slot}.lock"), "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    return False
+                self.lock_file = lock_file
+
+            _held_slots.add(key)
+            return True
+
+    def acquire(self):
+        """
+        空いているプロファイルを割り当てる
+
+        Returns:
+            str: プロファイルのディレクトリ（すべて使用中の場合はNone）
+        """
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError as e:
+            print(f"プロファイル用ディレクトリを作成できませんでした: {e}")
+            return None
+
+        # プロセスで最初に使うときに、古いプロファイルを片付ける
+        if os.path.abspath(self.root) not in _cleaned_roots:
+            _cleaned_roots.add(os.path.abspath(self.root))
+            cleanup_profiles(self.root)
+
+        for slot in range(self.max_profiles):
+            if self._try_lock(slot):
+                self.slot = slot
+                self.path = os.path.abspath(os.path.join(self.root, f"profile-{slot}"))
+                self._prepare()
+                return self.path
+
+        print("空いているChromeプロファイルがないため、一時プロファイルで起動します")
+        return None
+
+    def _prepare(self):
+        """
+        前回の実行で残ったロックファイルを消し、大きくなりすぎたプロファイルを作り直す
+        """
+        os.makedirs(self.path, exist_ok=True)
+        for name in SINGLETON_FILES:
+            try:
+                os.unlink(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+        limit = self.cache_mb * PROFILE_SIZE_FACTOR * 1024 * 1024
+        size = directory_size(self.path)
+        if self.cache_mb and size > limit:
+            print(f"Chromeプロファイルが{size / (1024 * 1024):.0f}MBになったため作り直します: {self.path}")
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+        # 最終使用日時として更新（cleanup_profilesで参照）
+        os.utime(self.path, None)
+
+    def apply(self, chrome_options):
+        """
+        Chromeオプションにプロファイルとディスクキャッシュの設定を追加
+
+        Args:
+            chrome_options (Options): Chromeオプション
+        """
+        chrome_options.add_argument(f"--user-data-dir={self.path}")
+        if self.cache_mb:
+            chrome_options.add_argument(f"--disk-cache-size={self.cache_mb * 1024 * 1024}")
+
+    def release(self):
+        """
+        プロファイルのロックを解放
+        """
+        if self.slot is None:
+            return
+        with _held_slots_lock:
+            _held_slots.discard((os.path.abspath(self.root), self.slot))
+            if self.lock_file is not None:
+                try:
+                    fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+                finally:
+                    self.lock_file.close()
+                self.lock_file = None
+        self.slot = None
+        self.path = None
+
+
+def cleanup_profiles(root=None, max_age_days=None):
+    """
+    一定期間使われていないプロファイルを削除（使用中のものは削除しない）
+
+    Args:
+        root (str): プロファイルを保存するディレクトリ（省略時は環境変数 RAKUTEN_PROFILE_DIR）
+        max_age_days (float): 最後に使われてからこの日数を過ぎたプロファイルを削除（省略時は環境変数 RAKUTEN_PROFILE_MAX_AGE_DAYS）
+
+    Returns:
+        int: 削除したプロファイル数
+    """
+    if max_age_days is None:
+        max_age_days = float(os.environ.get('RAKUTEN_PROFILE_MAX_AGE_DAYS', DEFAULT_PROFILE_MAX_AGE_DAYS))
+    root = root or get_profile_root()
+    if not os.path.isdir(root):
+        return 0
+
+    removed = 0
+    deadline = time.time() - max_age_days * 24 * 60 * 60
+    for name in os.listdir(root):
+        if not name.startswith("profile-") or name.endswith(".lock"):
+            continue
+        try:
+            slot = int(name[len("profile-"):])
+        except ValueError:
+            continue
+        path = os.path.join(root, name)
+        if os.path.getmtime(path) > deadline:
+            continue
+
+        profile = BrowserProfile(root=root, max_profiles=slot + 1)
+        if not profile._try_lock(slot):
+            continue
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        finally:
+            profile.slot = slot
+            profile.release()
+
+    if removed:
+        print(f"使われていないChromeプロファイルを{removed}件削除しました")
+    return removed
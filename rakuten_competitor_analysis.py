@@ -10,8 +10,22 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from rakuten_init import RakutenInit
+from rakuten_pooled_browser import PooledBrowserMixin
+from rakuten_review_scraper import ReviewScraperMixin
+from rakuten_api_client import get_api_client
+from rakuten_page_snapshot import SnapshotCache
+from rakuten_tiered_fetcher import TieredFetcher
+from rakuten_page_extractor import extract_item_page
+from rakuten_html_parser import submit_parse, run_parse, completed, parse_item_page
+from rakuten_batch_runner import BatchRunner, get_batch_workers
+from rakuten_review_sync import get_review_sync_state, is_incremental_enabled
+from rakuten_review_table import split_reviews, long_reviews_from_wide
+from rakuten_review_locator import get_review_locator
+from rakuten_image_urls import upscale_image_urls
+from rakuten_page_ready import wait_until, element_present
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
@@ -30,17 +44,35 @@ except Exception:
         except Exception:
             print("日本語フォントの設定に失敗しました。グラフの日本語が文字化けする可能性があります。")
 
-class RakutenCompetitorAnalysis:
-    def __init__(self, application_id):
+# 楽天商品検索APIの制限（1ページの最大取得件数と最大ページ番号）
+MAX_HITS_PER_PAGE = 30
+MAX_PAGE = 100
+
+# 縦持ちのレビューの表に含める商品の列
+REVIEW_KEY_COLUMNS = ('itemCode', 'itemName', 'shopName')
+
+class RakutenCompetitorAnalysis(ReviewScraperMixin, PooledBrowserMixin):
+    def __init__(self, application_id, scrape_profile=False):
         """
         楽天市場の競合調査ツールの初期化
         
         Args:
             application_id (str): RAKUTEN_API_KEY
+            scrape_profile (bool): 画像・フォント・計測タグを読み込まない軽量プロファイルでChromeを起動するかどうか
         """
         self.application_id = application_id
         self.base_url = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
-        self.driver = None
+        self.browser = None
+        self.driver_pool = None
+        self.scrape_profile = scrape_profile
+        self.api_client = get_api_client()
+        self.fetcher = TieredFetcher(self.api_client)
+        self.snapshots = SnapshotCache(fetcher=self.fetcher)
+        self.review_locator = get_review_locator()
+        self.review_sync = get_review_sync_state()
+        self.incremental_reviews = is_incremental_enabled()
+        self.review_table = None
+        self.headless = True
         
         
     def search_similar_items(self, keyword, hits=30, page=1, sort="-reviewAverage"):
@@ -65,9 +97,57 @@ class RakutenCompetitorAnalysis:
             "formatVersion": 2
         }
         
-        response = requests.get(self.base_url, params=params)
-        return response.json()
-    
+        return self.api_client.get_json(self.base_url, params=params)
+
+    def search_similar_items_paginated(self, keyword, max_items=30, sort="-reviewAverage", max_workers=4):
+        """
+        複数ページを並列に取得して、指定件数まで類似商品を検索
+
+        Args:
+            keyword (str): 検索キーワード
+            max_items (int): 取得する最大商品数
+            sort (str): ソート順
+            max_workers (int): 並列に取得するページ数
+
+        Returns:
+            dict: API応答（全ページのItemsをランク順に結合したもの）
+        """
+        hits = max(1, min(max_items, MAX_HITS_PER_PAGE))
+
+        # 1ページ目で総ページ数を確認
+        first_page = self.search_similar_items(keyword, hits=hits, page=1, sort=sort)
+        if 'Items' not in first_page:
+            return first_page
+
+        items = list(first_page['Items'])
+        page_count = min(first_page.get('pageCount', 1) or 1, MAX_PAGE)
+        needed_pages = min(-(-max_items // hits), page_count)
+
+        if needed_pages > 1 and len(items) >= hits:
+            print(f"残り{needed_pages - 1}ページを並列に取得します...")
+            pages = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self.search_similar_items, keyword, hits, page, sort): page
+                    for page in range(2, needed_pages + 1)
+                }
+                for future in as_completed(futures):
+                    page = futures[future]
+                    try:
+                        pages[page] = future.result().get('Items', [])
+                    except Exception as e:
+                        print(f"{page}ページ目の取得中にエラー: {e}")
+                        pages[page] = []
+
+            # ページ番号順に結合してランク順を保つ
+            for page in sorted(pages):
+                items.extend(pages[page])
+
+        result = dict(first_page)
+        result['Items'] = items[:max_items]
+        result['hits'] = len(result['Items'])
+        return result
+
     def get_additional_info(self, item_url):
         """
         Seleniumを使用して商品ページから追加情報を取得
@@ -78,20 +158,26 @@ class RakutenCompetitorAnalysis:
         Returns:
             dict: 追加情報（レビュー数、評価、Q&A数など）
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
-        self.driver.get(item_url)
-        time.sleep(3)  # ページ読み込み待機時間を増やす
+        return self.build_additional_info(self.load_additional_info(item_url, background=False))
+    
+    def load_additional_info(self, item_url, background=True):
+        """
+        商品ページを取得し、描画後のHTMLの解析をワーカーに依頼（解析の完了は待たない）
         
-        additional_info = {}
+        HTTPで取得したHTMLですべての項目が揃う場合はChromeを使わない
         
-        try:
-            # ページのタイトルを取得（デバッグ用）
-            print(f"ページタイトル: {self.driver.title}")
+        解析中に次のページを読み込めるように、結果の組み立てはbuild_additional_infoで行う
+        
+        Args:
+            item_url (str): 商品ページのURL
+            background (bool): 解析をワーカーに依頼するかどうか（Falseの場合は結果をすぐに使うためこのプロセスで解析する）
             
+        Returns:
+            dict: 解析待ちの情報（build_additional_infoに渡す）
+        """
+        pending = {'url': item_url, 'selectors': {}, 'http': {}, 'page': None}
+        
+        try:
             # レビュー情報の取得（複数のセレクタを試す）
             review_selectors = [
                 "span[itemprop='aggregateRating']",
@@ -100,34 +186,6 @@ class RakutenCompetitorAnalysis:
                 "div.item-review-area"
             ]
             
-            review_element = None
-            for selector in review_selectors:
-                try:
-                    review_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if review_element:
-                        print(f"レビュー要素が見つかりました: {selector}")
-                        break
-                except:
-                    continue
-            
-            if review_element:
-                review_text = review_element.text
-                print(f"レビューテキスト: {review_text}")
-                
-                # 評価点数を抽出
-                rating_match = re.search(r'([0-9.]+)点', review_text)
-                if rating_match:
-                    additional_info['rating'] = float(rating_match.group(1))
-                
-                # レビュー件数を抽出
-                review_count_match = re.search(r'([0-9,]+)件', review_text)
-                if review_count_match:
-                    additional_info['reviewCount'] = int(review_count_match.group(1).replace(',', ''))
-            else:
-                print("レビュー要素が見つかりませんでした")
-                
             # 商品説明の取得（複数のセレクタを試す）
             description_selectors = [
                 "div.item-description",
@@ -136,18 +194,6 @@ class RakutenCompetitorAnalysis:
                 "span.item_desc"
             ]
             
-            for selector in description_selectors:
-                try:
-                    description = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                    if description:
-                        additional_info['description'] = description
-                        break
-                except:
-                    continue
-            
-            if 'description' not in additional_info:
-                additional_info['description'] = "説明が見つかりません"
-                
             # 販売者情報の取得（複数のセレクタを試す）
             seller_selectors = [
                 "div.seller-info",
@@ -156,311 +202,263 @@ class RakutenCompetitorAnalysis:
                 "div.shop-info"
             ]
             
-            for selector in seller_selectors:
-                try:
-                    seller_info = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                    if seller_info:
-                        additional_info['seller_info'] = seller_info
-                        break
-                except:
-                    continue
-            
-            if 'seller_info' not in additional_info:
-                additional_info['seller_info'] = "販売者情報が見つかりません"
+            # 画像の取得（指定されたクラス名 'image--3z5RH' を優先し、なければ他の一般的な画像セレクタを試す）
+            image_selectors = [
+                ".image--3z5RH",
+                "div.image-gallery img",
+                "div.item-image-container img",
+                "div.item-image img",
+                "div.item-gallery img",
+                "div.item-photo img"
+            ]
+            
+            pending['selectors'] = dict(review_selectors=review_selectors, description_selectors=description_selectors, seller_selectors=seller_selectors, image_selectors=image_selectors)
+            
+            # まずHTTPで取得したHTMLから抽出し、足りない項目がある場合だけChromeで読み込む（スナップショットと同じHTMLを使う）
+            pending['http'], missing = self.fetcher.fetch_item_page(item_url, page=self.snapshots.get_html(item_url), **pending['selectors'])
+            if not missing:
+                print("HTTPで取得したHTMLからすべての項目を取得しました")
+                return pending
+            print(f"HTTPで取得できなかった項目をChromeで取得します: {', '.join(missing)}")
+            
+            # 商品ページの読み込み完了（grp15_ias_prmやレビュー要素の描画）まで待機（読み込み済みなら再利用）
+            snapshot = self._get_snapshot(item_url, live=True)
+            
+            # ページのタイトルを取得（デバッグ用）
+            print(f"ページタイトル: {snapshot.title}")
+            
+            # いずれかのレビュー要素が描画されるまでまとめて待機
+            wait_until(self.driver, element_present(*review_selectors), self.browser.page_budget, timeout=5)
+            
+            # 描画後のHTMLを1回だけ取得して解析する（パーサーが使えない場合はブラウザ上で抽出）
+            parse = submit_parse if background else run_parse
+            pending['page'] = parse(parse_item_page, self.driver.page_source, item_url, **pending['selectors'])
+            if pending['page'] is None:
+                pending['page'] = completed(extract_item_page(self.driver, **pending['selectors']))
+            
+            # 別のページに移動する前に、解析できなかった項目を要素から補えるようにする
+            self._track_live_page(pending)
+            
+        except Exception as e:
+            print(f"追加情報の取得中にエラーが発生しました: {e}")
+            
+        return pending
+    
+    def build_additional_info(self, pending):
+        """
+        HTMLの解析結果から追加情報を組み立てる
+        
+        Args:
+            pending (dict): load_additional_infoの戻り値
+            
+        Returns:
+            dict: 追加情報（レビュー数、評価、Q&A数など）
+        """
+        additional_info = {}
+        
+        try:
+            # 解析できなかった項目は、ブラウザがまだ同じページを表示していれば要素から取得
+            page_data = self._page_data(pending)
+            
+            # HTTPで取得できた項目を優先し、足りない項目だけChromeの結果で補う（項目ごとの取得方法を記録）
+            page_data = self.fetcher.merge_item_page(pending['url'], pending['http'], page_data, pending['selectors'])
+            
+            review = page_data.get('review')
+            description = page_data.get('description')
+            seller_info = page_data.get('seller_info')
+            images = page_data.get('images')
+            
+            if review:
+                print(f"レビュー要素が見つかりました: {review['selector']}")
+                review_text = review['text']
+                print(f"レビューテキスト: {review_text}")
+                
+                # 評価点数を抽出
+                rating_match = re.search(r'([0-9.]+)点', review_text)
+                if rating_match:
+                    additional_info['rating'] = float(rating_match.group(1))
+                
+                # レビュー件数を抽出
+                review_count_match = re.search(r'([0-9,]+)件', review_text)
+                if review_count_match:
+                    additional_info['reviewCount'] = int(review_count_match.group(1).replace(',', ''))
+            else:
+                print("レビュー要素が見つかりませんでした")
+            
+            additional_info['description'] = description['text'] if description else "説明が見つかりません"
+            additional_info['seller_info'] = seller_info['text'] if seller_info else "販売者情報が見つかりません"
+            
+            if images:
+                print(f"'{images['selector']}' の画像要素から {len(images['urls'])} 件のURLを取得しました")
                 
-            # 指定されたクラス名の画像を取得
-            try:
-                print("指定されたクラス名 'image--3z5RH' の画像を取得中...")
+                # 重複を除いて高解像度版にまとめて変換
+                image_urls = upscale_image_urls(images['urls'])
                 
-                # ページが完全に読み込まれるのを待つ
-                time.sleep(2)
+                print(f"取得した画像URL数: {len(image_urls)}")
                 
-                # JavaScriptを実行して遅延読み込み画像を表示させる
-                self.driver.execute_script("""
-                    // 画面をスクロールして遅延読み込み画像を表示
-                    window.scrollTo(0, document.body.scrollHeight / 2);
-                    setTimeout(() => { window.scrollTo(0, 0); }, 500);
-                """)
-                time.sleep(2)
+                # 最大20枚まで保存
+                for i, img_url in enumerate(image_urls[:20]):
+                    additional_info[f'imageUrl_{i+1}'] = img_url
                 
-                # 指定されたクラスの画像要素を取得
-                image_elements = self.driver.find_elements(By.CSS_SELECTOR, ".image--3z5RH")
+                # 画像の総数も保存
+                additional_info['imageCount'] = len(image_urls[:20])
                 
-                if image_elements:
-                    print(f"'image--3z5RH' クラスの画像要素が {len(image_elements)} 個見つかりました")
-                    
-                    # 画像URLを格納するリスト
-                    image_urls = []
-                    
-                    # 各画像要素からURLを取得
-                    for img in image_elements:
-                        try:
-                            # src属性を確認
-                            src = img.get_attribute('src')
-                            if src and src.startswith('http'):
-                                image_urls.append(src)
-                            else:
-                                # data-src属性を確認
-                                data_src = img.get_attribute('data-src')
-                                if data_src and data_src.startswith('http'):
-                                    image_urls.append(data_src)
-                        except Exception as e:
-                            print(f"画像URL取得中にエラー: {e}")
-                    
-                    # 重複を削除
-                    image_urls = list(dict.fromkeys(image_urls))
-                    
-                    # 高解像度版に変換
-                    image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in image_urls]
-                    
-                    print(f"取得した画像URL数: {len(image_urls)}")
-                    
-                    # 最大20枚まで保存
-                    for i, img_url in enumerate(image_urls[:20]):
-                        additional_info[f'imageUrl_{i+1}'] = img_url
-                    
-                    # 画像の総数も保存
-                    additional_info['imageCount'] = len(image_urls[:20])
-                    
-                    # すべての画像URLをパイプ区切りで保存
-                    additional_info['allImageUrls'] = '|'.join(image_urls[:20])
-                else:
-                    print("'image--3z5RH' クラスの画像要素が見つかりませんでした")
-                    
-                    # 代替方法：他の一般的な画像セレクタを試す
-                    alternative_selectors = [
-                        "div.image-gallery img",
-                        "div.item-image-container img",
-                        "div.item-image img",
-                        "div.item-gallery img",
-                        "div.item-photo img"
-                    ]
-                    
-                    for selector in alternative_selectors:
-                        try:
-                            alt_images = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            if alt_images:
-                                print(f"代替セレクタ '{selector}' で {len(alt_images)} 個の画像を発見")
-                                
-                                # 画像URLを格納するリスト
-                                alt_image_urls = []
-                                
-                                # 各画像要素からURLを取得
-                                for img in alt_images:
-                                    src = img.get_attribute('src') or img.get_attribute('data-src')
-                                    if src and src.startswith('http'):
-                                        alt_image_urls.append(src)
-                                
-                                if alt_image_urls:
-                                    # 重複を削除
-                                    alt_image_urls = list(dict.fromkeys(alt_image_urls))
-                                    
-                                    # 高解像度版に変換
-                                    alt_image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in alt_image_urls]
-                                    
-                                    # 最大20枚まで保存
-                                    for i, img_url in enumerate(alt_image_urls[:20]):
-                                        additional_info[f'imageUrl_{i+1}'] = img_url
-                                    
-                                    # 画像の総数も保存
-                                    additional_info['imageCount'] = len(alt_image_urls[:20])
-                                    
-                                    # すべての画像URLをパイプ区切りで保存
-                                    additional_info['allImageUrls'] = '|'.join(alt_image_urls[:20])
-                                    
-                                    break
-                        except Exception as e:
-                            print(f"代替画像取得中にエラー: {e}")
-            
-            except Exception as e:
-                print(f"画像取得処理中にエラーが発生しました: {e}")
+                # すべての画像URLをパイプ区切りで保存
+                additional_info['allImageUrls'] = '|'.join(image_urls[:20])
+            else:
+                print("画像要素が見つかりませんでした")
             
         except Exception as e:
             print(f"追加情報の取得中にエラーが発生しました: {e}")
             
         return additional_info
     
-    def get_reviews_from_page(self, item_url):
+    def analyze_competitor_item(self, item_data, debug=False):
         """
-        商品ページからレビュー情報を取得
+        検索結果の商品1件について基本情報・追加情報・レビューを取得（並列実行時にワーカーで1件ずつ処理する単位）
         
         Args:
-            item_url (str): 商品ページのURL
+            item_data (dict): 検索APIが返した商品データ
+            debug (bool): 商品データの構造を出力するかどうか
             
         Returns:
-            dict: レビュー情報（件数、レビューテキスト一覧）
+            dict: 商品の分析結果
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
+        # formatVersion=2の場合、直接itemデータが含まれている可能性があります
+        if isinstance(item_data, dict) and 'Item' in item_data:
+            item = item_data['Item']
+        else:
+            # 直接itemデータとして扱う
+            item = item_data
+        
+        # デバッグ: 商品データの構造を確認
+        if debug:
+            print(f"商品データ構造: {json.dumps(item, indent=2, ensure_ascii=False)[:500]}...")
+            if 'mediumImageUrls' in item:
+                print(f"mediumImageUrls型: {type(item['mediumImageUrls'])}")
+                print(f"mediumImageUrls内容: {item['mediumImageUrls']}")
         
+        # APIから取得した基本情報
+        item_info = {
+            'itemName': item.get('itemName', '不明'),
+            'itemPrice': item.get('itemPrice', 0),
+            'itemUrl': item.get('itemUrl', ''),
+            'shopName': item.get('shopName', '不明'),
+            'itemCode': item.get('itemCode', ''),
+            'imageUrl': None,  # デフォルト値をNoneに設定
+            'availability': item.get('availability', ''),
+            'taxFlag': item.get('taxFlag', 0),
+            'postageFlag': item.get('postageFlag', 0),
+            'creditCardFlag': item.get('creditCardFlag', 0),
+            'reviewCount': item.get('reviewCount', 0),
+            'reviewAverage': item.get('reviewAverage', 0),
+            'pointRate': item.get('pointRate', 0),
+            'pointRateStartTime': item.get('pointRateStartTime', ''),
+            'pointRateEndTime': item.get('pointRateEndTime', ''),
+            'shopOfTheYearFlag': item.get('shopOfTheYearFlag', 0),
+            'shipOverseasFlag': item.get('shipOverseasFlag', 0),
+            'shipOverseasArea': item.get('shipOverseasArea', ''),
+            'asurakuFlag': item.get('asurakuFlag', 0),
+            'asurakuClosingTime': item.get('asurakuClosingTime', ''),
+            'asurakuArea': item.get('asurakuArea', ''),
+            'affiliateRate': item.get('affiliateRate', 0),
+            'startTime': item.get('startTime', ''),
+            'endTime': item.get('endTime', ''),
+            'giftFlag': item.get('giftFlag', 0),
+            'tagIds': ','.join(map(str, item.get('tagIds', []))),
+        }
+        
+        # 画像URLの取得を安全に行う
         try:
-            print(f"商品ページにアクセス: {item_url}")
-            self.driver.get(item_url)
-            time.sleep(3)  # ページ読み込み待機
-            
-            # レビューボタンまたはレビューURLを探す
-            review_button = None
-            review_count = 0
-            review_url = None
-            
-            try:
-                # 新しいレビューボタンのセレクタを試す
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='review.rakuten.co.jp']")
-                if review_elements:
-                    review_url = review_elements[0].get_attribute('href')
-                    print(f"レビューURL発見: {review_url}")
-                
-                # 別のセレクタも試す
-                if not review_url:
-                    review_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, 'review') or contains(text(), 'レビュー')]")
-                    for link in review_links:
-                        href = link.get_attribute('href')
-                        if href and 'review' in href:
-                            review_url = href
-                            print(f"代替方法でレビューURL発見: {review_url}")
-                            break
-            except Exception as e:
-                print(f"レビューボタン/URL検索中にエラー: {e}")
-            
-            # レビューページに移動
-            if review_url:
-                print(f"レビューページに直接アクセス: {review_url}")
-                self.driver.get(review_url)
-                time.sleep(5)  # ページ読み込み待機
-            
-            # レビュー一覧を取得
-            reviews = []
-            max_reviews = 20  # 取得する最大レビュー数
-            
-            try:
-                # 提供されたHTMLに基づくセレクタ
-                review_containers = self.driver.find_elements(By.CSS_SELECTOR, "li > div.spacer--xFAdr.full-width--2JiOP")
-                
-                if review_containers:
-                    print(f"{len(review_containers)}件のレビュー要素を発見")
-                    
-                    for container in review_containers[:max_reviews]:
-                        try:
-                            # 評価を取得
-                            rating_elem = container.find_elements(By.CSS_SELECTOR, "span.text-container--IAFCr")
-                            rating = 0
-                            if rating_elem:
-                                try:
-                                    rating = float(rating_elem[0].text)
-                                except ValueError:
-                                    pass
-                            
-                            # 日付を取得
-                            date_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-body--1W5uC.size-small--sv6IW.color-gray-dark--2N4Oj")
-                            date = ""
-                            if date_elem:
-                                date = date_elem[0].text
-                            
-                            # レビュータイトルを取得
-                            title_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-header--18XjX")
-                            title = ""
-                            if title_elem:
-                                title = title_elem[0].text
-                            
-                            # レビュー本文を取得
-                            comment_elem = container.find_elements(By.CSS_SELECTOR, "div.review-body--1pESv")
-                            if not comment_elem:
-                                comment_elem = container.find_elements(By.CSS_SELECTOR, "div.no-ellipsis--IKXkO")
-                            
-                            comment = ""
-                            if comment_elem:
-                                comment = comment_elem[0].text
-                            
-                            if comment:
-                                reviews.append({
-                                    "rating": rating,
-                                    "title": title,
-                                    "comment": comment,
-                                    "date": date
-                                })
-                        except Exception as e:
-                            print(f"レビュー要素の解析中にエラー: {e}")
-                
-                # 次のページがあれば取得（最大2ページまで）
-                if reviews and len(reviews) < max_reviews:
-                    try:
-                        next_page_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='page=2']")
-                        if not next_page_links:
-                            next_page_links = self.driver.find_elements(By.XPATH, "//a[contains(text(), '次へ') or contains(text(), '次の') or contains(@class, 'next')]")
-                        
-                        if next_page_links:
-                            next_url = next_page_links[0].get_attribute('href')
-                            if next_url:
-                                print(f"次のページに移動: {next_url}")
-                                self.driver.get(next_url)
-                                time.sleep(3)
-                                
-                                # 2ページ目のレビューを取得
-                                page2_containers = self.driver.find_elements(By.CSS_SELECTOR, "li > div.spacer--xFAdr.full-width--2JiOP")
-                                
-                                if page2_containers:
-                                    print(f"2ページ目で{len(page2_containers)}件のレビュー要素を発見")
-                                    
-                                    for container in page2_containers[:max_reviews - len(reviews)]:
-                                        try:
-                                            # 評価を取得
-                                            rating_elem = container.find_elements(By.CSS_SELECTOR, "span.text-container--IAFCr")
-                                            rating = 0
-                                            if rating_elem:
-                                                try:
-                                                    rating = float(rating_elem[0].text)
-                                                except ValueError:
-                                                    pass
-                                            
-                                            # 日付を取得
-                                            date_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-body--1W5uC.size-small--sv6IW.color-gray-dark--2N4Oj")
-                                            date = ""
-                                            if date_elem:
-                                                date = date_elem[0].text
-                                            
-                                            # レビュータイトルを取得
-                                            title_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-header--18XjX")
-                                            title = ""
-                                            if title_elem:
-                                                title = title_elem[0].text
-                                            
-                                            # レビュー本文を取得
-                                            comment_elem = container.find_elements(By.CSS_SELECTOR, "div.review-body--1pESv")
-                                            if not comment_elem:
-                                                comment_elem = container.find_elements(By.CSS_SELECTOR, "div.no-ellipsis--IKXkO")
-                                            
-                                            comment = ""
-                                            if comment_elem:
-                                                comment = comment_elem[0].text
-                                            
-                                            if comment:
-                                                reviews.append({
-                                                    "rating": rating,
-                                                    "title": title,
-                                                    "comment": comment,
-                                                    "date": date
-                                                })
-                                        except Exception as e:
-                                            print(f"2ページ目のレビュー要素の解析中にエラー: {e}")
-                    except Exception as e:
-                        print(f"次のページの取得中にエラー: {e}")
+            # 単一の画像URL（メイン画像）
+            medium_image_urls = item.get('mediumImageUrls')
+            if medium_image_urls:
+                if isinstance(medium_image_urls, list) and len(medium_image_urls) > 0:
+                    if isinstance(medium_image_urls[0], dict) and 'imageUrl' in medium_image_urls[0]:
+                        item_info['imageUrl'] = medium_image_urls[0]['imageUrl']
+                    elif isinstance(medium_image_urls[0], str):
+                        item_info['imageUrl'] = medium_image_urls[0]
+                elif isinstance(medium_image_urls, str):
+                    item_info['imageUrl'] = medium_image_urls
+            
+            # 全ての画像URLを取得（最大20枚）
+            all_image_urls = []
+            
+            # mediumImageUrlsから全ての画像を取得
+            if medium_image_urls:
+                if isinstance(medium_image_urls, list):
+                    for img in medium_image_urls:
+                        if isinstance(img, dict) and 'imageUrl' in img:
+                            all_image_urls.append(img['imageUrl'])
+                        elif isinstance(img, str):
+                            all_image_urls.append(img)
+                elif isinstance(medium_image_urls, str):
+                    all_image_urls.append(medium_image_urls)
             
-            except Exception as e:
-                print(f"レビュー解析中にエラー: {e}")
+            # 追加の画像URLがある場合（APIによって異なる形式で返される可能性がある）
+            additional_images = item.get('mediumImageUrls', [])
+            if isinstance(additional_images, list) and additional_images != medium_image_urls:
+                for img in additional_images:
+                    if isinstance(img, dict) and 'imageUrl' in img:
+                        all_image_urls.append(img['imageUrl'])
+                    elif isinstance(img, str):
+                        all_image_urls.append(img)
+            
+            # 重複を削除
+            all_image_urls = list(dict.fromkeys(all_image_urls))
+            
+            # 全ての画像URLをカンマ区切りで保存
+            item_info['allImageUrls'] = '|'.join(all_image_urls)
+            
+            # 画像の枚数を保存
+            item_info['imageCount'] = len(all_image_urls)
+            
+            print(f"取得した画像数: {len(all_image_urls)}")
             
-            print(f"合計 {len(reviews)} 件のレビューを取得しました")
-            return {
-                "review_count": len(reviews),
-                "reviews": reviews
-            }
-        
         except Exception as e:
-            print(f"レビュー取得中にエラー: {e}")
-            return {"review_count": 0, "reviews": []}
+            print(f"画像URL取得中にエラーが発生しました: {e}")
+        
+        # 商品URLが存在する場合のみSeleniumで追加情報を取得（HTMLの解析はレビューページの読み込みと並行して行う）
+        pending = None
+        if item_info['itemUrl']:
+            pending = self.load_additional_info(item_info['itemUrl'])
+        
+        print(f"{item_info['itemName'][:30]} のレビュー情報を取得中...")
+
+        review_info = self.get_reviews_from_page(item_info['itemUrl'], item_code=item_info['itemCode'])
+
+        if pending is not None:
+            # 基本情報と追加情報を結合
+            item_info.update(self.build_additional_info(pending))
+
+        # レビュー情報を追加
+        item_info['detailed_review_count'] = review_info['review_count']
+        item_info['reviews'] = review_info['reviews']
+        
+        return item_info
+    
+    def _failed_item(self, item_data, error):
+        """
+        分析できなかった商品の結果（検索APIの基本情報とエラー内容）
+        
+        Args:
+            item_data (dict): 検索APIが返した商品データ
+            error (str): エラー内容
+            
+        Returns:
+            dict: 商品の結果
+        """
+        item = item_data.get('Item', item_data) if isinstance(item_data, dict) else {}
+        return {
+            'itemName': item.get('itemName', '不明'),
+            'itemPrice': item.get('itemPrice', 0),
+            'itemUrl': item.get('itemUrl', ''),
+            'shopName': item.get('shopName', '不明'),
+            'itemCode': item.get('itemCode', ''),
+            'error': error
+        }
     
-    def analyze_competitors(self, keyword, max_items=10, sort_order="-reviewAverage", progress_callback=None, headless=True):
+    def analyze_competitors(self, keyword, max_items=10, sort_order="-reviewAverage", progress_callback=None, headless=True, workers=None, wide_reviews=False):
         """
         競合分析を実行し、結果をデータフレームとして返す
         
@@ -470,9 +468,11 @@ class RakutenCompetitorAnalysis:
             sort_order (str): ソート順（デフォルトはレビュー評価の高い順）
             progress_callback (callable): 進捗を報告するコールバック関数
             headless (bool): ヘッドレスモードで実行するかどうか
+            workers (int): 並列に処理するワーカープロセス数（省略時は環境変数 RAKUTEN_BATCH_WORKERS）
+            wide_reviews (bool): レビューを従来の横持ちの列（review_{番号}_{項目}）としても結果に追加するかどうか
             
         Returns:
-            pandas.DataFrame: 競合分析結果
+            pandas.DataFrame: 競合分析結果（レビューは縦持ちの表としてreview_tableに保持する）
         """
         if progress_callback:
             progress_callback(0, max_items, f"「{keyword}」の競合分析を開始します...")
@@ -482,7 +482,7 @@ class RakutenCompetitorAnalysis:
         print(f"ソート順: {sort_order}")
         
         # APIから商品情報を取得
-        api_result = self.search_similar_items(keyword, hits=max_items, sort=sort_order)
+        api_result = self.search_similar_items_paginated(keyword, max_items=max_items, sort=sort_order)
         
         # デバッグ用にAPIレスポンスの構造を確認
         print("APIレスポンス構造:", json.dumps(api_result, indent=2, ensure_ascii=False)[:500] + "...")
@@ -502,174 +502,61 @@ class RakutenCompetitorAnalysis:
         # 結果を格納するリスト
         results = []
         
-        # Seleniumの初期化
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium(headless=headless)
-            self.driver = rakuten_init.driver
-        
-        # 各商品の詳細情報を取得
-        for i, item_data in enumerate(items):
-            # formatVersion=2の場合、直接itemデータが含まれている可能性があります
-            if isinstance(item_data, dict) and 'Item' in item_data:
-                item = item_data['Item']
-            else:
-                # 直接itemデータとして扱う
-                item = item_data
-            
-            if progress_callback:
-                progress_callback(i+1, len(items), f"商品 {i+1}/{len(items)} の情報を取得中: {item.get('itemName', '不明')[:30]}...")
-            else:
-                print(f"商品 {i+1}/{len(items)} の情報を取得中: {item.get('itemName', '不明')[:30]}...")
-            
-            # デバッグ: 商品データの構造を確認
-            if i == 0:  # 最初の商品だけ詳細を出力
-                print(f"商品データ構造: {json.dumps(item, indent=2, ensure_ascii=False)[:500]}...")
-                if 'mediumImageUrls' in item:
-                    print(f"mediumImageUrls型: {type(item['mediumImageUrls'])}")
-                    print(f"mediumImageUrls内容: {item['mediumImageUrls']}")
-            
-            # APIから取得した基本情報
-            item_info = {
-                'itemName': item.get('itemName', '不明'),
-                'itemPrice': item.get('itemPrice', 0),
-                'itemUrl': item.get('itemUrl', ''),
-                'shopName': item.get('shopName', '不明'),
-                'itemCode': item.get('itemCode', ''),
-                'imageUrl': None,  # デフォルト値をNoneに設定
-                'availability': item.get('availability', ''),
-                'taxFlag': item.get('taxFlag', 0),
-                'postageFlag': item.get('postageFlag', 0),
-                'creditCardFlag': item.get('creditCardFlag', 0),
-                'reviewCount': item.get('reviewCount', 0),
-                'reviewAverage': item.get('reviewAverage', 0),
-                'pointRate': item.get('pointRate', 0),
-                'pointRateStartTime': item.get('pointRateStartTime', ''),
-                'pointRateEndTime': item.get('pointRateEndTime', ''),
-                'shopOfTheYearFlag': item.get('shopOfTheYearFlag', 0),
-                'shipOverseasFlag': item.get('shipOverseasFlag', 0),
-                'shipOverseasArea': item.get('shipOverseasArea', ''),
-                'asurakuFlag': item.get('asurakuFlag', 0),
-                'asurakuClosingTime': item.get('asurakuClosingTime', ''),
-                'asurakuArea': item.get('asurakuArea', ''),
-                'affiliateRate': item.get('affiliateRate', 0),
-                'startTime': item.get('startTime', ''),
-                'endTime': item.get('endTime', ''),
-                'giftFlag': item.get('giftFlag', 0),
-                'tagIds': ','.join(map(str, item.get('tagIds', []))),
-            }
-            
-            # 画像URLの取得を安全に行う
-            try:
-                # 単一の画像URL（メイン画像）
-                medium_image_urls = item.get('mediumImageUrls')
-                if medium_image_urls:
-                    if isinstance(medium_image_urls, list) and len(medium_image_urls) > 0:
-                        if isinstance(medium_image_urls[0], dict) and 'imageUrl' in medium_image_urls[0]:
-                            item_info['imageUrl'] = medium_image_urls[0]['imageUrl']
-                        elif isinstance(medium_image_urls[0], str):
-                            item_info['imageUrl'] = medium_image_urls[0]
-                    elif isinstance(medium_image_urls, str):
-                        item_info['imageUrl'] = medium_image_urls
-                
-                # 全ての画像URLを取得（最大20枚）
-                all_image_urls = []
-                
-                # mediumImageUrlsから全ての画像を取得
-                if medium_image_urls:
-                    if isinstance(medium_image_urls, list):
-                        for img in medium_image_urls:
-                            if isinstance(img, dict) and 'imageUrl' in img:
-                                all_image_urls.append(img['imageUrl'])
-                            elif isinstance(img, str):
-                                all_image_urls.append(img)
-                    elif isinstance(medium_image_urls, str):
-                        all_image_urls.append(medium_image_urls)
-                
-                # 追加の画像URLがある場合（APIによって異なる形式で返される可能性がある）
-                additional_images = item.get('mediumImageUrls', [])
-                if isinstance(additional_images, list) and additional_images != medium_image_urls:
-                    for img in additional_images:
-                        if isinstance(img, dict) and 'imageUrl' in img:
-                            all_image_urls.append(img['imageUrl'])
-                        elif isinstance(img, str):
-                            all_image_urls.append(img)
-                
-                # 重複を削除
-                all_image_urls = list(dict.fromkeys(all_image_urls))
-                
-                # 全ての画像URLをカンマ区切りで保存
-                item_info['allImageUrls'] = '|'.join(all_image_urls)
-                
-                # 画像の枚数を保存
-                item_info['imageCount'] = len(all_image_urls)
-                
-                print(f"取得した画像数: {len(all_image_urls)}")
+        # Seleniumドライバーは、HTTPで取得できない項目があったときに共有プールから借りる
+        self.headless = headless
+        
+        if get_batch_workers(workers) > 1 and len(items) > 1:
+            # ワーカーごとにドライバーを持たせて並列に処理し、結果は元の順序に並べ直す
+            runner = BatchRunner(
+                RakutenCompetitorAnalysis,
+                args=(self.application_id,),
+                kwargs={'scrape_profile': self.scrape_profile},
+                attributes={'headless': headless, 'incremental_reviews': self.incremental_reviews},
+                workers=workers
+            )
+            # すべての試行に失敗した商品も、順次処理の場合と同じくエラーの行として結果に残す
+            results = runner.run(
+                'analyze_competitor_item',
+                items,
+                progress_callback=progress_callback,
+                describe=lambda item_data: item_data.get('Item', item_data).get('itemName', '不明')[:30],
+                on_failure=self._failed_item
+            )
+            self.fetcher.merge_counts(runner.counts)
+        else:
+            # 各商品の詳細情報を取得
+            item_urls = [item_data.get('Item', item_data).get('itemUrl', '') for item_data in items]
+            for i, item_data in enumerate(items):
+                item_name = item_data.get('Item', item_data).get('itemName', '不明')
+                if progress_callback:
+                    progress_callback(i+1, len(items), f"商品 {i+1}/{len(items)} の情報を取得中: {item_name[:30]}...")
+                else:
+                    print(f"商品 {i+1}/{len(items)} の情報を取得中: {item_name[:30]}...")
                 
-            except Exception as e:
-                print(f"画像URL取得中にエラーが発生しました: {e}")
-            
-            # 商品URLが存在する場合のみSeleniumで追加情報を取得
-            if item_info['itemUrl']:
-                additional_info = self.get_additional_info(item_info['itemUrl'])
-                # 基本情報と追加情報を結合
-                item_info.update(additional_info)
-            
-            # 追加のレビュー情報を取得
-            if progress_callback:
-                # 正しい引数の順序と数で呼び出す
-                current_progress = i + 1
-                total_items = len(items)
-                message = f"商品 {current_progress}/{total_items} のレビュー情報を取得中..."
-                progress_callback(current_progress, total_items, message)
-            else:
-                print(f"商品 {i+1}/{len(items)} のレビュー情報を取得中...")
-
-            review_info = self.get_reviews_from_page(item_info['itemUrl'])
-
-            # レビュー情報を追加
-            item_info['detailed_review_count'] = review_info['review_count']
-            item_info['reviews'] = review_info['reviews']
-            
-            results.append(item_info)
-            
-            # APIの制限に引っかからないよう少し待機
-            time.sleep(1)
+                # デバッグ: 最初の商品だけ商品データの構造を出力
+                try:
+                    # 続く商品のページを別のタブで読み込み始める（RAKUTEN_TABS が2以上の場合）
+                    self._prefetch_pages(item_urls[i:])
+                    results.append(self.analyze_competitor_item(item_data, debug=(i == 0)))
+                except Exception as e:
+                    print(f"商品の分析中にエラーが発生しました: {e}")
+                    results.append(self._failed_item(item_data, str(e)))
+        
+        failed = [item_info for item_info in results if 'error' in item_info]
+        if failed:
+            print(f"{len(failed)}件の商品を分析できませんでした: {', '.join(item_info['itemName'][:30] for item_info in failed)}")
         
-        # Seleniumドライバーを閉じる
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        # Seleniumドライバーをプールに返却
+        self._release_driver()
         
         # 結果をデータフレームに変換
         df = pd.DataFrame(results)
         
-        # レビューテキストを別の列に展開
-        if not df.empty and 'reviews' in df.columns:
-            # レビューの最初の5件を別々の列に展開
-            max_reviews = 0
-            for reviews in df['reviews']:
-                if isinstance(reviews, list):
-                    max_reviews = max(max_reviews, len(reviews))
-            
-            for i in range(min(20, max_reviews)):
-                df[f'review_{i+1}_rating'] = df['reviews'].apply(
-                    lambda reviews: reviews[i]['rating'] if isinstance(reviews, list) and i < len(reviews) else None
-                )
-                df[f'review_{i+1}_title'] = df['reviews'].apply(
-                    lambda reviews: reviews[i]['title'] if isinstance(reviews, list) and i < len(reviews) else None
-                )
-                df[f'review_{i+1}_comment'] = df['reviews'].apply(
-                    lambda reviews: reviews[i]['comment'] if isinstance(reviews, list) and i < len(reviews) else None
-                )
-                df[f'review_{i+1}_date'] = df['reviews'].apply(
-                    lambda reviews: reviews[i]['date'] if isinstance(reviews, list) and i < len(reviews) else None
-                )
-            
-            # 元のreviewsリストは削除（データフレームを軽くするため）
-            df = df.drop(columns=['reviews'])
+        # レビューは縦持ちの表に分ける（横持ちの列は指定された場合だけ追加）
+        df, self.review_table = split_reviews(df, REVIEW_KEY_COLUMNS, wide=wide_reviews)
         
         print("競合分析が完了しました。")
+        print(f"項目ごとの取得方法: {self.fetcher.stats()}")
         return df
     
     def save_results(self, df, filename="rakuten_competitor_analysis.xlsx"):
@@ -691,22 +578,15 @@ class RakutenCompetitorAnalysis:
             print(f"openpyxlモジュールがインストールされていないため、{csv_filename} としてCSV形式で保存しました。")
             print("Excelで保存するには: pip install openpyxl を実行してください。")
         
-    def close(self):
-        """
-        リソースを解放
-        """
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-
-    def save_reviews_to_csv(self, df, keyword, output_dir="output"):
+    def save_reviews_to_csv(self, df, keyword, output_dir="output", review_table=None):
         """
         レビュー情報を専用のCSVファイルに保存
         
         Args:
-            df (pandas.DataFrame): 商品情報を含むデータフレーム
+            df (pandas.DataFrame): 商品情報を含むデータフレーム（review_tableがない場合は横持ちのレビュー列から作る）
             keyword (str): 検索キーワード
             output_dir (str): 出力ディレクトリ
+            review_table (pandas.DataFrame): 縦持ちのレビューの表（省略時はanalyze_competitorsの結果）
             
         Returns:
             str: 保存したファイルのパス
@@ -720,37 +600,23 @@ class RakutenCompetitorAnalysis:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             
             # レビュー情報を抽出
-            review_data = []
-            
-            for i, row in df.iterrows():
-                item_name = row.get('itemName', '不明')
-                shop_name = row.get('shopName', '不明')
-                
-                # レビュー列を探す
-                for j in range(1, 21):  # 最大20件のレビュー
-                    rating_col = f'review_{j}_rating'
-                    title_col = f'review_{j}_title'
-                    comment_col = f'review_{j}_comment'
-                    date_col = f'review_{j}_date'
-                    
-                    if all(col in row for col in [rating_col, title_col, comment_col, date_col]):
-                        if pd.notna(row[comment_col]) and row[comment_col]:
-                            review_data.append({
-                                'keyword': keyword,
-                                'item_name': item_name,
-                                'shop_name': shop_name,
-                                'review_rating': row.get(rating_col),
-                                'review_title': row.get(title_col),
-                                'review_comment': row.get(comment_col),
-                                'review_date': row.get(date_col)
-                            })
-            
-            if not review_data:
+            if review_table is None:
+                review_table = self.review_table
+            if review_table is None:
+                review_table = long_reviews_from_wide(df, REVIEW_KEY_COLUMNS)
+            review_data = review_table[review_table['comment'].fillna('') != ''].reindex(
+                columns=['itemName', 'shopName', 'rating', 'title', 'comment', 'date']
+            )
+            review_data.columns = ['item_name', 'shop_name', 'review_rating', 'review_title', 'review_comment', 'review_date']
+            review_data.insert(0, 'keyword', keyword)
+            review_data['item_name'] = review_data['item_name'].fillna('不明')
+            review_data['shop_name'] = review_data['shop_name'].fillna('不明')
+            
+            if review_data.empty:
                 print("保存するレビュー情報がありません。")
                 return None
             
-            # レビューデータをデータフレームに変換
-            reviews_df = pd.DataFrame(review_data)
+            reviews_df = review_data
             
             # ファイル名を生成（タイムスタンプ付き）
             filename = os.path.join(output_dir, f"rakuten_{keyword}_reviews_{timestamp}.csv")
@@ -0,0 +1,181 @@
+import os
+import queue
+import atexit
+import threading
+from rakuten_init import RakutenInit
+
+# プールの設定（環境変数で上書き可能）
+DEFAULT_POOL_SIZE = 2
+DEFAULT_CHECKOUT_TIMEOUT = 300  # 秒
+
+
+class DriverPool:
+    def __init__(self, max_size=DEFAULT_POOL_SIZE, checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT, **driver_options):
+        """
+        起動済みのSeleniumドライバーを使い回すプールの初期化
+
+        Args:
+            max_size (int): 同時に保持するドライバーの最大数
+            checkout_timeout (float): 空きドライバーを待つ最大秒数
+            **driver_options: RakutenInit.initialize_seleniumに渡すオプション（headlessなど）
+        """
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.driver_options = driver_options
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _create(self):
+        """
+        新しいドライバーを起動
+
+        Returns:
+            RakutenInit: ドライバーを保持するRakutenInit
+        """
+        print("プール用のChromeドライバーを起動します...")
+        rakuten_init = RakutenInit(None)
+        rakuten_init.initialize_selenium(**self.driver_options)
+        return rakuten_init
+
+    def _is_healthy(self, rakuten_init):
+        """
+        ドライバーが応答するか確認
+
+        Args:
+            rakuten_init (RakutenInit): 確認するドライバー
+
+        Returns:
+            bool: 正常に応答する場合はTrue
+        """
+        if rakuten_init is None or rakuten_init.driver is None:
+            return False
+        try:
+            return rakuten_init.driver.execute_script("return 1") == 1
+        except Exception as e:
+            print(f"ドライバーのヘルスチェックに失敗: {e}")
+            return False
+
+    def _quit(self, rakuten_init):
+        """
+        ドライバーを終了
+        """
+        rakuten_init.quit()
+
+    def checkout(self, timeout=None):
+        """
+        プールからドライバーを借りる（空きがなければ新しく起動）
+
+        Args:
+            timeout (float): 空きを待つ最大秒数（省略時はcheckout_timeout）
+
+        Returns:
+            RakutenInit: ドライバーを保持するRakutenInit
+        """
+        if not self.slots.acquire(timeout=timeout or self.checkout_timeout):
+            raise TimeoutError("空きのSeleniumドライバーを取得できませんでした")
+
+        try:
+            while True:
+                try:
+                    rakuten_init = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+
+                if self._is_healthy(rakuten_init):
+                    return rakuten_init
+
+                print("応答しないドライバーを破棄します")
+                self._quit(rakuten_init)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def checkin(self, rakuten_init):
+        """
+        借りたドライバーをプールに返却
+
+        Args:
+            rakuten_init (RakutenInit): 返却するドライバー
+        """
+        try:
+            if self.closed or not self._is_healthy(rakuten_init):
+                self._quit(rakuten_init)
+                return
+
+            # 長く使ったドライバーは返却時に終了し、次の貸し出しで新しく起動する
+            reason = rakuten_init.lifecycle.recycle_reason(rakuten_init)
+            if reason is not None:
+                print(f"返却されたドライバーを終了します（{reason}）")
+                self._quit(rakuten_init)
+                return
+
+            try:
+                # 先読み用のタブと前のページのメモリを解放しておく
+                rakuten_init.close_tabs()
+                rakuten_init.driver.get("about:blank")
+                rakuten_init.loaded_url = None
+            except Exception as e:
+                print(f"ドライバーのリセット中にエラー: {e}")
+                self._quit(rakuten_init)
+                return
+
+            self.idle.put(rakuten_init)
+        finally:
+            self.slots.release()
+
+    def close_all(self):
+        """
+        待機中のドライバーをすべて終了
+        """
+        with self.lock:
+            self.closed = True
+            while True:
+                try:
+                    rakuten_init = self.idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._quit(rakuten_init)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(**driver_options):
+    """
+    ドライバーオプションごとの共有プールを取得
+
+    モジュールレベルで保持するため、Streamlitの再実行をまたいでドライバーが再利用される
+
+    Args:
+        **driver_options: RakutenInit.initialize_seleniumに渡すオプション
+
+    Returns:
+        DriverPool: 共有ドライバープール
+    """
+    key = tuple(sorted(driver_options.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = DriverPool(
+                max_size=int(os.environ.get('RAKUTEN_DRIVER_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                **driver_options
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """
+    すべての共有プールのドライバーを終了
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+atexit.register(close_all_pools)
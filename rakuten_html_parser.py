@@ -0,0 +1,273 @@
+import os
+import atexit
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from rakuten_image_urls import image_urls_from_attributes, page_state_image_urls
+
+# HTMLパーサー（selectolaxを優先し、なければlxmlを使用）
+try:
+    from selectolax.parser import HTMLParser
+    HTML_PARSER_BACKEND = "selectolax"
+except ImportError:
+    try:
+        import lxml.html
+        from lxml import etree
+        from lxml.cssselect import CSSSelector
+        HTML_PARSER_BACKEND = "lxml"
+    except ImportError:
+        HTML_PARSER_BACKEND = None
+
+# 解析用ワーカープロセス数（環境変数で上書き可能）
+DEFAULT_PARSER_WORKERS = 2
+
+# lxmlでコンパイル済みのCSSセレクタ（同じセレクタを何度もコンパイルしない）
+_compiled_selectors = {}
+
+# lxmlでコンパイル済みの、最初に一致する要素だけを求めるXPath
+_compiled_first_selectors = {}
+
+
+def _parse(html):
+    """
+    HTMLを解析してルート要素を返す
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        return HTMLParser(html or "")
+    return lxml.html.fromstring(html or "<html></html>")
+
+
+def _select(root, selector):
+    """
+    CSSセレクタに一致する要素の一覧
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        return root.css(selector)
+    compiled = _compiled_selectors.get(selector)
+    if compiled is None:
+        compiled = _compiled_selectors[selector] = CSSSelector(selector)
+    return compiled(root)
+
+
+def _select_first(root, selector):
+    """
+    CSSセレクタに一致する最初の要素（ない場合はNone）
+
+    lxmlではセレクタをXPathの (...)[1] に変換して評価し、一致する要素のリストを作らずに最初の要素だけを返す
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        return root.css_first(selector)
+    compiled = _compiled_first_selectors.get(selector)
+    if compiled is None:
+        compiled = _compiled_first_selectors[selector] = etree.XPath(f"({CSSSelector(selector).path})[1]")
+    nodes = compiled(root)
+    return nodes[0] if nodes else None
+
+
+def _text(node):
+    """
+    要素のテキスト（子要素を含み、空行を除いて改行で連結）
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        parts = node.text(deep=True, separator="\n").split("\n")
+    else:
+        parts = node.itertext()
+    return "\n".join(part.strip() for part in parts if part and part.strip())
+
+
+def _attr(node, name):
+    """
+    要素の属性値（ない場合は空文字）
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        return node.attributes.get(name) or ""
+    return node.get(name) or ""
+
+
+def _attributes(node):
+    """
+    要素の属性の辞書
+    """
+    if HTML_PARSER_BACKEND == "selectolax":
+        return node.attributes
+    return node.attrib
+
+
+def _first_text(root, selectors):
+    """
+    セレクタを順に試して最初にテキストが見つかった要素を返す
+    """
+    for selector in selectors:
+        for node in _select(root, selector)[:1]:
+            text = _text(node)
+            if text:
+                return {"selector": selector, "text": text}
+    return None
+
+
+def _image_urls(root, selectors, base_url, html=None):
+    """
+    セレクタを順に試して最初に画像URLが見つかった要素群のURLを返す
+
+    遅延読み込みの属性やsrcsetも見るため、スクロールして描画させる必要はない。
+    要素が見つからない場合はJSON-LD・og:imageから取得する
+    """
+    for selector in selectors:
+        urls = []
+        for img in _select(root, selector):
+            src = image_urls_from_attributes(_attributes(img), base_url)
+            if src:
+                urls.append(src)
+        if urls:
+            return {"selector": selector, "urls": urls}
+    if html is not None:
+        return page_state_image_urls(html)
+    return None
+
+
+def parse_item_page(html, base_url, review_selectors=(), description_selectors=(), seller_selectors=(), image_selectors=()):
+    """
+    商品ページのHTMLからレビュー概要・商品説明・販売者情報・画像URLを抽出
+
+    戻り値の形式はrakuten_page_extractor.extract_item_pageと同じ
+
+    Args:
+        html (str): 商品ページのHTML（driver.page_source）
+        base_url (str): 相対URLを解決するためのページURL
+        review_selectors (list): レビュー概要のセレクタ（優先順）
+        description_selectors (list): 商品説明のセレクタ（優先順）
+        seller_selectors (list): 販売者情報のセレクタ（優先順）
+        image_selectors (list): 商品画像のセレクタ（優先順）
+
+    Returns:
+        dict: 抽出結果（title, review, description, seller_info, images）
+    """
+    root = _parse(html)
+    title_nodes = _select(root, "title")
+    return {
+        "title": _text(title_nodes[0]) if title_nodes else "",
+        "review": _first_text(root, review_selectors),
+        "description": _first_text(root, description_selectors),
+        "seller_info": _first_text(root, seller_selectors),
+        "images": _image_urls(root, image_selectors, base_url, html) if image_selectors else None
+    }
+
+
+def parse_fields(html, base_url, field_selectors, image_selectors=()):
+    """
+    項目ごとのセレクタで最初に見つかった要素のテキストを抽出
+
+    Args:
+        html (str): ページのHTML
+        base_url (str): 相対URLを解決するためのページURL
+        field_selectors (dict): 項目名 -> セレクタ（優先順）のリスト
+        image_selectors (list): 画像のセレクタ（優先順）
+
+    Returns:
+        dict: 項目名 -> テキスト（見つからない項目はNone）、imageUrlsに画像URLのリスト
+    """
+    root = _parse(html)
+    fields = {}
+    for name, selectors in field_selectors.items():
+        found = _first_text(root, selectors)
+        fields[name] = found["text"] if found else None
+    images = _image_urls(root, image_selectors, base_url, html) if image_selectors else None
+    fields["imageUrls"] = images["urls"] if images else []
+    return fields
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parser_pool():
+    """
+    HTML解析用の共有ワーカープールを取得
+
+    環境変数 RAKUTEN_PARSER_WORKERS でワーカー数を変更できる（0で無効）
+
+    Returns:
+        ProcessPoolExecutor: ワーカープール（パーサーがない・無効な場合はNone）
+    """
+    global _pool
+    if HTML_PARSER_BACKEND is None:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = int(os.environ.get('RAKUTEN_PARSER_WORKERS', DEFAULT_PARSER_WORKERS))
+                if workers <= 0:
+                    return None
+                try:
+                    _pool = ProcessPoolExecutor(max_workers=workers)
+                except (OSError, NotImplementedError) as e:
+                    print(f"HTML解析用ワーカーを起動できませんでした: {e}")
+                    return None
+    return _pool
+
+
+def submit_parse(func, *args, **kwargs):
+    """
+    HTMLの解析をワーカープールに依頼（ブラウザ操作と並行して解析する）
+
+    HTMLの受け渡しにコストがかかるため、結果を待つ間に次のページを読み込む場合だけ使う。
+    すぐに結果を使う場合はrun_parseを使う
+
+    Args:
+        func (callable): parse_item_page / parse_fields / rakuten_review_parser.parse_review_html
+        *args, **kwargs: 解析関数の引数
+
+    Returns:
+        Future: 解析結果のFuture（ワーカーが使えない場合はNone）
+    """
+    pool = get_parser_pool()
+    if pool is None:
+        return None
+    try:
+        return pool.submit(func, *args, **kwargs)
+    except RuntimeError as e:
+        print(f"HTML解析の依頼に失敗しました: {e}")
+        return None
+
+
+def run_parse(func, *args, **kwargs):
+    """
+    HTMLをこのプロセスで解析し、結果をFutureとして返す（submit_parseと同じ形で扱える）
+
+    Args:
+        func (callable): parse_item_page / parse_fields / rakuten_review_parser.parse_review_html
+        *args, **kwargs: 解析関数の引数
+
+    Returns:
+        Future: 解析結果のFuture（パーサーがない場合はNone）
+    """
+    if HTML_PARSER_BACKEND is None:
+        return None
+    future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def completed(result):
+    """
+    すでに結果が出ている値をFutureとして包む
+    """
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def shutdown_parser_pool():
+    """
+    解析用ワーカーを終了
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_parser_pool)
@@ -0,0 +1,119 @@
+import re
+import json
+from html import unescape
+from urllib.parse import urljoin
+
+# 画像URLを持つ属性（遅延読み込み用の属性を含む、優先順）
+IMAGE_URL_ATTRIBUTES = ("src", "data-src", "data-original", "data-lazy-src", "data-zoom-image", "srcset", "data-srcset")
+
+# 高解像度版に変換するときのサイズ
+UPSCALE_SIZE = "500x500"
+
+JSON_LD_PATTERN = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+OG_IMAGE_PATTERN = re.compile(r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+IMAGE_SIZE_PATTERN = re.compile(r'_ex=\d+x\d+')
+
+
+def urls_from_srcset(srcset):
+    """
+    srcset属性の値から画像URLを取り出す（"URL 2x, URL 640w" の形式）
+
+    Args:
+        srcset (str): srcset属性の値
+
+    Returns:
+        list: 画像URLのリスト（記述順）
+    """
+    urls = []
+    for candidate in (srcset or "").split(","):
+        parts = candidate.strip().split()
+        if parts:
+            urls.append(parts[0])
+    return urls
+
+
+def image_urls_from_attributes(attributes, base_url=None):
+    """
+    要素の属性から画像URLを1つ選ぶ（遅延読み込みの属性やsrcsetも見る）
+
+    Args:
+        attributes (dict): 属性名 -> 値
+        base_url (str): 相対URLを解決するためのページURL
+
+    Returns:
+        str: 画像URL（見つからない場合はNone）
+    """
+    for name in IMAGE_URL_ATTRIBUTES:
+        value = attributes.get(name) or ""
+        candidates = urls_from_srcset(value) if name.endswith("srcset") else [value]
+        # srcsetは最後の候補が最も大きい画像
+        for candidate in reversed(candidates):
+            url = urljoin(base_url, candidate) if base_url and candidate else candidate
+            if url.startswith("//"):
+                url = "https:" + url
+            if url.startswith("http"):
+                return url
+    return None
+
+
+def _collect_json_ld_images(value, urls):
+    """
+    JSON-LDのimage項目を再帰的に集める
+    """
+    if isinstance(value, list):
+        for item in value:
+            _collect_json_ld_images(item, urls)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key == "image":
+                for image in item if isinstance(item, list) else [item]:
+                    if isinstance(image, dict):
+                        image = image.get("url") or image.get("contentUrl")
+                    if isinstance(image, str) and image.startswith(("http", "//")):
+                        urls.append("https:" + image if image.startswith("//") else image)
+            else:
+                _collect_json_ld_images(item, urls)
+
+
+def page_state_image_urls(html):
+    """
+    ページに埋め込まれた構造化データ（JSON-LD、og:image）から商品画像のURLを取得
+
+    ギャラリーの要素から画像が見つからない場合の代替で、スクロールや描画を待たずに取得できる
+
+    Args:
+        html (str): ページのHTML
+
+    Returns:
+        dict: {"selector": 取得元, "urls": [...]}（見つからない場合はNone）
+    """
+    urls = []
+    for block in JSON_LD_PATTERN.findall(html or ""):
+        try:
+            _collect_json_ld_images(json.loads(block.strip()), urls)
+        except ValueError:
+            continue
+    if urls:
+        return {"selector": "json-ld", "urls": urls}
+
+    urls = [unescape(url) for url in OG_IMAGE_PATTERN.findall(html or "")]
+    if urls:
+        return {"selector": "og:image", "urls": urls}
+    return None
+
+
+def upscale_image_urls(urls, size=UPSCALE_SIZE, limit=None):
+    """
+    画像URLの重複を除き、サイズ指定（_ex=WxH）をまとめて高解像度版に変換
+
+    Args:
+        urls (list): 画像URLのリスト
+        size (str): 変換後のサイズ
+        limit (int): 返す最大件数
+
+    Returns:
+        list: 変換後の画像URLのリスト
+    """
+    upscaled = IMAGE_SIZE_PATTERN.sub(f"_ex={size}", "\n".join(dict.fromkeys(urls))).split("\n")
+    upscaled = [url for url in dict.fromkeys(upscaled) if url]
+    return upscaled[:limit] if limit is not None else upscaled
@@ -9,30 +9,283 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
 import re
 import os
+import threading
 import matplotlib.pyplot as plt
 import matplotlib as mpl
+from rakuten_rate_limiter import get_rate_limiter
+from rakuten_page_ready import PageBudget, wait_until, DEFAULT_PAGE_TIMEOUT
+from rakuten_network_capture import NetworkCapture, enable_performance_log, is_capture_enabled
+from rakuten_browser_profile import BrowserProfile, is_persistent_profile_enabled
+from rakuten_tab_loader import TabLoader, get_tab_count
+
+# スクレイププロファイルで読み込みをブロックするURLパターン
+# （DOMのテキストとsrc属性だけを読むため、画像・メディア・フォント・計測タグは不要）
+SCRAPE_BLOCKED_URL_PATTERNS = [
+    # 画像・メディア
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8",
+    # フォント
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # 広告・計測タグ
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*googleadservices.com*", "*facebook.net*", "*criteo.com*",
+    "*criteo.net*", "*rat.rakuten.co.jp*",
+]
+
+try:
+    import psutil
+except ImportError:
+    # psutilがない環境ではメモリ使用量による再起動は行わない
+    psutil = None
+
+# ドライバーを再起動する条件（環境変数で上書き可能、0で無効）
+DEFAULT_DRIVER_MAX_PAGES = 200
+DEFAULT_DRIVER_MAX_MINUTES = 30
+DEFAULT_DRIVER_MAX_RSS_MB = 1500
+
+# 解決済みのchromedriverのパスとブラウザのバージョンを保存するファイル（環境変数で上書き可能）
+DEFAULT_DRIVER_CACHE_PATH = os.path.join(".cache", "chromedriver.json")
+
+_driver_cache = None
+_driver_cache_lock = threading.Lock()
+
+
+def get_driver_cache_path():
+    """
+    chromedriverキャッシュファイルのパス（環境変数 RAKUTEN_DRIVER_CACHE で変更できる）
+    """
+    return os.environ.get('RAKUTEN_DRIVER_CACHE', DEFAULT_DRIVER_CACHE_PATH)
+
+
+def load_driver_cache():
+    """
+    キャッシュしたchromedriverの情報を取得
+
+    Returns:
+        dict: driver_path, browser_version, resolved_at（ないか、ドライバーが存在しない場合はNone）
+    """
+    global _driver_cache
+    with _driver_cache_lock:
+        if _driver_cache is None:
+            try:
+                with open(get_driver_cache_path(), encoding="utf-8") as f:
+                    _driver_cache = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+        driver_path = _driver_cache.get('driver_path')
+        if not driver_path or not os.path.isfile(driver_path) or not os.access(driver_path, os.X_OK):
+            _driver_cache = None
+            return None
+        return dict(_driver_cache)
+
+
+def save_driver_cache(driver_path, browser_version=None):
+    """
+    解決したchromedriverの情報を保存
+
+    Args:
+        driver_path (str): chromedriverのパス
+        browser_version (str): 起動したブラウザのバージョン
+    """
+    global _driver_cache
+    entry = {
+        "driver_path": driver_path,
+        "browser_version": browser_version,
+        "resolved_at": time.time()
+    }
+    path = get_driver_cache_path()
+    with _driver_cache_lock:
+        _driver_cache = entry
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"chromedriverのキャッシュを保存できませんでした: {e}")
+
+
+def clear_driver_cache():
+    """
+    キャッシュしたchromedriverの情報を削除（次回の起動で解決し直す）
+    """
+    global _driver_cache
+    with _driver_cache_lock:
+        _driver_cache = None
+        try:
+            os.remove(get_driver_cache_path())
+        except FileNotFoundError:
+            pass
+
+
+def install_chromedriver():
+    """
+    ChromeDriverManagerでchromedriverを解決（必要に応じてダウンロード）
+
+    Returns:
+        str: chromedriverのパス
+    """
+    # Streamlit Cloudなど、chromedriverのパスが指定されている環境ではそのまま使う
+    env_driver_path = os.environ.get('CHROMEDRIVER_PATH')
+    if env_driver_path and os.path.isfile(env_driver_path):
+        return env_driver_path
+
+    # 最新のwebdriver-managerでは、versionパラメータが削除されている
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    try:
+        # ChromeTypeを使用する方法を試す
+        try:
+            from webdriver_manager.core.utils import ChromeType
+            return ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+        except ImportError:
+            try:
+                from webdriver_manager.core.os_manager import ChromeType
+                return ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+            except ImportError:
+                # ChromeTypeが見つからない場合は、chrome_typeなしで実行
+                return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"ChromeTypeでのインストールに失敗: {e}")
+        # バージョン指定なしで最新を取得
+        return ChromeDriverManager().install()
+
+
+def start_chrome(chrome_options):
+    """
+    キャッシュしたchromedriverでChromeを起動（キャッシュがないか起動に失敗した場合は解決し直す）
+
+    Args:
+        chrome_options (Options): Chromeオプション
+
+    Returns:
+        WebDriver: Seleniumドライバー
+    """
+    cached = load_driver_cache()
+    if cached:
+        try:
+            driver = webdriver.Chrome(service=Service(cached['driver_path']), options=chrome_options)
+            browser_version = driver.capabilities.get('browserVersion')
+            if browser_version and browser_version != cached.get('browser_version'):
+                save_driver_cache(cached['driver_path'], browser_version)
+            return driver
+        except Exception as e:
+            # ブラウザの更新でドライバーが合わなくなった場合など
+            print(f"キャッシュしたchromedriverでの起動に失敗したため、解決し直します: {e}")
+            clear_driver_cache()
+
+    driver_path = install_chromedriver()
+    driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+    save_driver_cache(driver_path, driver.capabilities.get('browserVersion'))
+    return driver
+
+
+class DriverLifecyclePolicy:
+    def __init__(self, max_pages=None, max_minutes=None, max_rss_mb=None):
+        """
+        長時間の実行でChromeのメモリが増え続けないように、ドライバーを再起動する条件
+
+        Args:
+            max_pages (int): 再起動までに読み込むページ数（省略時は環境変数 RAKUTEN_DRIVER_MAX_PAGES）
+            max_minutes (float): 再起動までの経過時間（分、省略時は環境変数 RAKUTEN_DRIVER_MAX_MINUTES）
+            max_rss_mb (float): ChromeとChromeDriverの合計メモリ使用量の上限（MB、省略時は環境変数 RAKUTEN_DRIVER_MAX_RSS_MB）
+        """
+        if max_pages is None:
+            max_pages = int(os.environ.get('RAKUTEN_DRIVER_MAX_PAGES', DEFAULT_DRIVER_MAX_PAGES))
+        if max_minutes is None:
+            max_minutes = float(os.environ.get('RAKUTEN_DRIVER_MAX_MINUTES', DEFAULT_DRIVER_MAX_MINUTES))
+        if max_rss_mb is None:
+            max_rss_mb = float(os.environ.get('RAKUTEN_DRIVER_MAX_RSS_MB', DEFAULT_DRIVER_MAX_RSS_MB))
+        self.max_pages = max_pages
+        self.max_minutes = max_minutes
+        self.max_rss_mb = max_rss_mb
+
+    def recycle_reason(self, browser):
+        """
+        ドライバーを再起動すべき理由
+
+        Args:
+            browser (RakutenInit): 確認するブラウザ
+
+        Returns:
+            str: 再起動の理由（再起動不要の場合はNone）
+        """
+        if self.max_pages and browser.pages_loaded >= self.max_pages:
+            return f"{browser.pages_loaded}ページを読み込みました"
+
+        minutes = (time.monotonic() - browser.started_at) / 60
+        if self.max_minutes and minutes >= self.max_minutes:
+            return f"起動から{minutes:.0f}分経過しました"
+
+        if self.max_rss_mb:
+            rss_mb = browser.browser_rss_mb()
+            if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                return f"メモリ使用量が{rss_mb:.0f}MBに達しました"
+        return None
+
 
 class RakutenInit:
-    def __init__(self, application_id):
+    def __init__(self, application_id, lifecycle=None):
         self.application_id = application_id
         self.driver = None
         self.wait = None
+        self.rate_limiter = get_rate_limiter()
+        self.page_budget = None
+        self.loaded_url = None
+        self.scrape_profile = False
+        self.network_capture = None
+        self.tab_loader = None
+        self.profile = None
+        self.driver_options = {}
+        self.lifecycle = lifecycle or DriverLifecyclePolicy()
+        self.pages_loaded = 0
+        self.started_at = time.monotonic()
 
-    def initialize_selenium(self, headless=True):
+    def initialize_selenium(self, headless=True, scrape_profile=False, network_capture=None, persistent_profile=None):
         """
         Seleniumドライバーの初期化
         
         Args:
             headless (bool): ヘッドレスモードで実行するかどうか
+            scrape_profile (bool): 画像・フォント・計測タグの読み込みを止める軽量プロファイルを使うかどうか
+            network_capture (bool): ページが読み込んだJSONをPerformanceログから取得するかどうか（省略時は環境変数 RAKUTEN_NETWORK_CAPTURE）
+            persistent_profile (bool): ディスクキャッシュを残す永続プロファイルを使うかどうか（省略時は環境変数 RAKUTEN_PERSISTENT_PROFILE）
         """
+        if network_capture is None:
+            network_capture = is_capture_enabled()
+        if persistent_profile is None:
+            persistent_profile = is_persistent_profile_enabled()
+        self.driver_options = dict(
+            headless=headless, scrape_profile=scrape_profile,
+            network_capture=network_capture, persistent_profile=persistent_profile
+        )
         chrome_options = Options()
         if headless:
             chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         
+        if scrape_profile:
+            self.apply_scrape_profile(chrome_options)
+        
+        if network_capture:
+            enable_performance_log(chrome_options)
+        
+        if persistent_profile:
+            # 共通のJS・CSSをディスクキャッシュから読み込めるように、ドライバーごとのプロファイルを使う
+            self.profile = BrowserProfile()
+            if self.profile.acquire():
+                self.profile.apply(chrome_options)
+            else:
+                self.profile = None
+        
         # Streamlit Cloud環境用の設定
         is_streamlit_cloud = os.environ.get('STREAMLIT_SHARING', '') or os.environ.get('STREAMLIT_CLOUD', '')
         
@@ -45,27 +298,8 @@ class RakutenInit:
             os.environ['CHROMEDRIVER_PATH'] = '/usr/bin/chromedriver'
         
         try:
-            # 最新のwebdriver-managerでは、versionパラメータが削除されている
-            from webdriver_manager.chrome import ChromeDriverManager
-            
-            try:
-                # ChromeTypeを使用する方法を試す
-                try:
-                    from webdriver_manager.core.utils import ChromeType
-                    service = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
-                except ImportError:
-                    try:
-                        from webdriver_manager.core.os_manager import ChromeType
-                        service = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
-                    except ImportError:
-                        # ChromeTypeが見つからない場合は、chrome_typeなしで実行
-                        service = Service(ChromeDriverManager().install())
-            except Exception as e:
-                print(f"ChromeTypeでのインストールに失敗: {e}")
-                # バージョン指定なしで最新を取得
-                service = Service(ChromeDriverManager().install())
-            
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # 解決済みのchromedriverがあれば、ChromeDriverManagerを通さずに起動
+            self.driver = start_chrome(chrome_options)
             
         except Exception as e:
             print(f"ChromeDriverManagerでのインストールに失敗: {e}")
@@ -76,4 +310,261 @@ class RakutenInit:
             except Exception as e2:
                 print(f"Chromeドライバーの初期化に完全に失敗しました: {e2}")
                 self.driver = None
-                raise Exception("Seleniumドライバーの初期化に失敗しました")
\ No newline at end of file
+                self.release_profile()
+                raise Exception("Seleniumドライバーの初期化に失敗しました")
+        
+        self.pages_loaded = 0
+        self.started_at = time.monotonic()
+        self.scrape_profile = scrape_profile
+        if scrape_profile:
+            self.block_scrape_resources()
+        
+        if network_capture:
+            self.network_capture = NetworkCapture(self.driver)
+            self.network_capture.enable()
+        
+        # 複数タブでの先読みは、CDPでタブに接続できる場合だけ使う
+        # （Performanceログは操作中のタブしか記録しないため、ネットワークキャプチャ中は使わない）
+        tabs = get_tab_count()
+        if tabs > 1 and not network_capture and TabLoader.is_supported(self.driver):
+            blocked_urls = SCRAPE_BLOCKED_URL_PATTERNS if scrape_profile else None
+            self.tab_loader = TabLoader(self, tabs, blocked_urls=blocked_urls)
+
+    def apply_scrape_profile(self, chrome_options):
+        """
+        スクレイプ用の軽量設定をChromeオプションに追加
+        
+        Args:
+            chrome_options (Options): Chromeオプション
+        """
+        # DOMContentLoadedで制御を返す（画像やサブリソースの完了を待たない）
+        chrome_options.page_load_strategy = "eager"
+        
+        # 画像・通知を無効化
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-remote-fonts")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--disable-extensions")
+
+    def block_scrape_resources(self):
+        """
+        CDPで画像・メディア・フォント・計測タグのURLをブロック
+        """
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": SCRAPE_BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            # CDPが使えない環境ではChromeの設定だけで続行
+            print(f"CDPによるURLブロックの設定に失敗: {e}")
+
+    def load_page(self, url, ready=None, timeout=DEFAULT_PAGE_TIMEOUT):
+        """
+        ページを読み込み、読み込み完了条件を満たすまで待機
+        
+        Args:
+            url (str): 読み込むURL
+            ready (callable): 読み込み完了条件（rakuten_page_readyの条件）
+            timeout (float): このページで待機できる合計秒数
+            
+        Returns:
+            PageBudget: このページの残り待機時間（以降の待機で共有する）
+        """
+        # 読み込み前に、長く使ったドライバーや応答しないドライバーを再起動
+        self.recycle_if_needed()
+        
+        self.loaded_url = None
+        # 別のタブで読み込み済みのページは、そのタブに切り替えて使う（レート制限はタブで読み込みを始めたときに適用済み）
+        if self.tab_loader is not None and self.tab_loader.has(url):
+            budget = PageBudget(timeout)
+            if self.tab_loader.activate(url, ready, budget):
+                self.pages_loaded += 1
+                if self.scrape_profile:
+                    self.block_scrape_resources()
+                self.loaded_url = url
+                self.page_budget = budget
+                return self.page_budget
+        
+        self.rate_limiter.acquire(url)
+        try:
+            self._navigate(url)
+        except WebDriverException as e:
+            if self.is_responsive():
+                raise
+            # ドライバーがクラッシュしていれば起動し直して読み込みをやり直す（バッチの後続の商品を失敗させない）
+            print(f"ドライバーが応答しないため再起動します: {e}")
+            self.restart()
+            self._navigate(url)
+        self.loaded_url = url
+        self.page_budget = PageBudget(timeout)
+        
+        if ready is not None and not wait_until(self.driver, ready, self.page_budget):
+            print(f"読み込み完了条件を満たす前に待機時間を超えました: {url}")
+        
+        return self.page_budget
+
+    def prefetch_pages(self, urls):
+        """
+        これから読み込むページを別のタブで読み込み始める（タブを使わない設定では何もしない）
+        
+        Args:
+            urls (list): これから読み込む順のページのURL
+        """
+        if self.tab_loader is None:
+            return
+        try:
+            self.tab_loader.prefetch(urls)
+        except Exception as e:
+            print(f"タブでの先読みに失敗しました: {e}")
+
+    def close_tabs(self):
+        """
+        先読み用のタブをすべて閉じる
+        """
+        if self.tab_loader is not None:
+            self.tab_loader.close_all()
+
+    def _navigate(self, url):
+        """
+        ページに移動（ネットワークキャプチャ中はこのページのレスポンスだけを残す）
+        """
+        if self.network_capture is not None:
+            self.network_capture.drain()
+        self.driver.get(url)
+        self.pages_loaded += 1
+
+    def is_responsive(self):
+        """
+        ドライバーが応答するか確認
+        
+        Returns:
+            bool: 正常に応答する場合はTrue
+        """
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def browser_rss_mb(self):
+        """
+        ChromeDriverとその子プロセス（Chrome）の合計メモリ使用量
+        
+        Returns:
+            float: メモリ使用量（MB、psutilがない・測定できない場合はNone）
+        """
+        if psutil is None or self.driver is None:
+            return None
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except Exception:
+            return None
+
+        rss = 0
+        for child in processes:
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return rss / (1024 * 1024)
+
+    def quit(self):
+        """
+        ドライバーを終了
+        """
+        try:
+            if self.tab_loader is not None:
+                # タブはドライバーと一緒に閉じるので、接続だけ閉じる
+                for tab in self.tab_loader.loading.values():
+                    tab.close()
+            if self.driver:
+                self.driver.quit()
+        except Exception as e:
+            print(f"ドライバー終了中にエラー: {e}")
+        self.driver = None
+        self.tab_loader = None
+        self.loaded_url = None
+        self.release_profile()
+
+    def release_profile(self):
+        """
+        永続プロファイルを解放（ほかのドライバーが使えるようにする）
+        """
+        if self.profile is not None:
+            self.profile.release()
+            self.profile = None
+
+    def restart(self):
+        """
+        ドライバーを終了して同じ設定で起動し直す
+        """
+        self.quit()
+        self.initialize_selenium(**self.driver_options)
+
+    def recycle_if_needed(self):
+        """
+        再起動の条件を満たしている、または応答しない場合にドライバーを再起動
+        
+        Returns:
+            bool: 再起動した場合はTrue
+        """
+        reason = self.lifecycle.recycle_reason(self)
+        if reason is None and self.pages_loaded and not self.is_responsive():
+            reason = "ドライバーが応答しません"
+        if reason is None:
+            return False
+        
+        print(f"ドライバーを再起動します（{reason}）")
+        self.restart()
+        return True
+
+
+def benchmark_startup(runs=3, headless=True, scrape_profile=False):
+    """
+    ドライバー起動時間を計測（chromedriverの解決を含むコールドスタートと、キャッシュを使うウォームスタート）
+
+    コールドスタートの計測前にはchromedriverのキャッシュファイルを削除し、ChromeDriverManagerで解決し直させる。
+    計測ごとにquitでドライバーを終了し、永続プロファイルも解放する（次の計測で同じプロファイルを使えるように）
+
+    Args:
+        runs (int): それぞれの計測回数
+        headless (bool): ヘッドレスモードで実行するかどうか
+        scrape_profile (bool): 軽量プロファイルを使うかどうか
+
+    Returns:
+        dict: cold / warm の平均起動時間（秒）と各回の計測値
+    """
+    timings = {"cold": [], "warm": []}
+
+    for i in range(runs):
+        for mode in ("cold", "warm"):
+            if mode == "cold":
+                clear_driver_cache()
+
+            rakuten_init = RakutenInit(None)
+            try:
+                start = time.perf_counter()
+                rakuten_init.initialize_selenium(headless=headless, scrape_profile=scrape_profile)
+                elapsed = time.perf_counter() - start
+            finally:
+                rakuten_init.quit()
+            timings[mode].append(elapsed)
+            print(f"{i+1}回目 {mode}: {elapsed:.2f}秒")
+
+    result = {
+        "cold": sum(timings["cold"]) / runs,
+        "warm": sum(timings["warm"]) / runs,
+        "timings": timings
+    }
+    print(f"平均起動時間 cold: {result['cold']:.2f}秒 / warm: {result['warm']:.2f}秒")
+    return result
+
+
+# 使用例
+if __name__ == "__main__":
+    benchmark_startup()
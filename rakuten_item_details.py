@@ -10,21 +10,37 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from rakuten_init import RakutenInit
+from rakuten_pooled_browser import PooledBrowserMixin
+from rakuten_api_client import get_api_client
+from rakuten_page_snapshot import SnapshotCache
+from rakuten_tiered_fetcher import TieredFetcher
+from rakuten_page_extractor import extract_item_page
+from rakuten_html_parser import submit_parse, run_parse, completed, parse_item_page
+from rakuten_batch_runner import BatchRunner, get_batch_workers
+from rakuten_image_urls import upscale_image_urls
+from rakuten_page_ready import wait_until, element_present
 import re
 import os
 
-class RakutenItemDetails:
-    def __init__(self, application_id):
+class RakutenItemDetails(PooledBrowserMixin):
+    def __init__(self, application_id, scrape_profile=False):
         """
         楽天商品情報取得ツールの初期化
         
         Args:
             application_id (str): 楽天APIのアプリケーションID
+            scrape_profile (bool): 画像・フォント・計測タグを読み込まない軽量プロファイルでChromeを起動するかどうか
         """
         self.application_id = application_id
         self.base_url = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
         self.item_url = "https://app.rakuten.co.jp/services/api/IchibaItem/Get/20170706"
-        self.driver = None
+        self.browser = None
+        self.driver_pool = None
+        self.scrape_profile = scrape_profile
+        self.api_client = get_api_client()
+        self.fetcher = TieredFetcher(self.api_client)
+        self.snapshots = SnapshotCache(fetcher=self.fetcher)
+        self.headless = True
         
         
     def get_item_by_id(self, item_id):
@@ -47,8 +63,7 @@ class RakutenItemDetails:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            result = response.json()
+            result = self.api_client.get_json(self.base_url, params=params)
             
             # 検索結果がある場合
             if 'Items' in result and len(result['Items']) > 0:
@@ -84,20 +99,26 @@ class RakutenItemDetails:
         Returns:
             dict: 追加情報（レビュー数、評価、Q&A数など）
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
-        self.driver.get(item_url)
-        time.sleep(3)  # ページ読み込み待機時間
+        return self.build_additional_info(self.load_additional_info(item_url, background=False))
+    
+    def load_additional_info(self, item_url, background=True):
+        """
+        商品ページを取得し、描画後のHTMLの解析をワーカーに依頼（解析の完了は待たない）
         
-        additional_info = {}
+        HTTPで取得したHTMLですべての項目が揃う場合はChromeを使わない
         
-        try:
-            # ページのタイトルを取得（デバッグ用）
-            print(f"ページタイトル: {self.driver.title}")
+        解析中に次のページを読み込めるように、結果の組み立てはbuild_additional_infoで行う
+        
+        Args:
+            item_url (str): 商品ページのURL
+            background (bool): 解析をワーカーに依頼するかどうか（Falseの場合は結果をすぐに使うためこのプロセスで解析する）
             
+        Returns:
+            dict: 解析待ちの情報（build_additional_infoに渡す）
+        """
+        pending = {'url': item_url, 'selectors': {}, 'http': {}, 'page': None}
+        
+        try:
             # レビュー情報の取得（複数のセレクタを試す）
             review_selectors = [
                 "span[itemprop='aggregateRating']",
@@ -106,20 +127,82 @@ class RakutenItemDetails:
                 "div.item-review-area"
             ]
             
-            review_element = None
-            for selector in review_selectors:
-                try:
-                    review_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if review_element:
-                        print(f"レビュー要素が見つかりました: {selector}")
-                        break
-                except:
-                    continue
+            # 商品説明の取得
+            description_selectors = [
+                "div.item-description",
+                "div.itemDescription",
+                "div#item-description",
+                "div.item-exp"
+            ]
+            
+            # 画像の取得（指定されたクラス名 'image--3z5RH' を優先し、なければ他の一般的な画像セレクタを試す）
+            image_selectors = [
+                ".image--3z5RH",
+                "div.image-gallery img",
+                "div.item-image-container img",
+                "div.item-image img",
+                "div.item-gallery img",
+                "div.item-photo img"
+            ]
+            
+            pending['selectors'] = dict(review_selectors=review_selectors, description_selectors=description_selectors, image_selectors=image_selectors)
+            
+            # まずHTTPで取得したHTMLから抽出し、足りない項目がある場合だけChromeで読み込む（スナップショットと同じHTMLを使う）
+            pending['http'], missing = self.fetcher.fetch_item_page(item_url, page=self.snapshots.get_html(item_url), **pending['selectors'])
+            if not missing:
+                print("HTTPで取得したHTMLからすべての項目を取得しました")
+                return pending
+            print(f"HTTPで取得できなかった項目をChromeで取得します: {', '.join(missing)}")
+            
+            # 商品ページの読み込み完了（grp15_ias_prmやレビュー要素の描画）まで待機（読み込み済みなら再利用）
+            snapshot = self._get_snapshot(item_url, live=True)
+            
+            # ページのタイトルを取得（デバッグ用）
+            print(f"ページタイトル: {snapshot.title}")
             
-            if review_element:
-                review_text = review_element.text
+            # いずれかのレビュー要素が描画されるまでまとめて待機
+            wait_until(self.driver, element_present(*review_selectors), self.browser.page_budget, timeout=5)
+            
+            # 描画後のHTMLを1回だけ取得して解析する（パーサーが使えない場合はブラウザ上で抽出）
+            parse = submit_parse if background else run_parse
+            pending['page'] = parse(parse_item_page, self.driver.page_source, item_url, **pending['selectors'])
+            if pending['page'] is None:
+                pending['page'] = completed(extract_item_page(self.driver, **pending['selectors']))
+            
+            # 別のページに移動する前に、解析できなかった項目を要素から補えるようにする
+            self._track_live_page(pending)
+            
+        except Exception as e:
+            print(f"追加情報の取得中にエラーが発生しました: {e}")
+            
+        return pending
+    
+    def build_additional_info(self, pending):
+        """
+        HTMLの解析結果から追加情報を組み立てる
+        
+        Args:
+            pending (dict): load_additional_infoの戻り値
+            
+        Returns:
+            dict: 追加情報（レビュー数、評価、Q&A数など）
+        """
+        additional_info = {}
+        
+        try:
+            # 解析できなかった項目は、ブラウザがまだ同じページを表示していれば要素から取得
+            page_data = self._page_data(pending)
+            
+            # HTTPで取得できた項目を優先し、足りない項目だけChromeの結果で補う（項目ごとの取得方法を記録）
+            page_data = self.fetcher.merge_item_page(pending['url'], pending['http'], page_data, pending['selectors'])
+            
+            review = page_data.get('review')
+            description = page_data.get('description')
+            images = page_data.get('images')
+            
+            if review:
+                print(f"レビュー要素が見つかりました: {review['selector']}")
+                review_text = review['text']
                 print(f"レビューテキスト: {review_text}")
                 
                 # 評価点数を抽出
@@ -133,140 +216,131 @@ class RakutenItemDetails:
                     additional_info['reviewCount'] = int(review_count_match.group(1).replace(',', ''))
             else:
                 print("レビュー要素が見つかりませんでした")
-                
-            # 商品説明の取得
-            description_selectors = [
-                "div.item-description",
-                "div.itemDescription",
-                "div#item-description",
-                "div.item-exp"
-            ]
             
-            for selector in description_selectors:
-                try:
-                    description = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                    if description:
-                        additional_info['description'] = description
-                        break
-                except:
-                    continue
+            additional_info['description'] = description['text'] if description else "説明が見つかりません"
             
-            if 'description' not in additional_info:
-                additional_info['description'] = "説明が見つかりません"
+            if images:
+                print(f"'{images['selector']}' の画像要素から {len(images['urls'])} 件のURLを取得しました")
                 
-            # 指定されたクラス名の画像を取得
-            try:
-                print("指定されたクラス名 'image--3z5RH' の画像を取得中...")
+                # 重複を除いて高解像度版にまとめて変換
+                image_urls = upscale_image_urls(images['urls'])
                 
-                # ページが完全に読み込まれるのを待つ
-                time.sleep(2)
+                print(f"取得した画像URL数: {len(image_urls)}")
                 
-                # JavaScriptを実行して遅延読み込み画像を表示させる
-                self.driver.execute_script("""
-                    // 画面をスクロールして遅延読み込み画像を表示
-                    window.scrollTo(0, document.body.scrollHeight / 2);
-                    setTimeout(() => { window.scrollTo(0, 0); }, 500);
-                """)
-                time.sleep(2)
+                # 最大20枚まで保存
+                for i, img_url in enumerate(image_urls[:20]):
+                    additional_info[f'imageUrl_{i+1}'] = img_url
                 
-                # 指定されたクラスの画像要素を取得
-                image_elements = self.driver.find_elements(By.CSS_SELECTOR, ".image--3z5RH")
+                # 画像の総数も保存
+                additional_info['imageCount'] = len(image_urls[:20])
                 
-                if image_elements:
-                    print(f"'image--3z5RH' クラスの画像要素が {len(image_elements)} 個見つかりました")
-                    
-                    # 画像URLを格納するリスト
-                    image_urls = []
-                    
-                    # 各画像要素からURLを取得
-                    for img in image_elements:
-                        try:
-                            # src属性を確認
-                            src = img.get_attribute('src')
-                            if src and src.startswith('http'):
-                                image_urls.append(src)
-                            else:
-                                # data-src属性を確認
-                                data_src = img.get_attribute('data-src')
-                                if data_src and data_src.startswith('http'):
-                                    image_urls.append(data_src)
-                        except Exception as e:
-                            print(f"画像URL取得中にエラー: {e}")
-                    
-                    # 重複を削除
-                    image_urls = list(dict.fromkeys(image_urls))
-                    
-                    # 高解像度版に変換
-                    image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in image_urls]
-                    
-                    print(f"取得した画像URL数: {len(image_urls)}")
-                    
-                    # 最大20枚まで保存
-                    for i, img_url in enumerate(image_urls[:20]):
-                        additional_info[f'imageUrl_{i+1}'] = img_url
-                    
-                    # 画像の総数も保存
-                    additional_info['imageCount'] = len(image_urls[:20])
-                    
-                    # すべての画像URLをパイプ区切りで保存
-                    additional_info['allImageUrls'] = '|'.join(image_urls[:20])
-                else:
-                    print("'image--3z5RH' クラスの画像要素が見つかりませんでした")
-                    
-                    # 代替方法：他の一般的な画像セレクタを試す
-                    alternative_selectors = [
-                        "div.image-gallery img",
-                        "div.item-image-container img",
-                        "div.item-image img",
-                        "div.item-gallery img",
-                        "div.item-photo img"
-                    ]
-                    
-                    for selector in alternative_selectors:
-                        try:
-                            alt_images = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            if alt_images:
-                                print(f"代替セレクタ '{selector}' で {len(alt_images)} 個の画像を発見")
-                                
-                                # 画像URLを格納するリスト
-                                alt_image_urls = []
-                                
-                                # 各画像要素からURLを取得
-                                for img in alt_images:
-                                    src = img.get_attribute('src') or img.get_attribute('data-src')
-                                    if src and src.startswith('http'):
-                                        alt_image_urls.append(src)
-                                
-                                if alt_image_urls:
-                                    # 重複を削除
-                                    alt_image_urls = list(dict.fromkeys(alt_image_urls))
-                                    
-                                    # 高解像度版に変換
-                                    alt_image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in alt_image_urls]
-                                    
-                                    # 最大20枚まで保存
-                                    for i, img_url in enumerate(alt_image_urls[:20]):
-                                        additional_info[f'imageUrl_{i+1}'] = img_url
-                                    
-                                    # 画像の総数も保存
-                                    additional_info['imageCount'] = len(alt_image_urls[:20])
-                                    
-                                    # すべての画像URLをパイプ区切りで保存
-                                    additional_info['allImageUrls'] = '|'.join(alt_image_urls[:20])
-                                    
-                                    break
-                        except Exception as e:
-                            print(f"代替画像取得中にエラー: {e}")
-            
-            except Exception as e:
-                print(f"画像取得処理中にエラーが発生しました: {e}")
+                # すべての画像URLをパイプ区切りで保存
+                additional_info['allImageUrls'] = '|'.join(image_urls[:20])
+            else:
+                print("画像要素が見つかりませんでした")
             
         except Exception as e:
             print(f"追加情報の取得中にエラーが発生しました: {e}")
             
         return additional_info
     
-    def get_items_details(self, item_ids, progress_callback=None, headless=True):
+    def fetch_item_info(self, item_id, debug=False):
+        """
+        商品IDからAPIで基本情報を取得
+        
+        Args:
+            item_id (str): 楽天商品ID
+            debug (bool): APIレスポンスの構造を出力するかどうか
+            
+        Returns:
+            dict: 基本情報（商品が見つからない場合はNone）
+        """
+        # APIから商品情報を取得
+        api_result = self.get_item_by_id(item_id)
+        
+        # デバッグ用にAPIレスポンスの構造を確認
+        if debug:
+            print("APIレスポンス構造:", json.dumps(api_result, indent=2, ensure_ascii=False)[:500] + "...")
+        
+        # APIからの応答を確認
+        if 'Items' not in api_result or len(api_result['Items']) == 0:
+            print(f"商品ID {item_id} の情報が見つかりませんでした。")
+            return None
+        
+        # 商品情報を取得
+        item_data = api_result['Items'][0]
+        
+        # formatVersion=2の場合、直接itemデータが含まれている可能性があります
+        if isinstance(item_data, dict) and 'Item' in item_data:
+            item = item_data['Item']
+        else:
+            # 直接itemデータとして扱う
+            item = item_data
+        
+        # APIから取得した基本情報
+        item_info = {
+            'itemId': item_id,
+            'itemName': item.get('itemName', '不明'),
+            'itemPrice': item.get('itemPrice', 0),
+            'itemUrl': item.get('itemUrl', ''),
+            'shopName': item.get('shopName', '不明'),
+            'itemCode': item.get('itemCode', ''),
+            'imageUrl': None,  # デフォルト値をNoneに設定
+            'availability': item.get('availability', ''),
+            'taxFlag': item.get('taxFlag', 0),
+            'postageFlag': item.get('postageFlag', 0),
+            'creditCardFlag': item.get('creditCardFlag', 0),
+            'reviewCount': item.get('reviewCount', 0),
+            'reviewAverage': item.get('reviewAverage', 0),
+            'pointRate': item.get('pointRate', 0),
+            'pointRateStartTime': item.get('pointRateStartTime', ''),
+            'pointRateEndTime': item.get('pointRateEndTime', ''),
+            'shopOfTheYearFlag': item.get('shopOfTheYearFlag', 0),
+            'shipOverseasFlag': item.get('shipOverseasFlag', 0),
+            'shipOverseasArea': item.get('shipOverseasArea', ''),
+            'asurakuFlag': item.get('asurakuFlag', 0),
+            'asurakuClosingTime': item.get('asurakuClosingTime', ''),
+            'asurakuArea': item.get('asurakuArea', ''),
+            'affiliateRate': item.get('affiliateRate', 0),
+            'startTime': item.get('startTime', ''),
+            'endTime': item.get('endTime', ''),
+            'giftFlag': item.get('giftFlag', 0),
+            'tagIds': ','.join(map(str, item.get('tagIds', []))),
+        }
+        
+        # 画像URLの取得を安全に行う
+        try:
+            # 単一の画像URL（メイン画像）
+            medium_image_urls = item.get('mediumImageUrls')
+            if medium_image_urls:
+                if isinstance(medium_image_urls, list) and len(medium_image_urls) > 0:
+                    if isinstance(medium_image_urls[0], dict) and 'imageUrl' in medium_image_urls[0]:
+                        item_info['imageUrl'] = medium_image_urls[0]['imageUrl']
+                    elif isinstance(medium_image_urls[0], str):
+                        item_info['imageUrl'] = medium_image_urls[0]
+                elif isinstance(medium_image_urls, str):
+                    item_info['imageUrl'] = medium_image_urls
+        except Exception as e:
+            print(f"画像URL取得中にエラーが発生しました: {e}")
+        
+        return item_info
+    
+    def get_item_details(self, item_id):
+        """
+        商品IDから基本情報と商品ページの追加情報を取得（並列実行時にワーカーで1件ずつ処理する単位）
+        
+        Args:
+            item_id (str): 楽天商品ID
+            
+        Returns:
+            dict: 商品詳細情報（商品が見つからない場合はNone）
+        """
+        item_info = self.fetch_item_info(item_id)
+        if item_info and item_info['itemUrl']:
+            item_info.update(self.get_additional_info(item_info['itemUrl']))
+        return item_info
+    
+    def get_items_details(self, item_ids, progress_callback=None, headless=True, workers=None):
         """
         複数の商品IDから詳細情報を取得
         
@@ -274,6 +348,7 @@ class RakutenItemDetails:
             item_ids (list): 楽天商品IDのリスト
             progress_callback (callable): 進捗を報告するコールバック関数
             headless (bool): ヘッドレスモードで実行するかどうか
+            workers (int): 並列に処理するワーカープロセス数（省略時は環境変数 RAKUTEN_BATCH_WORKERS）
             
         Returns:
             pandas.DataFrame: 商品詳細情報
@@ -285,108 +360,66 @@ class RakutenItemDetails:
         
         # 結果を格納するリスト
         results = []
+        pendings = []
         
-        # Seleniumの初期化
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium(headless=headless)
-            self.driver = rakuten_init.driver
+        # Seleniumドライバーは、HTTPで取得できない項目があったときに共有プールから借りる
+        self.headless = headless
         
-        # 各商品IDの詳細情報を取得
-        for i, item_id in enumerate(item_ids):
-            if progress_callback:
-                progress_callback(i+1, len(item_ids), f"商品 {i+1}/{len(item_ids)} の情報を取得中: {item_id}")
-            else:
-                print(f"商品 {i+1}/{len(item_ids)} の情報を取得中: {item_id}")
-            
-            # APIから商品情報を取得
-            api_result = self.get_item_by_id(item_id)
-            
-            # デバッグ用にAPIレスポンスの構造を確認（最初の商品のみ）
-            if i == 0:
-                print("APIレスポンス構造:", json.dumps(api_result, indent=2, ensure_ascii=False)[:500] + "...")
-            
-            # APIからの応答を確認
-            if 'Items' not in api_result or len(api_result['Items']) == 0:
-                print(f"商品ID {item_id} の情報が見つかりませんでした。")
-                continue
-            
-            # 商品情報を取得
-            item_data = api_result['Items'][0]
+        if get_batch_workers(workers) > 1 and len(item_ids) > 1:
+            # ワーカーごとにドライバーを持たせて並列に処理し、結果は元の順序に並べ直す
+            runner = BatchRunner(
+                RakutenItemDetails,
+                args=(self.application_id,),
+                kwargs={'scrape_profile': self.scrape_profile},
+                attributes={'headless': headless},
+                workers=workers
+            )
+            # 見つからなかった商品は順次処理の場合と同じく除き、すべての試行に失敗した商品はエラーの行として残す
+            results = [
+                item_info for item_info in runner.run(
+                    'get_item_details',
+                    item_ids,
+                    progress_callback=progress_callback,
+                    on_failure=lambda item_id, error: {'itemId': item_id, 'error': error}
+                )
+                if item_info
+            ]
+            failed = [item_info['itemId'] for item_info in results if 'error' in item_info]
+            if failed:
+                print(f"{len(failed)}件の商品の情報を取得できませんでした: {', '.join(map(str, failed))}")
+            self.fetcher.merge_counts(runner.counts)
+        else:
+            # 各商品IDの詳細情報を取得
+            for i, item_id in enumerate(item_ids):
+                if progress_callback:
+                    progress_callback(i+1, len(item_ids), f"商品 {i+1}/{len(item_ids)} の情報を取得中: {item_id}")
+                else:
+                    print(f"商品 {i+1}/{len(item_ids)} の情報を取得中: {item_id}")
+                
+                # APIから商品情報を取得（デバッグ用にAPIレスポンスの構造を確認するのは最初の商品のみ）
+                item_info = self.fetch_item_info(item_id, debug=(i == 0))
+                if item_info is None:
+                    continue
+                
+                # 商品URLが存在する場合のみSeleniumで追加情報を取得（HTMLの解析は次の商品ページの読み込みと並行して行い、
+                # 解析できなかった項目を要素から補う処理は次の商品ページに移動する前に行う）
+                if item_info['itemUrl']:
+                    pendings.append((item_info, self.load_additional_info(item_info['itemUrl'])))
+                
+                results.append(item_info)
             
-            # formatVersion=2の場合、直接itemデータが含まれている可能性があります
-            if isinstance(item_data, dict) and 'Item' in item_data:
-                item = item_data['Item']
-            else:
-                # 直接itemデータとして扱う
-                item = item_data
-            
-            # APIから取得した基本情報
-            item_info = {
-                'itemId': item_id,
-                'itemName': item.get('itemName', '不明'),
-                'itemPrice': item.get('itemPrice', 0),
-                'itemUrl': item.get('itemUrl', ''),
-                'shopName': item.get('shopName', '不明'),
-                'itemCode': item.get('itemCode', ''),
-                'imageUrl': None,  # デフォルト値をNoneに設定
-                'availability': item.get('availability', ''),
-                'taxFlag': item.get('taxFlag', 0),
-                'postageFlag': item.get('postageFlag', 0),
-                'creditCardFlag': item.get('creditCardFlag', 0),
-                'reviewCount': item.get('reviewCount', 0),
-                'reviewAverage': item.get('reviewAverage', 0),
-                'pointRate': item.get('pointRate', 0),
-                'pointRateStartTime': item.get('pointRateStartTime', ''),
-                'pointRateEndTime': item.get('pointRateEndTime', ''),
-                'shopOfTheYearFlag': item.get('shopOfTheYearFlag', 0),
-                'shipOverseasFlag': item.get('shipOverseasFlag', 0),
-                'shipOverseasArea': item.get('shipOverseasArea', ''),
-                'asurakuFlag': item.get('asurakuFlag', 0),
-                'asurakuClosingTime': item.get('asurakuClosingTime', ''),
-                'asurakuArea': item.get('asurakuArea', ''),
-                'affiliateRate': item.get('affiliateRate', 0),
-                'startTime': item.get('startTime', ''),
-                'endTime': item.get('endTime', ''),
-                'giftFlag': item.get('giftFlag', 0),
-                'tagIds': ','.join(map(str, item.get('tagIds', []))),
-            }
-            
-            # 画像URLの取得を安全に行う
-            try:
-                # 単一の画像URL（メイン画像）
-                medium_image_urls = item.get('mediumImageUrls')
-                if medium_image_urls:
-                    if isinstance(medium_image_urls, list) and len(medium_image_urls) > 0:
-                        if isinstance(medium_image_urls[0], dict) and 'imageUrl' in medium_image_urls[0]:
-                            item_info['imageUrl'] = medium_image_urls[0]['imageUrl']
-                        elif isinstance(medium_image_urls[0], str):
-                            item_info['imageUrl'] = medium_image_urls[0]
-                    elif isinstance(medium_image_urls, str):
-                        item_info['imageUrl'] = medium_image_urls
-            except Exception as e:
-                print(f"画像URL取得中にエラーが発生しました: {e}")
-            
-            # 商品URLが存在する場合のみSeleniumで追加情報を取得
-            if item_info['itemUrl']:
-                additional_info = self.get_additional_info(item_info['itemUrl'])
-                # 基本情報と追加情報を結合
-                item_info.update(additional_info)
-            
-            results.append(item_info)
-            
-            # APIの制限に引っかからないよう少し待機
-            time.sleep(1)
-        
-        # Seleniumドライバーを閉じる
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+            # 解析結果を待って基本情報と追加情報を結合
+            for item_info, pending in pendings:
+                item_info.update(self.build_additional_info(pending))
+        
+        # Seleniumドライバーをプールに返却
+        self._release_driver()
         
         # 結果をデータフレームに変換
         df = pd.DataFrame(results)
         
         print("商品情報の取得が完了しました。")
+        print(f"項目ごとの取得方法: {self.fetcher.stats()}")
         return df
     
     def save_results(self, df, filename="rakuten_item_details.xlsx"):
@@ -408,14 +441,6 @@ class RakutenItemDetails:
             print(f"openpyxlモジュールがインストールされていないため、{csv_filename} としてCSV形式で保存しました。")
             print("Excelで保存するには: pip install openpyxl を実行してください。")
         
-    def close(self):
-        """
-        リソースを解放
-        """
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-
     def search_items_by_keyword(self, keyword, hits=5):
         """
         キーワードで商品を検索
@@ -434,8 +459,7 @@ class RakutenItemDetails:
             "formatVersion": 2
         }
         
-        response = requests.get(self.base_url, params=params)
-        return response.json()
+        return self.api_client.get_json(self.base_url, params=params)
 
     def get_item_by_code(self, item_code):
         """
@@ -464,8 +488,7 @@ class RakutenItemDetails:
         }
         
         try:
-            response = requests.get(self.item_url, params=params)
-            result = response.json()
+            result = self.api_client.get_json(self.item_url, params=params)
             
             if 'Items' in result and len(result['Items']) > 0:
                 # 商品情報を取得
@@ -483,8 +506,7 @@ class RakutenItemDetails:
                     "formatVersion": 2
                 }
                 
-                search_response = requests.get(self.base_url, params=search_params)
-                search_result = search_response.json()
+                search_result = self.api_client.get_json(self.base_url, params=search_params)
                 
                 if 'Items' in search_result and len(search_result['Items']) > 0:
                     item_data = search_result['Items'][0]
@@ -11,22 +11,50 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from rakuten_init import RakutenInit
+from rakuten_pooled_browser import PooledBrowserMixin
+from rakuten_review_scraper import ReviewScraperMixin
+from rakuten_api_client import get_api_client
+from rakuten_page_snapshot import SnapshotCache
+from rakuten_tiered_fetcher import TieredFetcher
+from rakuten_page_extractor import extract_item_page
+from rakuten_html_parser import submit_parse, run_parse, completed, parse_item_page
+from rakuten_image_urls import upscale_image_urls
+from rakuten_page_ready import wait_until, element_present
+from rakuten_url_utils import parse_item_url
+from rakuten_batch_runner import BatchRunner, get_batch_workers
+from rakuten_review_sync import get_review_sync_state, is_incremental_enabled
+from rakuten_review_table import split_reviews
+from rakuten_review_locator import get_review_locator
 import traceback
 import os
 import platform
 
 
-class RakutenItemInfo:
-    def __init__(self, application_id):
+# 縦持ちのレビューの表に含める商品の列
+REVIEW_KEY_COLUMNS = ('url', 'itemId')
+
+class RakutenItemInfo(ReviewScraperMixin, PooledBrowserMixin):
+    def __init__(self, application_id, scrape_profile=False):
         """
         楽天商品情報取得ツールの初期化
         
         Args:
             application_id (str): 楽天APIのアプリケーションID
+            scrape_profile (bool): 画像・フォント・計測タグを読み込まない軽量プロファイルでChromeを起動するかどうか
         """
         self.application_id = application_id
         self.base_url = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
-        self.driver = None
+        self.browser = None
+        self.driver_pool = None
+        self.scrape_profile = scrape_profile
+        self.api_client = get_api_client()
+        self.fetcher = TieredFetcher(self.api_client)
+        self.snapshots = SnapshotCache(fetcher=self.fetcher)
+        self.review_locator = get_review_locator()
+        self.review_sync = get_review_sync_state()
+        self.incremental_reviews = is_incremental_enabled()
+        self.review_table = None
+        self.headless = True
     
     def extract_js_data_from_url(self, url):
         """
@@ -38,58 +66,10 @@ class RakutenItemInfo:
         Returns:
             dict: 抽出したJSデータ
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
         try:
-            print(f"ページにアクセス中: {url}")
-            self.driver.get(url)
-            time.sleep(3)  # ページ読み込み待機
-            
-            # JavaScriptを実行してgrp15_ias_prmデータを取得
-            js_data = self.driver.execute_script("""
-                // grp15_ias_prmデータを探す
-                for (let key in window) {
-                    if (key.includes('grp15_ias_prm') && window[key]) {
-                        return window[key];
-                    }
-                }
-                
-                // スクリプトタグから直接探す
-                const scripts = document.getElementsByTagName('script');
-                for (let i = 0; i < scripts.length; i++) {
-                    const content = scripts[i].textContent || scripts[i].innerText;
-                    if (content.includes('grp15_ias_prm')) {
-                        const match = content.match(/var\\s+grp15_ias_prm\\s*=\\s*(\\{.*?\\});/s);
-                        if (match && match[1]) {
-                            try {
-                                return JSON.parse(match[1]);
-                            } catch (e) {
-                                console.error('JSON解析エラー:', e);
-                            }
-                        }
-                    }
-                }
-                
-                return null;
-            """)
-            
-            if not js_data:
-                # 別の方法でスクリプトからデータを抽出
-                page_source = self.driver.page_source
-                pattern = r'var\s+grp15_ias_prm\s*=\s*(\{.*?\});'
-                matches = re.search(pattern, page_source, re.DOTALL)
-                
-                if matches:
-                    js_data_str = matches.group(1)
-                    try:
-                        # 文字列をJSONに変換
-                        js_data = json.loads(js_data_str)
-                    except json.JSONDecodeError:
-                        print("JSONデコードエラー。正規表現で抽出したデータ:")
-                        print(js_data_str[:200] + "...")
+            # 同じURLのスナップショットがあればページを再読み込みせずに使う
+            snapshot = self._get_snapshot(url)
+            js_data = snapshot.js_data
             
             if js_data:
                 print("grp15_ias_prmデータを取得しました")
@@ -98,7 +78,9 @@ class RakutenItemInfo:
             else:
                 print("grp15_ias_prmデータが見つかりませんでした")
                 
-                # デバッグ情報：ページのすべてのJavaScript変数を出力
+                # デバッグ情報：ページのすべてのJavaScript変数を出力（ブラウザがそのページを表示中の場合のみ）
+                if self.browser is None or self.browser.loaded_url != url:
+                    return None
                 all_vars = self.driver.execute_script("""
                     const result = {};
                     for (let key in window) {
@@ -143,8 +125,7 @@ class RakutenItemInfo:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            result = response.json()
+            result = self.api_client.get_json(self.base_url, params=params)
             
             if 'Items' in result and len(result['Items']) > 0:
                 return result['Items'][0]
@@ -157,8 +138,7 @@ class RakutenItemInfo:
                     "formatVersion": 2
                 }
                 
-                response = requests.get(self.base_url, params=params)
-                result = response.json()
+                result = self.api_client.get_json(self.base_url, params=params)
                 
                 if 'Items' in result and len(result['Items']) > 0:
                     return result['Items'][0]
@@ -168,6 +148,61 @@ class RakutenItemInfo:
             print(f"API呼び出し中にエラー: {e}")
             return None
     
+    def get_item_by_code(self, shop_code, item_code):
+        """
+        ショップコードと商品コードで商品情報を直接取得
+
+        Args:
+            shop_code (str): ショップコード
+            item_code (str): 商品コード
+
+        Returns:
+            dict: 商品情報（見つからない場合はNone）
+        """
+        params = {
+            "applicationId": self.application_id,
+            "itemCode": f"{shop_code}:{item_code}",
+            "hits": 1,
+            "formatVersion": 2
+        }
+
+        try:
+            result = self.api_client.get_json(self.base_url, params=params)
+
+            if 'Items' in result and len(result['Items']) > 0:
+                item_data = result['Items'][0]
+                if isinstance(item_data, dict) and 'Item' in item_data:
+                    return item_data['Item']
+                return item_data
+            return None
+        except Exception as e:
+            print(f"API呼び出し中にエラー: {e}")
+            return None
+
+    def resolve_item_from_url(self, url):
+        """
+        ブラウザを使わずにURLから商品情報を解決
+
+        Args:
+            url (str): 商品ページのURL
+
+        Returns:
+            tuple: (APIのitemCode（"ショップコード:商品コード"）, API商品情報)。解決できない場合はNone
+        """
+        codes = parse_item_url(url)
+        if not codes:
+            return None
+
+        shop_code, item_code = codes
+        api_item_info = self.get_item_by_code(shop_code, item_code)
+        if not api_item_info:
+            print(f"URLから解析した商品コードでAPIから取得できませんでした: {shop_code}:{item_code}")
+            return None
+
+        api_item_code = api_item_info.get('itemCode') or f"{shop_code}:{item_code}"
+        print(f"URLから商品を解決しました: {api_item_code}")
+        return api_item_code, api_item_info
+
     def get_additional_info(self, item_url):
         """
         Seleniumを使用して商品ページから追加情報を取得
@@ -178,32 +213,38 @@ class RakutenItemInfo:
         Returns:
             dict: 追加情報（レビュー数、評価、Q&A数など）
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
-        self.driver.get(item_url)
-        time.sleep(3)  # ページ読み込み待機時間
+        return self.build_additional_info(self.load_additional_info(item_url, background=False))
+    
+    def load_additional_info(self, item_url, background=True):
+        """
+        商品ページを取得し、描画後のHTMLの解析をワーカーに依頼（解析の完了は待たない）
         
-        additional_info = {}
+        HTTPで取得したHTMLですべての項目が揃う場合はChromeを使わない
         
-        try:
-            # ページのタイトルを取得（デバッグ用）
-            print(f"ページタイトル: {self.driver.title}")
+        解析中に次のページを読み込めるように、結果の組み立てはbuild_additional_infoで行う
+        
+        Args:
+            item_url (str): 商品ページのURL
+            background (bool): 解析をワーカーに依頼するかどうか（Falseの場合は結果をすぐに使うためこのプロセスで解析する）
             
+        Returns:
+            dict: 解析待ちの情報（build_additional_infoに渡す）
+        """
+        pending = {'url': item_url, 'info': {}, 'selectors': {}, 'http': {}, 'page': None}
+        
+        try:
             # JavaScriptデータを抽出
             js_data = self.extract_js_data_from_url(item_url)
             if js_data:
                 # itemidを取得
                 if 'itemid' in js_data:
-                    additional_info['js_itemid'] = js_data['itemid']
+                    pending['info']['js_itemid'] = js_data['itemid']
                     print(f"JavaScriptから取得したitemid: {js_data['itemid']}")
                 
                 # その他の有用な情報を取得
                 for key in ['shopid', 'price', 'seller', 'category']:
                     if key in js_data:
-                        additional_info[f'js_{key}'] = js_data[key]
+                        pending['info'][f'js_{key}'] = js_data[key]
             
             # レビュー情報の取得（複数のセレクタを試す）
             review_selectors = [
@@ -213,20 +254,76 @@ class RakutenItemInfo:
                 "div.item-review-area"
             ]
             
-            review_element = None
-            for selector in review_selectors:
-                try:
-                    review_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if review_element:
-                        print(f"レビュー要素が見つかりました: {selector}")
-                        break
-                except:
-                    continue
-            
-            if review_element:
-                review_text = review_element.text
+            # 画像要素の取得（複数のセレクタを試す）
+            image_selectors = [
+                ".image--3z5RH",  # 元のクラス名
+                "img.itemphoto",  # 商品画像の一般的なクラス
+                ".rakuten-card-item-image img",  # 楽天カードの商品画像
+                ".galleryImage img",  # ギャラリー画像
+                ".imageContainer img",  # 画像コンテナ
+                ".imageThumbnail img",  # サムネイル画像
+                "div.image_main img",  # メイン画像
+                ".item-image-container img"  # 商品画像コンテナ
+            ]
+            
+            pending['selectors'] = dict(review_selectors=review_selectors, image_selectors=image_selectors)
+            
+            # まずHTTPで取得したHTMLから抽出し、足りない項目がある場合だけChromeで読み込む（スナップショットと同じHTMLを使う）
+            pending['http'], missing = self.fetcher.fetch_item_page(item_url, page=self.snapshots.get_html(item_url), **pending['selectors'])
+            if not missing:
+                print("HTTPで取得したHTMLからすべての項目を取得しました")
+                return pending
+            print(f"HTTPで取得できなかった項目をChromeで取得します: {', '.join(missing)}")
+            
+            # 商品ページの読み込み完了（grp15_ias_prmやレビュー要素の描画）まで待機（読み込み済みなら再利用）
+            snapshot = self._get_snapshot(item_url, live=True)
+            
+            # ページのタイトルを取得（デバッグ用）
+            print(f"ページタイトル: {snapshot.title}")
+            
+            # いずれかのレビュー要素が描画されるまでまとめて待機
+            wait_until(self.driver, element_present(*review_selectors), self.browser.page_budget, timeout=5)
+            
+            # 描画後のHTMLを1回だけ取得して解析する（パーサーが使えない場合はブラウザ上で抽出）
+            parse = submit_parse if background else run_parse
+            pending['page'] = parse(parse_item_page, self.driver.page_source, item_url, **pending['selectors'])
+            if pending['page'] is None:
+                pending['page'] = completed(extract_item_page(self.driver, **pending['selectors']))
+            
+            # 別のページに移動する前に、解析できなかった項目を要素から補えるようにする
+            self._track_live_page(pending)
+            
+        except Exception as e:
+            print(f"追加情報の取得中にエラーが発生しました: {e}")
+            traceback.print_exc()
+            
+        return pending
+    
+    def build_additional_info(self, pending):
+        """
+        HTMLの解析結果から追加情報を組み立てる
+        
+        Args:
+            pending (dict): load_additional_infoの戻り値
+            
+        Returns:
+            dict: 追加情報（レビュー数、評価、Q&A数など）
+        """
+        additional_info = dict(pending['info'])
+        
+        try:
+            # 解析できなかった項目は、ブラウザがまだ同じページを表示していれば要素から取得
+            page_data = self._page_data(pending)
+            
+            # HTTPで取得できた項目を優先し、足りない項目だけChromeの結果で補う（項目ごとの取得方法を記録）
+            page_data = self.fetcher.merge_item_page(pending['url'], pending['http'], page_data, pending['selectors'])
+            
+            review = page_data.get('review')
+            images = page_data.get('images')
+            
+            if review:
+                print(f"レビュー要素が見つかりました: {review['selector']}")
+                review_text = review['text']
                 print(f"レビューテキスト: {review_text}")
                 
                 # 評価点数を抽出
@@ -241,68 +338,11 @@ class RakutenItemInfo:
             else:
                 print("レビュー要素が見つかりませんでした")
             
-            # 指定されたクラス名の画像を取得
-            try:
-                print("画像を取得中...")
-                
-                # ページが完全に読み込まれるのを待つ
-                time.sleep(2)
-                
-                # JavaScriptを実行して遅延読み込み画像を表示させる
-                self.driver.execute_script("""
-                    // 画面をスクロールして遅延読み込み画像を表示
-                    window.scrollTo(0, document.body.scrollHeight / 2);
-                    setTimeout(() => { window.scrollTo(0, 0); }, 500);
-                """)
-                time.sleep(2)
-                
-                # 画像要素を取得（複数のセレクタを試す）
-                image_selectors = [
-                    ".image--3z5RH",  # 元のクラス名
-                    "img.itemphoto",  # 商品画像の一般的なクラス
-                    ".rakuten-card-item-image img",  # 楽天カードの商品画像
-                    ".galleryImage img",  # ギャラリー画像
-                    ".imageContainer img",  # 画像コンテナ
-                    ".imageThumbnail img",  # サムネイル画像
-                    "div.image_main img",  # メイン画像
-                    ".item-image-container img"  # 商品画像コンテナ
-                ]
-                
-                image_urls = []
-                
-                for selector in image_selectors:
-                    try:
-                        image_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        
-                        if image_elements:
-                            print(f"{selector} クラスの画像要素が {len(image_elements)} 個見つかりました")
-                            
-                            # 各画像要素からURLを取得
-                            for img in image_elements:
-                                try:
-                                    # src属性を確認
-                                    src = img.get_attribute('src')
-                                    if src and src.startswith('http'):
-                                        image_urls.append(src)
-                                    else:
-                                        # data-src属性を確認
-                                        data_src = img.get_attribute('data-src')
-                                        if data_src and data_src.startswith('http'):
-                                            image_urls.append(data_src)
-                                except Exception as e:
-                                    print(f"画像URL取得中にエラー: {e}")
-                        
-                        if image_urls:
-                            break  # 画像が見つかったらループを終了
-                    except Exception as e:
-                        print(f"セレクタ {selector} での画像検索中にエラー: {e}")
-                        continue
+            if images:
+                print(f"'{images['selector']}' の画像要素から {len(images['urls'])} 件のURLを取得しました")
                 
-                # 重複を削除
-                image_urls = list(dict.fromkeys(image_urls))
-                
-                # 高解像度版に変換
-                image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in image_urls]
+                # 重複を除いて高解像度版にまとめて変換
+                image_urls = upscale_image_urls(images['urls'])
                 
                 print(f"取得した画像URL数: {len(image_urls)}")
                 
@@ -315,9 +355,8 @@ class RakutenItemInfo:
                 
                 # すべての画像URLをパイプ区切りで保存
                 additional_info['allImageUrls'] = '|'.join(image_urls[:20])
-            
-            except Exception as e:
-                print(f"画像取得処理中にエラーが発生しました: {e}")
+            else:
+                print("画像要素が見つかりませんでした")
             
         except Exception as e:
             print(f"追加情報の取得中にエラーが発生しました: {e}")
@@ -325,186 +364,6 @@ class RakutenItemInfo:
             
         return additional_info
     
-    def get_reviews_from_page(self, item_url):
-        """
-        商品ページからレビュー情報を取得
-        
-        Args:
-            item_url (str): 商品ページのURL
-            
-        Returns:
-            dict: レビュー情報（件数、レビューテキスト一覧）
-        """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-        
-        try:
-            print(f"商品ページにアクセス: {item_url}")
-            self.driver.get(item_url)
-            time.sleep(3)  # ページ読み込み待機
-            
-            # レビューボタンまたはレビューURLを探す
-            review_button = None
-            review_count = 0
-            review_url = None
-            
-            try:
-                # 新しいレビューボタンのセレクタを試す
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='review.rakuten.co.jp']")
-                if review_elements:
-                    review_url = review_elements[0].get_attribute('href')
-                    print(f"レビューURL発見: {review_url}")
-                
-                # 別のセレクタも試す
-                if not review_url:
-                    review_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, 'review') or contains(text(), 'レビュー')]")
-                    for link in review_links:
-                        href = link.get_attribute('href')
-                        if href and 'review' in href:
-                            review_url = href
-                            print(f"代替方法でレビューURL発見: {review_url}")
-                            break
-            except Exception as e:
-                print(f"レビューボタン/URL検索中にエラー: {e}")
-            
-            # レビューページに移動
-            if review_url:
-                print(f"レビューページに直接アクセス: {review_url}")
-                self.driver.get(review_url)
-                time.sleep(5)  # ページ読み込み待機
-            
-            # レビュー一覧を取得
-            reviews = []
-            max_reviews = 20  # 取得する最大レビュー数
-            
-            try:
-                # 提供されたHTMLに基づくセレクタ
-                review_containers = self.driver.find_elements(By.CSS_SELECTOR, "li > div.spacer--xFAdr.full-width--2JiOP")
-                
-                if review_containers:
-                    print(f"{len(review_containers)}件のレビュー要素を発見")
-                    
-                    for container in review_containers[:max_reviews]:
-                        try:
-                            # 評価を取得
-                            rating_elem = container.find_elements(By.CSS_SELECTOR, "span.text-container--IAFCr")
-                            rating = 0
-                            if rating_elem:
-                                try:
-                                    rating = float(rating_elem[0].text)
-                                except ValueError:
-                                    pass
-                            
-                            # 日付を取得
-                            date_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-body--1W5uC.size-small--sv6IW.color-gray-dark--2N4Oj")
-                            date = ""
-                            if date_elem:
-                                date = date_elem[0].text
-                            
-                            # レビュータイトルを取得
-                            title_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-header--18XjX")
-                            title = ""
-                            if title_elem:
-                                title = title_elem[0].text
-                            
-                            # レビュー本文を取得
-                            comment_elem = container.find_elements(By.CSS_SELECTOR, "div.review-body--1pESv")
-                            if not comment_elem:
-                                comment_elem = container.find_elements(By.CSS_SELECTOR, "div.no-ellipsis--IKXkO")
-                            
-                            comment = ""
-                            if comment_elem:
-                                comment = comment_elem[0].text
-                            
-                            if comment:
-                                reviews.append({
-                                    "rating": rating,
-                                    "title": title,
-                                    "comment": comment,
-                                    "date": date
-                                })
-                        except Exception as e:
-                            print(f"レビュー要素の解析中にエラー: {e}")
-                
-                # 次のページがあれば取得（最大2ページまで）
-                if reviews and len(reviews) < max_reviews:
-                    try:
-                        next_page_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='page=2']")
-                        if not next_page_links:
-                            next_page_links = self.driver.find_elements(By.XPATH, "//a[contains(text(), '次へ') or contains(text(), '次の') or contains(@class, 'next')]")
-                        
-                        if next_page_links:
-                            next_url = next_page_links[0].get_attribute('href')
-                            if next_url:
-                                print(f"次のページに移動: {next_url}")
-                                self.driver.get(next_url)
-                                time.sleep(3)
-                                
-                                # 2ページ目のレビューを取得
-                                page2_containers = self.driver.find_elements(By.CSS_SELECTOR, "li > div.spacer--xFAdr.full-width--2JiOP")
-                                
-                                if page2_containers:
-                                    print(f"2ページ目で{len(page2_containers)}件のレビュー要素を発見")
-                                    
-                                    for container in page2_containers[:max_reviews - len(reviews)]:
-                                        try:
-                                            # 評価を取得
-                                            rating_elem = container.find_elements(By.CSS_SELECTOR, "span.text-container--IAFCr")
-                                            rating = 0
-                                            if rating_elem:
-                                                try:
-                                                    rating = float(rating_elem[0].text)
-                                                except ValueError:
-                                                    pass
-                                            
-                                            # 日付を取得
-                                            date_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-body--1W5uC.size-small--sv6IW.color-gray-dark--2N4Oj")
-                                            date = ""
-                                            if date_elem:
-                                                date = date_elem[0].text
-                                            
-                                            # レビュータイトルを取得
-                                            title_elem = container.find_elements(By.CSS_SELECTOR, "div.text-display--1Iony.type-header--18XjX")
-                                            title = ""
-                                            if title_elem:
-                                                title = title_elem[0].text
-                                            
-                                            # レビュー本文を取得
-                                            comment_elem = container.find_elements(By.CSS_SELECTOR, "div.review-body--1pESv")
-                                            if not comment_elem:
-                                                comment_elem = container.find_elements(By.CSS_SELECTOR, "div.no-ellipsis--IKXkO")
-                                            
-                                            comment = ""
-                                            if comment_elem:
-                                                comment = comment_elem[0].text
-                                            
-                                            if comment:
-                                                reviews.append({
-                                                    "rating": rating,
-                                                    "title": title,
-                                                    "comment": comment,
-                                                    "date": date
-                                                })
-                                        except Exception as e:
-                                            print(f"2ページ目のレビュー要素の解析中にエラー: {e}")
-                    except Exception as e:
-                        print(f"次のページの取得中にエラー: {e}")
-            
-            except Exception as e:
-                print(f"レビュー解析中にエラー: {e}")
-            
-            print(f"合計 {len(reviews)} 件のレビューを取得しました")
-            return {
-                "review_count": len(reviews),
-                "reviews": reviews
-            }
-        
-        except Exception as e:
-            print(f"レビュー取得中にエラー: {e}")
-            return {"review_count": 0, "reviews": []}
-    
     def analyze_item(self, url):
         """
         商品ページのURLから商品情報と追加情報を取得
@@ -516,34 +375,48 @@ class RakutenItemInfo:
             dict: 商品情報と追加情報を含む辞書
         """
         try:
-            # 1. JavaScriptデータを取得してitemidを抽出
-            js_data = self.extract_js_data_from_url(url)
-            
-            if not js_data or 'itemid' not in js_data:
-                print(f"URLからitemidを抽出できませんでした: {url}")
-                return {"url": url, "error": "itemidを抽出できませんでした"}
+            # 1. URLのショップコード/商品コードからAPIで直接解決（ページ読み込み不要）
+            resolved = self.resolve_item_from_url(url)
+            item_id = None
             
-            item_id = js_data['itemid']
-            print(f"抽出したitemid: {item_id}")
-            
-            # 2. 楽天APIで商品情報を取得
-            api_item_info = self.get_item_by_id(item_id)
-            
-            if not api_item_info:
-                print(f"APIから商品情報を取得できませんでした: {item_id}")
-                api_item_info = {}
+            if resolved:
+                item_code, api_item_info = resolved
+            else:
+                # 解決できない場合のみブラウザでJavaScriptデータを取得してitemidを抽出
+                js_data = self.extract_js_data_from_url(url)
+                
+                if not js_data or 'itemid' not in js_data:
+                    print(f"URLからitemidを抽出できませんでした: {url}")
+                    return {"url": url, "error": "itemidを抽出できませんでした"}
+                
+                item_id = js_data['itemid']
+                print(f"抽出したitemid: {item_id}")
+                
+                # 2. 楽天APIで商品情報を取得
+                api_item_info = self.get_item_by_id(item_id)
+                
+                if not api_item_info:
+                    print(f"APIから商品情報を取得できませんでした: {item_id}")
+                    api_item_info = {}
+                item_code = api_item_info.get('itemCode')
             
-            # 3. 追加情報を取得
-            additional_info = self.get_additional_info(url)
+            # 3. 追加情報を取得（HTMLの解析はレビューページの読み込みと並行して行う）
+            pending = self.load_additional_info(url)
             
             # 4. レビュー情報を取得
             print(f"レビュー情報を取得中: {url}")
             review_info = self.get_reviews_from_page(url)
+            additional_info = self.build_additional_info(pending)
+            
+            # URLから解決した場合、数値のitemidは商品ページのJavaScriptデータから取得する（スナップショットを共有するため再読み込みしない）
+            if item_id is None:
+                item_id = additional_info.get('js_itemid')
             
             # 結果を統合
             result = {
                 "url": url,
                 "itemId": item_id,
+                "itemCode": item_code,
                 "detailed_review_count": review_info['review_count'],
                 "reviews": review_info['reviews']
             }
@@ -564,31 +437,49 @@ class RakutenItemInfo:
             traceback.print_exc()
             return {"url": url, "error": str(e)}
     
-    def process_urls(self, urls, progress_callback=None):
+    def process_urls(self, urls, progress_callback=None, workers=None, wide_reviews=False):
         """
         複数のURLを処理
         
         Args:
             urls (list): 処理するURLのリスト
             progress_callback (function, optional): 進捗コールバック関数
+            workers (int, optional): 並列に処理するワーカープロセス数（省略時は環境変数 RAKUTEN_BATCH_WORKERS）
+            wide_reviews (bool, optional): レビューを従来の横持ちの列（review_{番号}_{項目}）としても結果に追加するかどうか
             
         Returns:
-            pandas.DataFrame: 処理結果
+            pandas.DataFrame: 処理結果（レビューは縦持ちの表としてreview_tableに保持する）
         """
         results = []
         
-        for i, url in enumerate(urls):
-            if progress_callback:
-                progress_callback(i, len(urls), f"URL {i+1}/{len(urls)} を処理中...")
-            
-            print(f"\n===== URL {i+1}/{len(urls)} を処理中: {url} =====")
-            
-            # URLを分析
-            item_result = self.analyze_item(url)
-            results.append(item_result)
-            
-            # 少し待機して連続アクセスを避ける
-            time.sleep(2)
+        if get_batch_workers(workers) > 1 and len(urls) > 1:
+            # ワーカーごとにドライバーを持たせて並列に処理し、結果は元の順序に並べ直す
+            runner = BatchRunner(
+                RakutenItemInfo,
+                args=(self.application_id,),
+                kwargs={'scrape_profile': self.scrape_profile},
+                attributes={'headless': self.headless, 'incremental_reviews': self.incremental_reviews},
+                workers=workers
+            )
+            results = runner.run(
+                'analyze_item',
+                urls,
+                progress_callback=progress_callback,
+                on_failure=lambda url, error: {"url": url, "error": error}
+            )
+        else:
+            for i, url in enumerate(urls):
+                if progress_callback:
+                    progress_callback(i, len(urls), f"URL {i+1}/{len(urls)} を処理中...")
+                
+                print(f"\n===== URL {i+1}/{len(urls)} を処理中: {url} =====")
+                
+                # 続くURLのページを別のタブで読み込み始める（RAKUTEN_TABS が2以上の場合）
+                self._prefetch_pages(urls[i:])
+                
+                # URLを分析
+                item_result = self.analyze_item(url)
+                results.append(item_result)
         
         if progress_callback:
             progress_callback(len(urls), len(urls), "処理完了")
@@ -597,30 +488,8 @@ class RakutenItemInfo:
         if results:
             df = pd.DataFrame(results)
             
-            # レビューテキストを別の列に展開
-            if 'reviews' in df.columns:
-                # レビューの最初の5件を別々の列に展開
-                max_reviews = 0
-                for reviews in df['reviews']:
-                    if isinstance(reviews, list):
-                        max_reviews = max(max_reviews, len(reviews))
-                
-                for i in range(min(20, max_reviews)):
-                    df[f'review_{i+1}_rating'] = df['reviews'].apply(
-                        lambda reviews: reviews[i]['rating'] if isinstance(reviews, list) and i < len(reviews) else None
-                    )
-                    df[f'review_{i+1}_title'] = df['reviews'].apply(
-                        lambda reviews: reviews[i]['title'] if isinstance(reviews, list) and i < len(reviews) else None
-                    )
-                    df[f'review_{i+1}_comment'] = df['reviews'].apply(
-                        lambda reviews: reviews[i]['comment'] if isinstance(reviews, list) and i < len(reviews) else None
-                    )
-                    df[f'review_{i+1}_date'] = df['reviews'].apply(
-                        lambda reviews: reviews[i]['date'] if isinstance(reviews, list) and i < len(reviews) else None
-                    )
-                
-                # 元のreviewsリストは削除（データフレームを軽くするため）
-                df = df.drop(columns=['reviews'])
+            # レビューは縦持ちの表に分ける（横持ちの列は指定された場合だけ追加）
+            df, self.review_table = split_reviews(df, REVIEW_KEY_COLUMNS, wide=wide_reviews)
             
             return df
         else:
@@ -645,14 +514,6 @@ class RakutenItemInfo:
             print(f"openpyxlモジュールがインストールされていないため、{csv_filename} としてCSV形式で保存しました。")
             print("Excelで保存するには: pip install openpyxl を実行してください。")
     
-    def close(self):
-        """
-        リソースを解放
-        """
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-
 # 使用例
 if __name__ == "__main__":
     # 楽天APIのアプリケーションIDを設定
@@ -679,7 +540,7 @@ if __name__ == "__main__":
             print("利用可能なカラム:", results.columns.tolist())
             
             # 主要な情報を表示
-            display_columns = ['url', 'itemId', 'js_price', 'rating', 'reviewCount', 'detailed_review_count']
+            display_columns = ['url', 'itemId', 'itemCode', 'js_price', 'rating', 'reviewCount', 'detailed_review_count']
             available_columns = [col for col in display_columns if col in results.columns]
             
             # レビュー情報が存在する場合は最初のレビューも表示
@@ -11,21 +11,37 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from rakuten_init import RakutenInit
+from rakuten_pooled_browser import PooledBrowserMixin
+from rakuten_api_client import get_api_client
+from rakuten_page_snapshot import SnapshotCache, TIER_HTTP, TIER_BROWSER
+from rakuten_tiered_fetcher import TieredFetcher
+from rakuten_page_extractor import extract_item_page
+from rakuten_html_parser import submit_parse, run_parse, completed, parse_item_page, parse_fields
+from rakuten_image_urls import upscale_image_urls
+from rakuten_page_ready import wait_until, element_present, ITEM_NAME_READY
+from rakuten_batch_runner import BatchRunner, get_batch_workers
 import traceback
 import os
 import platform
 
-class RakutenJSItemDetails:
-    def __init__(self, application_id):
+class RakutenJSItemDetails(PooledBrowserMixin):
+    def __init__(self, application_id, scrape_profile=False):
         """
         楽天商品情報取得ツールの初期化
         
         Args:
             application_id (str): 楽天APIのアプリケーションID
+            scrape_profile (bool): 画像・フォント・計測タグを読み込まない軽量プロファイルでChromeを起動するかどうか
         """
         self.application_id = application_id
         self.base_url = "https://app.rakuten.co.jp/services/api/IchibaItem/Search/20170706"
-        self.driver = None
+        self.browser = None
+        self.driver_pool = None
+        self.scrape_profile = scrape_profile
+        self.api_client = get_api_client()
+        self.fetcher = TieredFetcher(self.api_client)
+        self.snapshots = SnapshotCache(fetcher=self.fetcher)
+        self.headless = True
         
     
     def extract_js_data_from_url(self, url):
@@ -38,58 +54,10 @@ class RakutenJSItemDetails:
         Returns:
             dict: 抽出したJSデータ
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
         try:
-            print(f"ページにアクセス中: {url}")
-            self.driver.get(url)
-            time.sleep(3)  # ページ読み込み待機
-            
-            # JavaScriptを実行してgrp15_ias_prmデータを取得
-            js_data = self.driver.execute_script("""
-                // grp15_ias_prmデータを探す
-                for (let key in window) {
-                    if (key.includes('grp15_ias_prm') && window[key]) {
-                        return window[key];
-                    }
-                }
-                
-                // スクリプトタグから直接探す
-                const scripts = document.getElementsByTagName('script');
-                for (let i = 0; i < scripts.length; i++) {
-                    const content = scripts[i].textContent || scripts[i].innerText;
-                    if (content.includes('grp15_ias_prm')) {
-                        const match = content.match(/var\\s+grp15_ias_prm\\s*=\\s*(\\{.*?\\});/s);
-                        if (match && match[1]) {
-                            try {
-                                return JSON.parse(match[1]);
-                            } catch (e) {
-                                console.error('JSON解析エラー:', e);
-                            }
-                        }
-                    }
-                }
-                
-                return null;
-            """)
-            
-            if not js_data:
-                # 別の方法でスクリプトからデータを抽出
-                page_source = self.driver.page_source
-                pattern = r'var\s+grp15_ias_prm\s*=\s*(\{.*?\});'
-                matches = re.search(pattern, page_source, re.DOTALL)
-                
-                if matches:
-                    js_data_str = matches.group(1)
-                    try:
-                        # 文字列をJSONに変換
-                        js_data = json.loads(js_data_str)
-                    except json.JSONDecodeError:
-                        print("JSONデコードエラー。正規表現で抽出したデータ:")
-                        print(js_data_str[:200] + "...")
+            # 同じURLのスナップショットがあればページを再読み込みせずに使う
+            snapshot = self._get_snapshot(url)
+            js_data = snapshot.js_data
             
             if js_data:
                 print("grp15_ias_prmデータを取得しました")
@@ -97,7 +65,9 @@ class RakutenJSItemDetails:
             else:
                 print("grp15_ias_prmデータが見つかりませんでした")
                 
-                # デバッグ情報：ページのすべてのJavaScript変数を出力
+                # デバッグ情報：ページのすべてのJavaScript変数を出力（ブラウザがそのページを表示中の場合のみ）
+                if self.browser is None or self.browser.loaded_url != url:
+                    return None
                 all_vars = self.driver.execute_script("""
                     const result = {};
                     for (let key in window) {
@@ -142,8 +112,7 @@ class RakutenJSItemDetails:
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            result = response.json()
+            result = self.api_client.get_json(self.base_url, params=params)
             
             if 'Items' in result and len(result['Items']) > 0:
                 return result
@@ -156,8 +125,7 @@ class RakutenJSItemDetails:
                     "formatVersion": 2
                 }
                 
-                response = requests.get(self.base_url, params=params)
-                result = response.json()
+                result = self.api_client.get_json(self.base_url, params=params)
                 
                 if 'Items' in result and len(result['Items']) > 0:
                     return {"Items": [result['Items'][0]]}
@@ -177,32 +145,38 @@ class RakutenJSItemDetails:
         Returns:
             dict: 追加情報（レビュー数、評価、Q&A数など）
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-            
-        self.driver.get(item_url)
-        time.sleep(3)  # ページ読み込み待機時間
+        return self.build_additional_info(self.load_additional_info(item_url, background=False))
+    
+    def load_additional_info(self, item_url, background=True):
+        """
+        商品ページを取得し、描画後のHTMLの解析をワーカーに依頼（解析の完了は待たない）
         
-        additional_info = {}
+        HTTPで取得したHTMLですべての項目が揃う場合はChromeを使わない
         
-        try:
-            # ページのタイトルを取得（デバッグ用）
-            print(f"ページタイトル: {self.driver.title}")
+        解析中に次のページを読み込めるように、結果の組み立てはbuild_additional_infoで行う
+        
+        Args:
+            item_url (str): 商品ページのURL
+            background (bool): 解析をワーカーに依頼するかどうか（Falseの場合は結果をすぐに使うためこのプロセスで解析する）
             
+        Returns:
+            dict: 解析待ちの情報（build_additional_infoに渡す）
+        """
+        pending = {'url': item_url, 'info': {}, 'selectors': {}, 'http': {}, 'page': None}
+        
+        try:
             # JavaScriptデータを抽出
             js_data = self.extract_js_data_from_url(item_url)
             if js_data:
                 # itemidを取得
                 if 'itemid' in js_data:
-                    additional_info['js_itemid'] = js_data['itemid']
+                    pending['info']['js_itemid'] = js_data['itemid']
                     print(f"JavaScriptから取得したitemid: {js_data['itemid']}")
                 
                 # その他の有用な情報を取得
                 for key in ['shopid', 'price', 'seller', 'category']:
                     if key in js_data:
-                        additional_info[f'js_{key}'] = js_data[key]
+                        pending['info'][f'js_{key}'] = js_data[key]
             
             # レビュー情報の取得（複数のセレクタを試す）
             review_selectors = [
@@ -212,20 +186,69 @@ class RakutenJSItemDetails:
                 "div.item-review-area"
             ]
             
-            review_element = None
-            for selector in review_selectors:
-                try:
-                    review_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    if review_element:
-                        print(f"レビュー要素が見つかりました: {selector}")
-                        break
-                except:
-                    continue
+            # 指定されたクラス名の画像を取得
+            image_selectors = [
+                ".image--3z5RH"
+            ]
+            
+            pending['selectors'] = dict(review_selectors=review_selectors, image_selectors=image_selectors)
+            
+            # まずHTTPで取得したHTMLから抽出し、足りない項目がある場合だけChromeで読み込む（スナップショットと同じHTMLを使う）
+            pending['http'], missing = self.fetcher.fetch_item_page(item_url, page=self.snapshots.get_html(item_url), **pending['selectors'])
+            if not missing:
+                print("HTTPで取得したHTMLからすべての項目を取得しました")
+                return pending
+            print(f"HTTPで取得できなかった項目をChromeで取得します: {', '.join(missing)}")
+            
+            # 商品ページの読み込み完了（grp15_ias_prmやレビュー要素の描画）まで待機（読み込み済みなら再利用）
+            snapshot = self._get_snapshot(item_url, live=True)
             
-            if review_element:
-                review_text = review_element.text
+            # ページのタイトルを取得（デバッグ用）
+            print(f"ページタイトル: {snapshot.title}")
+            
+            # いずれかのレビュー要素が描画されるまでまとめて待機
+            wait_until(self.driver, element_present(*review_selectors), self.browser.page_budget, timeout=5)
+            
+            # 描画後のHTMLを1回だけ取得して解析する（パーサーが使えない場合はブラウザ上で抽出）
+            parse = submit_parse if background else run_parse
+            pending['page'] = parse(parse_item_page, self.driver.page_source, item_url, **pending['selectors'])
+            if pending['page'] is None:
+                pending['page'] = completed(extract_item_page(self.driver, **pending['selectors']))
+            
+            # 別のページに移動する前に、解析できなかった項目を要素から補えるようにする
+            self._track_live_page(pending)
+            
+        except Exception as e:
+            print(f"追加情報の取得中にエラーが発生しました: {e}")
+            traceback.print_exc()
+            
+        return pending
+    
+    def build_additional_info(self, pending):
+        """
+        HTMLの解析結果から追加情報を組み立てる
+        
+        Args:
+            pending (dict): load_additional_infoの戻り値
+            
+        Returns:
+            dict: 追加情報（レビュー数、評価、Q&A数など）
+        """
+        additional_info = dict(pending['info'])
+        
+        try:
+            # 解析できなかった項目は、ブラウザがまだ同じページを表示していれば要素から取得
+            page_data = self._page_data(pending)
+            
+            # HTTPで取得できた項目を優先し、足りない項目だけChromeの結果で補う（項目ごとの取得方法を記録）
+            page_data = self.fetcher.merge_item_page(pending['url'], pending['http'], page_data, pending['selectors'])
+            
+            review = page_data.get('review')
+            images = page_data.get('images')
+            
+            if review:
+                print(f"レビュー要素が見つかりました: {review['selector']}")
+                review_text = review['text']
                 print(f"レビューテキスト: {review_text}")
                 
                 # 評価点数を抽出
@@ -240,67 +263,25 @@ class RakutenJSItemDetails:
             else:
                 print("レビュー要素が見つかりませんでした")
             
-            # 指定されたクラス名の画像を取得
-            try:
-                print("指定されたクラス名 'image--3z5RH' の画像を取得中...")
+            if images:
+                print(f"'{images['selector']}' の画像要素から {len(images['urls'])} 件のURLを取得しました")
                 
-                # ページが完全に読み込まれるのを待つ
-                time.sleep(2)
+                # 重複を除いて高解像度版にまとめて変換
+                image_urls = upscale_image_urls(images['urls'])
                 
-                # JavaScriptを実行して遅延読み込み画像を表示させる
-                self.driver.execute_script("""
-                    // 画面をスクロールして遅延読み込み画像を表示
-                    window.scrollTo(0, document.body.scrollHeight / 2);
-                    setTimeout(() => { window.scrollTo(0, 0); }, 500);
-                """)
-                time.sleep(2)
+                print(f"取得した画像URL数: {len(image_urls)}")
                 
-                # 指定されたクラスの画像要素を取得
-                image_elements = self.driver.find_elements(By.CSS_SELECTOR, ".image--3z5RH")
+                # 最大20枚まで保存
+                for i, img_url in enumerate(image_urls[:20]):
+                    additional_info[f'imageUrl_{i+1}'] = img_url
                 
-                if image_elements:
-                    print(f"'image--3z5RH' クラスの画像要素が {len(image_elements)} 個見つかりました")
-                    
-                    # 画像URLを格納するリスト
-                    image_urls = []
-                    
-                    # 各画像要素からURLを取得
-                    for img in image_elements:
-                        try:
-                            # src属性を確認
-                            src = img.get_attribute('src')
-                            if src and src.startswith('http'):
-                                image_urls.append(src)
-                            else:
-                                # data-src属性を確認
-                                data_src = img.get_attribute('data-src')
-                                if data_src and data_src.startswith('http'):
-                                    image_urls.append(data_src)
-                        except Exception as e:
-                            print(f"画像URL取得中にエラー: {e}")
-                    
-                    # 重複を削除
-                    image_urls = list(dict.fromkeys(image_urls))
-                    
-                    # 高解像度版に変換
-                    image_urls = [re.sub(r'_ex=\d+x\d+', '_ex=500x500', url) if '_ex=' in url else url for url in image_urls]
-                    
-                    print(f"取得した画像URL数: {len(image_urls)}")
-                    
-                    # 最大20枚まで保存
-                    for i, img_url in enumerate(image_urls[:20]):
-                        additional_info[f'imageUrl_{i+1}'] = img_url
-                    
-                    # 画像の総数も保存
-                    additional_info['imageCount'] = len(image_urls[:20])
-                    
-                    # すべての画像URLをパイプ区切りで保存
-                    additional_info['allImageUrls'] = '|'.join(image_urls[:20])
-                else:
-                    print("'image--3z5RH' クラスの画像要素が見つかりませんでした")
-            
-            except Exception as e:
-                print(f"画像取得処理中にエラーが発生しました: {e}")
+                # 画像の総数も保存
+                additional_info['imageCount'] = len(image_urls[:20])
+                
+                # すべての画像URLをパイプ区切りで保存
+                additional_info['allImageUrls'] = '|'.join(image_urls[:20])
+            else:
+                print("画像要素が見つかりませんでした")
             
         except Exception as e:
             print(f"追加情報の取得中にエラーが発生しました: {e}")
@@ -308,64 +289,98 @@ class RakutenJSItemDetails:
             
         return additional_info
     
-    def process_urls(self, urls, progress_callback=None):
+    def process_url(self, url):
+        """
+        1件のURLを処理（直接スクレイピングに失敗した場合は代替方法を順に試す）
+        
+        Args:
+            url (str): 処理するURL
+            
+        Returns:
+            dict: 商品情報（すべての方法が失敗した場合はerrorを含む）
+        """
+        # 直接スクレイピングで情報を取得
+        item_info = self.get_item_by_url(url)
+        
+        if item_info and "error" not in item_info:
+            # 成功した場合は結果に追加
+            item_info["url"] = url
+            print(f"商品情報を取得しました: {item_info.get('itemName', '不明')}")
+            return item_info
+        
+        # エラーの場合は代替方法を試す
+        print("直接スクレイピングに失敗。代替方法を試します...")
+        
+        # 代替方法1: JavaScriptデータから取得
+        js_data = self.extract_js_data_from_url(url)
+        if js_data:
+            item_details = self.extract_item_details_from_js(js_data, url)
+            if item_details and "error" not in item_details:
+                item_details["url"] = url
+                print(f"JavaScriptデータから商品情報を取得: {item_details.get('itemName', '不明')}")
+                return item_details
+        
+        # 代替方法2: HTMLから直接抽出
+        html_info = self.extract_info_from_html(url)
+        if html_info and "error" not in html_info:
+            html_info["url"] = url
+            print(f"HTMLから商品情報を取得: {html_info.get('itemName', '不明')}")
+            return html_info
+        
+        # すべての方法が失敗した場合
+        print(f"URL {url} からの商品情報取得に失敗しました")
+        return self._failed_result(url)
+    
+    def _failed_result(self, url, error="商品情報を取得できませんでした"):
+        """
+        商品情報を取得できなかったURLの結果
+        """
+        return {
+            "url": url,
+            "itemName": "取得失敗",
+            "itemPrice": 0,
+            "shopName": "不明",
+            "error": error
+        }
+    
+    def process_urls(self, urls, progress_callback=None, workers=None):
         """
         複数のURLを処理
         
         Args:
             urls (list): 処理するURLのリスト
             progress_callback (function, optional): 進捗コールバック関数
+            workers (int, optional): 並列に処理するワーカープロセス数（省略時は環境変数 RAKUTEN_BATCH_WORKERS）
             
         Returns:
             pandas.DataFrame: 処理結果
         """
         results = []
         
-        for i, url in enumerate(urls):
-            if progress_callback:
-                progress_callback(i, len(urls), f"URL {i+1}/{len(urls)} を処理中...")
-            
-            print(f"\n===== URL {i+1}/{len(urls)} を処理中: {url} =====")
-            
-            # 直接スクレイピングで情報を取得
-            item_info = self.get_item_by_url(url)
-            
-            if item_info and "error" not in item_info:
-                # 成功した場合は結果に追加
-                item_info["url"] = url
-                results.append(item_info)
-                print(f"商品情報を取得しました: {item_info.get('itemName', '不明')}")
-            else:
-                # エラーの場合は代替方法を試す
-                print("直接スクレイピングに失敗。代替方法を試します...")
-                
-                # 代替方法1: JavaScriptデータから取得
-                js_data = self.extract_js_data_from_url(url)
-                if js_data:
-                    item_details = self.extract_item_details_from_js(js_data, url)
-                    if item_details and "error" not in item_details:
-                        item_details["url"] = url
-                        results.append(item_details)
-                        print(f"JavaScriptデータから商品情報を取得: {item_details.get('itemName', '不明')}")
-                        continue
-                
-                # 代替方法2: HTMLから直接抽出
-                html_info = self.extract_info_from_html(url)
-                if html_info and "error" not in html_info:
-                    html_info["url"] = url
-                    results.append(html_info)
-                    print(f"HTMLから商品情報を取得: {html_info.get('itemName', '不明')}")
-                    continue
+        if get_batch_workers(workers) > 1 and len(urls) > 1:
+            # ワーカーごとにドライバーを持たせて並列に処理し、結果は元の順序に並べ直す
+            runner = BatchRunner(
+                RakutenJSItemDetails,
+                args=(self.application_id,),
+                kwargs={'scrape_profile': self.scrape_profile},
+                attributes={'headless': self.headless},
+                workers=workers
+            )
+            results = runner.run(
+                'process_url',
+                urls,
+                progress_callback=progress_callback,
+                on_failure=self._failed_result
+            )
+        else:
+            for i, url in enumerate(urls):
+                if progress_callback:
+                    progress_callback(i, len(urls), f"URL {i+1}/{len(urls)} を処理中...")
                 
-                # すべての方法が失敗した場合
-                print(f"URL {url} からの商品情報取得に失敗しました")
-                results.append({
-                    "url": url,
-                    "itemName": "取得失敗",
-                    "itemPrice": 0,
-                    "shopName": "不明",
-                    "error": "商品情報を取得できませんでした"
-                })
+                print(f"\n===== URL {i+1}/{len(urls)} を処理中: {url} =====")
+                # 続くURLのページを別のタブで読み込み始める（RAKUTEN_TABS が2以上の場合）
+                self._prefetch_pages(urls[i:])
+                results.append(self.process_url(url))
         
         if progress_callback:
             progress_callback(len(urls), len(urls), "処理完了")
@@ -396,13 +411,63 @@ class RakutenJSItemDetails:
             print(f"openpyxlモジュールがインストールされていないため、{csv_filename} としてCSV形式で保存しました。")
             print("Excelで保存するには: pip install openpyxl を実行してください。")
         
-    def close(self):
+    def _parse_snapshot_fields(self, snapshot, field_selectors, image_selectors=()):
+        """
+        スナップショットのHTMLを解析して項目ごとのテキストを取得（結果をすぐに使うためこのプロセスで解析する）
+        
+        Args:
+            snapshot (PageSnapshot): 商品ページのスナップショット
+            field_selectors (dict): 項目名 -> セレクタ（優先順）のリスト
+            image_selectors (list): 画像のセレクタ（優先順）
+            
+        Returns:
+            dict: 項目名 -> テキスト（パーサーがない・解析に失敗した場合は空の辞書）
+        """
+        future = run_parse(parse_fields, snapshot.page_source, snapshot.final_url, field_selectors, image_selectors)
+        if future is None:
+            return {}
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"HTMLの解析中にエラーが発生しました: {e}")
+            return {}
+
+    def _get_parsed_fields(self, url, field_selectors, image_selectors=(), ready=ITEM_NAME_READY):
         """
-        リソースを解放
+        商品ページの項目を取得（HTTPで取得したHTMLに足りない項目がある場合だけChromeで読み込む）
+        
+        Args:
+            url (str): 商品ページのURL
+            field_selectors (dict): 項目名 -> セレクタ（優先順）のリスト
+            image_selectors (list): 画像のセレクタ（優先順）
+            ready (callable): Chromeで読み込む場合の読み込み完了条件
+            
+        Returns:
+            tuple: (スナップショット, 項目名 -> テキスト)
         """
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        snapshot = self._get_snapshot(url, ready=ready)
+        tier = snapshot.tier
+        parsed = self._parse_snapshot_fields(snapshot, field_selectors, image_selectors)
+        
+        missing = [name for name in field_selectors if not parsed.get(name)]
+        if image_selectors and not parsed.get("imageUrls"):
+            missing.append("imageUrls")
+        
+        # 要素から取得する代替処理に備えて、ブラウザがそのページを表示していない場合も読み込み直す
+        if missing and (snapshot.tier == TIER_HTTP or self.browser is None or self.browser.loaded_url != url):
+            print(f"取得できなかった項目をChromeで表示したページから取得します: {', '.join(missing)}")
+            snapshot = self._get_snapshot(url, ready=ready, live=True)
+            browser_parsed = self._parse_snapshot_fields(snapshot, field_selectors, image_selectors)
+            for name in missing:
+                if browser_parsed.get(name):
+                    parsed[name] = browser_parsed[name]
+        
+        for name in list(field_selectors) + (["imageUrls"] if image_selectors else []):
+            if name in missing:
+                self.fetcher.record(url, name, TIER_BROWSER if parsed.get(name) else None)
+            else:
+                self.fetcher.record(url, name, tier)
+        return snapshot, parsed
 
     def extract_item_code_from_url(self, url):
         """
@@ -577,35 +642,40 @@ class RakutenJSItemDetails:
         Returns:
             dict: 商品情報
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-        
         try:
-            self.driver.get(url)
-            time.sleep(3)  # ページ読み込み待機
-            
             item_info = {
                 "itemUrl": url,
                 "source": "html"
             }
             
+            # HTTPで取得したHTMLを解析し、足りない項目だけChromeで取得（それでも取得できなかった項目は要素から取得）
+            snapshot, parsed = self._get_parsed_fields(url, {
+                "itemName": ["span.item_name, h1.item_name, h1.item-name", "h1, h2.item-name"],
+                "itemPrice": ["span.price, p.price, div.price"],
+                "shopName": ["span.shop_name, div.shop_name"]
+            }, image_selectors=["div.image_main img"])
+            
             # 商品名を取得
-            try:
-                item_name_elem = self.driver.find_element(By.CSS_SELECTOR, "span.item_name, h1.item_name, h1.item-name")
-                item_info["itemName"] = item_name_elem.text.strip()
-            except:
+            if parsed.get("itemName"):
+                item_info["itemName"] = parsed["itemName"]
+            else:
                 try:
-                    item_name_elem = self.driver.find_element(By.CSS_SELECTOR, "h1, h2.item-name")
+                    item_name_elem = self.driver.find_element(By.CSS_SELECTOR, "span.item_name, h1.item_name, h1.item-name")
                     item_info["itemName"] = item_name_elem.text.strip()
                 except:
-                    item_info["itemName"] = "不明"
+                    try:
+                        item_name_elem = self.driver.find_element(By.CSS_SELECTOR, "h1, h2.item-name")
+                        item_info["itemName"] = item_name_elem.text.strip()
+                    except:
+                        item_info["itemName"] = "不明"
             
             # 価格を取得
             try:
-                price_elem = self.driver.find_element(By.CSS_SELECTOR, "span.price, p.price, div.price")
-                price_text = price_elem.text.strip()
+                if parsed.get("itemPrice"):
+                    price_text = parsed["itemPrice"]
+                else:
+                    price_elem = self.driver.find_element(By.CSS_SELECTOR, "span.price, p.price, div.price")
+                    price_text = price_elem.text.strip()
                 # 数値以外の文字を削除
                 price_str = re.sub(r'[^\d]', '', price_text)
                 if price_str:
@@ -614,18 +684,24 @@ class RakutenJSItemDetails:
                 item_info["itemPrice"] = 0
             
             # ショップ名を取得
-            try:
-                shop_elem = self.driver.find_element(By.CSS_SELECTOR, "span.shop_name, div.shop_name")
-                item_info["shopName"] = shop_elem.text.strip()
-            except:
-                item_info["shopName"] = "不明"
+            if parsed.get("shopName"):
+                item_info["shopName"] = parsed["shopName"]
+            else:
+                try:
+                    shop_elem = self.driver.find_element(By.CSS_SELECTOR, "span.shop_name, div.shop_name")
+                    item_info["shopName"] = shop_elem.text.strip()
+                except:
+                    item_info["shopName"] = "不明"
             
             # 画像URLを取得
-            try:
-                img_elem = self.driver.find_element(By.CSS_SELECTOR, "div.image_main img")
-                item_info["imageUrl"] = img_elem.get_attribute("src")
-            except:
-                item_info["imageUrl"] = ""
+            if parsed.get("imageUrls"):
+                item_info["imageUrl"] = parsed["imageUrls"][0]
+            else:
+                try:
+                    img_elem = self.driver.find_element(By.CSS_SELECTOR, "div.image_main img")
+                    item_info["imageUrl"] = img_elem.get_attribute("src")
+                except:
+                    item_info["imageUrl"] = ""
             
             return item_info
         except Exception as e:
@@ -642,15 +718,8 @@ class RakutenJSItemDetails:
         Returns:
             dict: 商品情報
         """
-        if self.driver is None:
-            rakuten_init = RakutenInit(self.application_id)
-            rakuten_init.initialize_selenium()
-            self.driver = rakuten_init.driver
-        
         try:
             print(f"商品ページにアクセス中: {url}")
-            self.driver.get(url)
-            time.sleep(5)  # ページ読み込み待機を長めに
             
             # 商品情報を格納する辞書
             item_info = {
@@ -658,26 +727,54 @@ class RakutenJSItemDetails:
                 "source": "direct_scrape"
             }
             
+            # 商品名・価格・ショップ名のセレクタ
+            selectors = [
+                "h1.item_name", 
+                "h1.item-name", 
+                "span.item_name", 
+                "div.item-name", 
+                "h1", 
+                "h2.item-name"
+            ]
+            
+            price_selectors = [
+                "span.price", 
+                "p.price", 
+                "div.price", 
+                "span.price--OX_YW", 
+                "span[data-test='price']",
+                "span.important"
+            ]
+            
+            shop_selectors = [
+                "span.shop_name", 
+                "div.shop_name", 
+                "a.shop-name", 
+                "span.shop-name"
+            ]
+            
+            # HTTPで取得したHTMLを解析し、足りない項目だけChromeで取得（それでも取得できなかった項目は要素から取得）
+            snapshot, parsed = self._get_parsed_fields(url, {
+                "itemName": selectors,
+                "itemPrice": price_selectors,
+                "shopName": shop_selectors
+            })
+            
             # 商品名を取得
             try:
-                selectors = [
-                    "h1.item_name", 
-                    "h1.item-name", 
-                    "span.item_name", 
-                    "div.item-name", 
-                    "h1", 
-                    "h2.item-name"
-                ]
-                
-                for selector in selectors:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            item_info["itemName"] = elements[0].text.strip()
-                            print(f"商品名を取得: {item_info['itemName']}")
-                            break
-                    except:
-                        continue
+                if parsed.get("itemName"):
+                    item_info["itemName"] = parsed["itemName"]
+                    print(f"商品名を取得: {item_info['itemName']}")
+                else:
+                    for selector in selectors:
+                        try:
+                            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                            if elements:
+                                item_info["itemName"] = elements[0].text.strip()
+                                print(f"商品名を取得: {item_info['itemName']}")
+                                break
+                        except:
+                            continue
                     
                 if "itemName" not in item_info:
                     item_info["itemName"] = "不明"
@@ -688,28 +785,24 @@ class RakutenJSItemDetails:
             
             # 価格を取得
             try:
-                price_selectors = [
-                    "span.price", 
-                    "p.price", 
-                    "div.price", 
-                    "span.price--OX_YW", 
-                    "span[data-test='price']",
-                    "span.important"
-                ]
-                
-                for selector in price_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            price_text = elements[0].text.strip()
-                            # 数値以外の文字を削除
-                            price_str = re.sub(r'[^\d]', '', price_text)
-                            if price_str:
-                                item_info["itemPrice"] = int(price_str)
-                                print(f"価格を取得: {item_info['itemPrice']}")
-                                break
-                    except:
-                        continue
+                price_str = re.sub(r'[^\d]', '', parsed.get("itemPrice") or "")
+                if price_str:
+                    item_info["itemPrice"] = int(price_str)
+                    print(f"価格を取得: {item_info['itemPrice']}")
+                else:
+                    for selector in price_selectors:
+                        try:
+                            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                            if elements:
+                                price_text = elements[0].text.strip()
+                                # 数値以外の文字を削除
+                                price_str = re.sub(r'[^\d]', '', price_text)
+                                if price_str:
+                                    item_info["itemPrice"] = int(price_str)
+                                    print(f"価格を取得: {item_info['itemPrice']}")
+                                    break
+                        except:
+                            continue
                     
                 if "itemPrice" not in item_info:
                     item_info["itemPrice"] = 0
@@ -720,22 +813,19 @@ class RakutenJSItemDetails:
             
             # ショップ名を取得
             try:
-                shop_selectors = [
-                    "span.shop_name", 
-                    "div.shop_name", 
-                    "a.shop-name", 
-                    "span.shop-name"
-                ]
-                
-                for selector in shop_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            item_info["shopName"] = elements[0].text.strip()
-                            print(f"ショップ名を取得: {item_info['shopName']}")
-                            break
-                    except:
-                        continue
+                if parsed.get("shopName"):
+                    item_info["shopName"] = parsed["shopName"]
+                    print(f"ショップ名を取得: {item_info['shopName']}")
+                else:
+                    for selector in shop_selectors:
+                        try:
+                            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                            if elements:
+                                item_info["shopName"] = elements[0].text.strip()
+                                print(f"ショップ名を取得: {item_info['shopName']}")
+                                break
+                        except:
+                            continue
                     
                 if "shopName" not in item_info:
                     item_info["shopName"] = "不明"
@@ -746,7 +836,7 @@ class RakutenJSItemDetails:
             
             # 商品コードを取得（ページのHTMLから直接探す）
             try:
-                page_source = self.driver.page_source
+                page_source = snapshot.page_source
                 # 商品コードを探すパターン
                 patterns = [
                     r'商品コード[：:]\s*([A-Za-z0-9\-_]+)',
@@ -0,0 +1,210 @@
+import os
+import json
+import base64
+from rakuten_page_extractor import build_review, find_next_page_url
+
+# ネットワークログから取り出すレスポンスの種類
+CAPTURE_RESOURCE_TYPES = ("XHR", "Fetch")
+CAPTURE_MIME_KEYWORD = "json"
+
+# レビューのJSONで使われる項目名の候補（優先順）
+REVIEW_RATING_KEYS = ("rating", "evaluation", "score", "point", "reviewPoint")
+REVIEW_COMMENT_KEYS = ("comment", "body", "reviewBody", "text", "content", "reviewText")
+REVIEW_TITLE_KEYS = ("title", "subject", "reviewTitle")
+REVIEW_DATE_KEYS = ("date", "postDate", "reviewDate", "postedAt", "createdAt", "regDate")
+
+
+def is_capture_enabled():
+    """
+    ネットワークキャプチャを使うかどうか（環境変数 RAKUTEN_NETWORK_CAPTURE、既定は無効）
+    """
+    return os.environ.get('RAKUTEN_NETWORK_CAPTURE', '0') != '0'
+
+
+def enable_performance_log(chrome_options):
+    """
+    ChromeオプションにネットワークイベントのPerformanceログを追加
+
+    Args:
+        chrome_options (Options): Chromeオプション
+    """
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+
+def _first_value(record, keys):
+    """
+    候補の項目名のうち最初に値がある項目の値
+    """
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def find_review_records(payload, limit=None):
+    """
+    JSONからレビューらしい項目（評価と本文を持つ辞書）を探してレビューの辞書に変換
+
+    レスポンスの構造に依存しないように、評価と本文の項目を持つ辞書を再帰的に探す
+
+    Args:
+        payload: JSONを読み込んだ値
+        limit (int): 取得する最大件数
+
+    Returns:
+        list: レビューのリスト（rakuten_page_extractor.build_reviewと同じ形式）
+    """
+    reviews = []
+    stack = [payload]
+    while stack and (limit is None or len(reviews) < limit):
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(reversed(value))
+            continue
+        if not isinstance(value, dict):
+            continue
+
+        rating = _first_value(value, REVIEW_RATING_KEYS)
+        comment = _first_value(value, REVIEW_COMMENT_KEYS)
+        if rating is not None and isinstance(comment, str):
+            review = build_review({
+                "rating": str(rating),
+                "title": str(_first_value(value, REVIEW_TITLE_KEYS) or ""),
+                "comment": comment,
+                "date": str(_first_value(value, REVIEW_DATE_KEYS) or "")
+            })
+            if review:
+                reviews.append(review)
+            continue
+
+        stack.extend(reversed(list(value.values())))
+    return reviews
+
+
+class NetworkCapture:
+    def __init__(self, driver):
+        """
+        Performanceログからページが読み込んだJSONレスポンスを取り出す
+
+        Args:
+            driver (WebDriver): Performanceログを有効にしたSeleniumドライバー
+        """
+        self.driver = driver
+        self.responses = {}
+        self.payloads = {}
+
+    def enable(self):
+        """
+        レスポンス本文を取得できるようにCDPのNetworkドメインを有効化
+        """
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            print(f"CDPのNetworkドメインを有効にできませんでした: {e}")
+
+    def drain(self):
+        """
+        これまでのログを捨てる（次のページの読み込み前に呼ぶ）
+        """
+        try:
+            self.driver.get_log("performance")
+        except Exception as e:
+            print(f"Performanceログの読み取り中にエラー: {e}")
+        self.responses.clear()
+        self.payloads.clear()
+
+    def _read_log(self):
+        """
+        新しいログからJSONのレスポンスを記録
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            print(f"Performanceログの読み取り中にエラー: {e}")
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            if message.get("method") != "Network.responseReceived":
+                continue
+
+            params = message.get("params", {})
+            response = params.get("response", {})
+            if params.get("type") not in CAPTURE_RESOURCE_TYPES:
+                continue
+            if CAPTURE_MIME_KEYWORD not in (response.get("mimeType") or ""):
+                continue
+            self.responses[params.get("requestId")] = response.get("url", "")
+
+    def _load_body(self, request_id):
+        """
+        レスポンス本文をJSONとして読み込む（読み込めない場合はNone）
+        """
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            print(f"レスポンス本文の取得に失敗しました: {e}")
+            return None
+
+        body = result.get("body") or ""
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def json_payloads(self, url_keyword=None):
+        """
+        現在のページが読み込んだJSONレスポンスの一覧
+
+        Args:
+            url_keyword (str): URLに含まれる文字列で絞り込む（省略時はすべて）
+
+        Returns:
+            list: (URL, JSONを読み込んだ値) のリスト
+        """
+        self._read_log()
+        payloads = []
+        for request_id, url in self.responses.items():
+            if url_keyword and url_keyword not in url:
+                continue
+            if request_id not in self.payloads:
+                self.payloads[request_id] = self._load_body(request_id)
+            if self.payloads[request_id] is not None:
+                payloads.append((url, self.payloads[request_id]))
+        return payloads
+
+    def capture_reviews(self, limit):
+        """
+        現在のページが読み込んだJSONからレビュー一覧を取得（DOMを辿らない）
+
+        Args:
+            limit (int): 取得する最大件数
+
+        Returns:
+            dict: {"reviews": [...], "next_url": ...}（レビューのJSONが見つからない場合はNone）
+        """
+        reviews = []
+        for url, payload in self.json_payloads():
+            found = find_review_records(payload, limit - len(reviews))
+            if found:
+                print(f"ネットワークのJSONから{len(found)}件のレビューを取得: {url}")
+                reviews.extend(found)
+            if len(reviews) >= limit:
+                break
+
+        if not reviews:
+            return None
+
+        try:
+            next_url = find_next_page_url(self.driver)
+        except Exception as e:
+            print(f"次のページの検索中にエラー: {e}")
+            next_url = None
+        return {"reviews": reviews, "next_url": next_url}
@@ -0,0 +1,371 @@
+from selenium.webdriver.common.by import By
+from rakuten_page_ready import REVIEW_LIST_SELECTOR
+from rakuten_image_urls import IMAGE_URL_ATTRIBUTES, image_urls_from_attributes
+
+# レビュー1件ごとの項目のセレクタ
+REVIEW_RATING_SELECTOR = "span.text-container--IAFCr"
+REVIEW_DATE_SELECTOR = "div.text-display--1Iony.type-body--1W5uC.size-small--sv6IW.color-gray-dark--2N4Oj"
+REVIEW_TITLE_SELECTOR = "div.text-display--1Iony.type-header--18XjX"
+REVIEW_BODY_SELECTORS = ["div.review-body--1pESv", "div.no-ellipsis--IKXkO"]
+
+# 商品ページの項目をまとめて取得するスクリプト（WebDriverとの通信は1回）
+ITEM_PAGE_SCRIPT = """
+    const [reviewSelectors, descriptionSelectors, sellerSelectors, imageSelectors, imageAttributes] = arguments;
+
+    const firstText = (selectors) => {
+        for (const selector of selectors) {
+            const element = document.querySelector(selector);
+            const text = element ? (element.innerText || '').trim() : '';
+            if (text) {
+                return {selector: selector, text: text};
+            }
+        }
+        return null;
+    };
+
+    // 遅延読み込みの属性やsrcsetも見るため、スクロールして描画させる必要はない
+    const imageUrl = (img) => {
+        for (const name of imageAttributes) {
+            const value = img.getAttribute(name) || '';
+            const candidates = name.endsWith('srcset')
+                ? value.split(',').map(part => part.trim().split(/\\s+/)[0]).reverse()
+                : [value];
+            for (const candidate of candidates) {
+                if (!candidate) {
+                    continue;
+                }
+                const url = new URL(candidate, location.href).href;
+                if (url.startsWith('http')) {
+                    return url;
+                }
+            }
+        }
+        return null;
+    };
+
+    // ギャラリーの要素がない場合はJSON-LD・og:imageから取得
+    const pageStateImages = () => {
+        const urls = [];
+        const collect = (value) => {
+            if (Array.isArray(value)) {
+                value.forEach(collect);
+            } else if (value && typeof value === 'object') {
+                for (const [key, item] of Object.entries(value)) {
+                    if (key !== 'image') {
+                        collect(item);
+                        continue;
+                    }
+                    for (let image of (Array.isArray(item) ? item : [item])) {
+                        if (image && typeof image === 'object') {
+                            image = image.url || image.contentUrl;
+                        }
+                        if (typeof image === 'string' && (image.startsWith('http') || image.startsWith('//'))) {
+                            urls.push(image.startsWith('//') ? 'https:' + image : image);
+                        }
+                    }
+                }
+            }
+        };
+        document.querySelectorAll('script[type="application/ld+json"]').forEach(script => {
+            try {
+                collect(JSON.parse(script.textContent));
+            } catch (e) {}
+        });
+        if (urls.length) {
+            return {selector: 'json-ld', urls: urls};
+        }
+        const og = Array.from(document.querySelectorAll('meta[property="og:image"]')).map(meta => meta.content).filter(Boolean);
+        return og.length ? {selector: 'og:image', urls: og} : null;
+    };
+
+    const imageUrls = (selectors) => {
+        if (!selectors.length) {
+            return null;
+        }
+        for (const selector of selectors) {
+            const urls = Array.from(document.querySelectorAll(selector)).map(imageUrl).filter(Boolean);
+            if (urls.length) {
+                return {selector: selector, urls: urls};
+            }
+        }
+        return pageStateImages();
+    };
+
+    return {
+        title: document.title,
+        review: firstText(reviewSelectors),
+        description: firstText(descriptionSelectors),
+        seller_info: firstText(sellerSelectors),
+        images: imageUrls(imageSelectors)
+    };
+"""
+
+# レビューページのレビュー一覧と次ページのURLをまとめて取得するスクリプト
+REVIEW_PAGE_SCRIPT = """
+    const [containerSelector, ratingSelector, dateSelector, titleSelector, bodySelectors, limit] = arguments;
+
+    const textOf = (root, selector) => {
+        const element = root.querySelector(selector);
+        return element ? (element.innerText || '') : '';
+    };
+
+    const reviews = Array.from(document.querySelectorAll(containerSelector)).slice(0, limit).map(container => {
+        let comment = '';
+        for (const selector of bodySelectors) {
+            if (container.querySelector(selector)) {
+                comment = textOf(container, selector);
+                break;
+            }
+        }
+        return {
+            rating: textOf(container, ratingSelector),
+            date: textOf(container, dateSelector),
+            title: textOf(container, titleSelector),
+            comment: comment
+        };
+    });
+
+    let nextLink = document.querySelector("a[href*='page=2']");
+    if (!nextLink) {
+        nextLink = Array.from(document.querySelectorAll('a')).find(a => {
+            const text = a.textContent || '';
+            return text.includes('次へ') || text.includes('次の') || (a.className || '').toString().includes('next');
+        });
+    }
+
+    return {reviews: reviews, next_url: nextLink ? nextLink.href : null};
+"""
+
+
+def extract_item_page(driver, review_selectors=(), description_selectors=(), seller_selectors=(), image_selectors=()):
+    """
+    商品ページのレビュー概要・商品説明・販売者情報・画像URLを1回のスクリプト実行で取得
+
+    各項目は {"selector": ..., "text"/"urls": ...} の形式で、ページに存在しない場合はNone。
+    スクリプトの実行に失敗した場合は空の辞書を返すので、呼び出し側はキーがない項目だけ従来の方法で取得する
+
+    Args:
+        driver (WebDriver): 商品ページを表示しているSeleniumドライバー
+        review_selectors (list): レビュー概要のセレクタ（優先順）
+        description_selectors (list): 商品説明のセレクタ（優先順）
+        seller_selectors (list): 販売者情報のセレクタ（優先順）
+        image_selectors (list): 商品画像のセレクタ（優先順）
+
+    Returns:
+        dict: 抽出結果（title, review, description, seller_info, images）
+    """
+    try:
+        data = driver.execute_script(
+            ITEM_PAGE_SCRIPT,
+            list(review_selectors),
+            list(description_selectors),
+            list(seller_selectors),
+            list(image_selectors),
+            list(IMAGE_URL_ATTRIBUTES)
+        )
+    except Exception as e:
+        print(f"抽出スクリプトの実行中にエラー: {e}")
+        return {}
+    return data or {}
+
+
+def find_first_text(driver, selectors):
+    """
+    セレクタを順に試して最初に見つかった要素のテキストを取得（要素ごとにWebDriverと通信する従来の方法）
+
+    Args:
+        driver (WebDriver): Seleniumドライバー
+        selectors (list): セレクタ（優先順）
+
+    Returns:
+        dict: {"selector": ..., "text": ...}（見つからない場合はNone）
+    """
+    for selector in selectors:
+        try:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                text = elements[0].text
+                if text:
+                    return {"selector": selector, "text": text}
+        except Exception:
+            continue
+    return None
+
+
+def find_image_urls(driver, selectors):
+    """
+    セレクタを順に試して最初に見つかった画像のURLを取得（要素ごとにWebDriverと通信する従来の方法）
+
+    Args:
+        driver (WebDriver): Seleniumドライバー
+        selectors (list): セレクタ（優先順）
+
+    Returns:
+        dict: {"selector": ..., "urls": [...]}（見つからない場合はNone）
+    """
+    for selector in selectors:
+        try:
+            urls = []
+            for img in driver.find_elements(By.CSS_SELECTOR, selector):
+                src = image_urls_from_attributes({name: img.get_attribute(name) for name in IMAGE_URL_ATTRIBUTES})
+                if src:
+                    urls.append(src)
+            if urls:
+                return {"selector": selector, "urls": urls}
+        except Exception as e:
+            print(f"セレクタ {selector} での画像検索中にエラー: {e}")
+    return None
+
+
+def build_review(raw):
+    """
+    スクリプトまたは要素から取得した値をレビューの辞書に変換
+
+    Args:
+        raw (dict): rating, date, title, commentの文字列
+
+    Returns:
+        dict: レビュー（本文がない場合はNone）
+    """
+    if not raw.get('comment'):
+        return None
+
+    try:
+        rating = float(raw.get('rating') or 0)
+    except ValueError:
+        rating = 0
+
+    return {
+        "rating": rating,
+        "title": raw.get('title') or "",
+        "comment": raw['comment'],
+        "date": raw.get('date') or ""
+    }
+
+
+def find_reviews(driver, limit):
+    """
+    レビュー一覧を要素ごとに取得（従来の方法）
+
+    Args:
+        driver (WebDriver): レビューページを表示しているSeleniumドライバー
+        limit (int): 取得する最大件数
+
+    Returns:
+        list: レビューのリスト
+    """
+    reviews = []
+    for container in driver.find_elements(By.CSS_SELECTOR, REVIEW_LIST_SELECTOR)[:limit]:
+        try:
+            raw = {}
+            for key, selector in (("rating", REVIEW_RATING_SELECTOR), ("date", REVIEW_DATE_SELECTOR), ("title", REVIEW_TITLE_SELECTOR)):
+                elements = container.find_elements(By.CSS_SELECTOR, selector)
+                raw[key] = elements[0].text if elements else ""
+
+            for selector in REVIEW_BODY_SELECTORS:
+                elements = container.find_elements(By.CSS_SELECTOR, selector)
+                if elements:
+                    raw["comment"] = elements[0].text
+                    break
+
+            review = build_review(raw)
+            if review:
+                reviews.append(review)
+        except Exception as e:
+            print(f"レビュー要素の解析中にエラー: {e}")
+    return reviews
+
+
+def find_next_page_url(driver):
+    """
+    レビューの次ページのURLを要素から取得（従来の方法）
+
+    Args:
+        driver (WebDriver): レビューページを表示しているSeleniumドライバー
+
+    Returns:
+        str: 次ページのURL（ない場合はNone）
+    """
+    next_page_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='page=2']")
+    if not next_page_links:
+        next_page_links = driver.find_elements(By.XPATH, "//a[contains(text(), '次へ') or contains(text(), '次の') or contains(@class, 'next')]")
+    if next_page_links:
+        return next_page_links[0].get_attribute('href')
+    return None
+
+
+def extract_reviews(driver, limit):
+    """
+    レビューページのレビュー一覧と次ページのURLを1回のスクリプト実行で取得
+
+    スクリプトで取得できなかった項目だけ要素ごとに取得する
+
+    Args:
+        driver (WebDriver): レビューページを表示しているSeleniumドライバー
+        limit (int): 取得する最大件数
+
+    Returns:
+        dict: {"reviews": [...], "next_url": ...}
+    """
+    try:
+        data = driver.execute_script(
+            REVIEW_PAGE_SCRIPT,
+            REVIEW_LIST_SELECTOR,
+            REVIEW_RATING_SELECTOR,
+            REVIEW_DATE_SELECTOR,
+            REVIEW_TITLE_SELECTOR,
+            REVIEW_BODY_SELECTORS,
+            limit
+        ) or {}
+    except Exception as e:
+        print(f"レビュー抽出スクリプトの実行中にエラー: {e}")
+        data = {}
+
+    if 'reviews' in data:
+        reviews = [review for review in (build_review(raw) for raw in data['reviews']) if review]
+    else:
+        reviews = find_reviews(driver, limit)
+
+    if 'next_url' in data:
+        next_url = data['next_url']
+    else:
+        try:
+            next_url = find_next_page_url(driver)
+        except Exception as e:
+            print(f"次のページの検索中にエラー: {e}")
+            next_url = None
+
+    return {"reviews": reviews, "next_url": next_url}
+
+
+def fill_missing_fields(driver, page_data, review_selectors=(), description_selectors=(), seller_selectors=(), image_selectors=()):
+    """
+    HTMLの解析などで取得できなかった商品ページの項目をブラウザ上で取得
+
+    まず1回のスクリプト実行で取得し、それでも取得できなかった項目だけ要素ごとに取得する
+
+    Args:
+        driver (WebDriver): 商品ページを表示しているSeleniumドライバー
+        page_data (dict): 取得済みの項目（extract_item_pageと同じ形式）
+        review_selectors (list): レビュー概要のセレクタ（優先順）
+        description_selectors (list): 商品説明のセレクタ（優先順）
+        seller_selectors (list): 販売者情報のセレクタ（優先順）
+        image_selectors (list): 商品画像のセレクタ（優先順）
+
+    Returns:
+        dict: 不足分を補った抽出結果
+    """
+    page_data = dict(page_data or {})
+    if not page_data:
+        page_data = extract_item_page(driver, review_selectors, description_selectors, seller_selectors, image_selectors)
+
+    fallbacks = {
+        'review': lambda: find_first_text(driver, review_selectors),
+        'description': lambda: find_first_text(driver, description_selectors),
+        'seller_info': lambda: find_first_text(driver, seller_selectors),
+        'images': lambda: find_image_urls(driver, image_selectors)
+    }
+    for key, fetch in fallbacks.items():
+        if key not in page_data:
+            page_data[key] = fetch()
+    return page_data
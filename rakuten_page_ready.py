@@ -0,0 +1,155 @@
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# 1ページあたりの待機時間の上限（秒）
+DEFAULT_PAGE_TIMEOUT = 10
+POLL_INTERVAL = 0.1
+
+# 抽出対象ごとのセレクタ
+REVIEW_SUMMARY_SELECTORS = [
+    "span[itemprop='aggregateRating']",
+    "span.revRating",
+    "div.revRating",
+    "div.item-review-area"
+]
+IMAGE_GALLERY_SELECTORS = [
+    ".image--3z5RH",
+    "div.image-gallery img",
+    "div.item-image-container img",
+    "div.image_main img"
+]
+REVIEW_LIST_SELECTOR = "li > div.spacer--xFAdr.full-width--2JiOP"
+ITEM_NAME_SELECTORS = ["h1.item_name", "h1.item-name", "span.item_name", "div.item-name", "h1"]
+
+
+class PageBudget:
+    def __init__(self, timeout=DEFAULT_PAGE_TIMEOUT):
+        """
+        1ページ内のすべての待機で共有する時間予算
+
+        Args:
+            timeout (float): ページ全体で待機できる合計秒数
+        """
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+
+    def remaining(self):
+        """
+        残りの待機可能時間（秒）
+        """
+        return max(0.0, self.deadline - time.monotonic())
+
+
+def document_ready(driver):
+    """
+    DOMの構築が完了しているか（readyStateがinteractive以降）
+    """
+    return driver.execute_script("return document.readyState") in ("interactive", "complete")
+
+
+def document_complete(driver):
+    """
+    ページの読み込みが完了しているか（readyStateがcomplete）
+    """
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def element_present(*selectors):
+    """
+    いずれかのセレクタに一致する要素が存在する条件（1回のスクリプト実行で判定）
+    """
+    def condition(driver):
+        return driver.execute_script(
+            "return arguments[0].some(s => document.querySelector(s) !== null);",
+            list(selectors)
+        )
+    return condition
+
+
+def js_defined(name):
+    """
+    グローバル変数が定義されている条件
+    """
+    def condition(driver):
+        return driver.execute_script(
+            "return typeof window[arguments[0]] !== 'undefined' && window[arguments[0]] !== null;",
+            name
+        )
+    return condition
+
+
+def images_rendered(*selectors):
+    """
+    画像要素にURLが設定されている条件（遅延読み込み画像のsrc/data-srcを確認）
+    """
+    def condition(driver):
+        return driver.execute_script("""
+            return arguments[0].some(s => Array.from(document.querySelectorAll(s)).some(img => {
+                const src = img.getAttribute('src') || img.getAttribute('data-src') || '';
+                return src.startsWith('http');
+            }));
+        """, list(selectors))
+    return condition
+
+
+def any_of(*conditions):
+    """
+    いずれかの条件を満たす
+    """
+    def condition(driver):
+        return any(cond(driver) for cond in conditions)
+    return condition
+
+
+def all_of(*conditions):
+    """
+    すべての条件を満たす
+    """
+    def condition(driver):
+        return all(cond(driver) for cond in conditions)
+    return condition
+
+
+# 抽出対象ごとの読み込み完了条件
+ITEM_PAGE_READY = all_of(document_ready, any_of(js_defined('grp15_ias_prm'), element_present(*REVIEW_SUMMARY_SELECTORS), document_complete))
+JS_DATA_READY = any_of(js_defined('grp15_ias_prm'), document_complete)
+REVIEW_SUMMARY_READY = element_present(*REVIEW_SUMMARY_SELECTORS)
+IMAGE_GALLERY_READY = images_rendered(*IMAGE_GALLERY_SELECTORS)
+REVIEW_PAGE_READY = any_of(element_present(REVIEW_LIST_SELECTOR), document_complete)
+ITEM_NAME_READY = any_of(element_present(*ITEM_NAME_SELECTORS), document_complete)
+REVIEW_LINK_READY = any_of(element_present("a[href*='review.rakuten.co.jp']"), document_complete)
+
+
+def wait_until(driver, condition, budget=None, timeout=None):
+    """
+    条件を満たすまで待機（時間切れの場合は例外を出さずにFalseを返す）
+
+    Args:
+        driver (WebDriver): Seleniumドライバー
+        condition (callable): driverを受け取り真偽値を返す条件
+        budget (PageBudget): ページ全体の時間予算（指定時は残り時間まで待機）
+        timeout (float): 待機秒数の上限（budget指定時は残り時間と小さい方）
+
+    Returns:
+        bool: 条件を満たした場合はTrue
+    """
+    if budget is not None:
+        timeout = budget.remaining() if timeout is None else min(timeout, budget.remaining())
+    elif timeout is None:
+        timeout = DEFAULT_PAGE_TIMEOUT
+
+    try:
+        if condition(driver):
+            return True
+    except WebDriverException:
+        pass
+
+    if timeout <= 0:
+        return False
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL, ignored_exceptions=(WebDriverException,)).until(condition)
+        return True
+    except TimeoutException:
+        return False
@@ -0,0 +1,307 @@
+import re
+import json
+import time
+import threading
+from html import unescape
+from collections import OrderedDict
+
+# ページ1回の読み込みで必要な情報をまとめて取得するスクリプト
+SNAPSHOT_SCRIPT = """
+    const result = {title: document.title, url: location.href, js_data: null, review_url: null};
+
+    // grp15_ias_prmデータを探す
+    for (let key in window) {
+        try {
+            if (key.includes('grp15_ias_prm') && window[key]) {
+                result.js_data = window[key];
+                break;
+            }
+        } catch (e) {}
+    }
+
+    // スクリプトタグから直接探す
+    if (!result.js_data) {
+        const scripts = document.getElementsByTagName('script');
+        for (let i = 0; i < scripts.length; i++) {
+            const content = scripts[i].textContent || scripts[i].innerText || '';
+            if (content.includes('grp15_ias_prm')) {
+                const match = content.match(/var\\s+grp15_ias_prm\\s*=\\s*(\\{.*?\\});/s);
+                if (match && match[1]) {
+                    try {
+                        result.js_data = JSON.parse(match[1]);
+                        break;
+                    } catch (e) {}
+                }
+            }
+        }
+    }
+
+    // レビューページへのリンクを探す
+    const reviewLink = document.querySelector("a[href*='review.rakuten.co.jp']");
+    if (reviewLink) {
+        result.review_url = reviewLink.href;
+    } else {
+        for (const link of document.querySelectorAll('a')) {
+            const href = link.href || '';
+            if (href.includes('review')) {
+                result.review_url = href;
+                break;
+            }
+        }
+    }
+
+    // 最後に「レビュー」という文字列のリンクを探す
+    if (!result.review_url) {
+        for (const link of document.querySelectorAll('a')) {
+            const href = link.href || '';
+            if (href.startsWith('http') && (link.textContent || '').includes('レビュー')) {
+                result.review_url = href;
+                break;
+            }
+        }
+    }
+
+    return result;
+"""
+
+GRP15_PATTERN = re.compile(r'var\s+grp15_ias_prm\s*=\s*(\{.*?\});', re.DOTALL)
+TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.DOTALL | re.IGNORECASE)
+REVIEW_LINK_PATTERN = re.compile(r'href=["\']((?:https?:)?//review\.rakuten\.co\.jp/[^"\']+)["\']')
+REVIEW_TEXT_LINK_PATTERN = re.compile(r'<a\b[^>]*href=["\']((?:https?:)?//[^"\']+)["\'][^>]*>(?:(?!</a>).)*?レビュー', re.DOTALL)
+
+# スナップショットの取得方法
+TIER_HTTP = "http"
+TIER_BROWSER = "selenium"
+TIER_NETWORK = "network"
+
+
+def extract_grp15_from_source(page_source):
+    """
+    ページのHTMLからgrp15_ias_prmを正規表現で抽出
+
+    Args:
+        page_source (str): ページのHTML
+
+    Returns:
+        dict: grp15_ias_prmのデータ（見つからない場合はNone）
+    """
+    match = GRP15_PATTERN.search(page_source or "")
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        print("JSONデコードエラー。正規表現で抽出したデータ:")
+        print(match.group(1)[:200] + "...")
+        return None
+
+
+class PageSnapshot:
+    def __init__(self, url, title="", page_source="", js_data=None, review_url=None, final_url=None, tier=TIER_BROWSER):
+        """
+        1回のページ読み込みで取得した情報のスナップショット
+
+        Args:
+            url (str): 要求したURL
+            title (str): ページタイトル
+            page_source (str): ページのHTML
+            js_data (dict): grp15_ias_prmのデータ
+            review_url (str): レビューページのURL
+            final_url (str): リダイレクト後のURL
+            tier (str): 取得方法（TIER_HTTP / TIER_BROWSER）
+        """
+        self.url = url
+        self.title = title
+        self.page_source = page_source
+        self.js_data = js_data
+        self.review_url = review_url
+        self.final_url = final_url or url
+        self.tier = tier
+        self.captured_at = time.time()
+
+
+def capture_snapshot(driver, url):
+    """
+    表示中のページからスナップショットを作成（ページの再読み込みはしない）
+
+    Args:
+        driver (WebDriver): 対象ページを表示しているSeleniumドライバー
+        url (str): 要求したURL
+
+    Returns:
+        PageSnapshot: スナップショット
+    """
+    try:
+        data = driver.execute_script(SNAPSHOT_SCRIPT) or {}
+    except Exception as e:
+        print(f"スナップショット用スクリプトの実行中にエラー: {e}")
+        data = {}
+
+    page_source = driver.page_source
+    js_data = data.get('js_data') or extract_grp15_from_source(page_source)
+
+    return PageSnapshot(
+        url,
+        title=data.get('title', ''),
+        page_source=page_source,
+        js_data=js_data,
+        review_url=data.get('review_url'),
+        final_url=data.get('url')
+    )
+
+
+def snapshot_from_html(url, html, final_url=None):
+    """
+    HTTPで取得したHTMLからスナップショットを作成（Chromeを使わない）
+
+    Args:
+        url (str): 要求したURL
+        html (str): ページのHTML
+        final_url (str): リダイレクト後のURL
+
+    Returns:
+        PageSnapshot: スナップショット
+    """
+    title_match = TITLE_PATTERN.search(html or "")
+    # レビューページへのリンクがなければ「レビュー」という文字列のリンクを使う
+    review_match = REVIEW_LINK_PATTERN.search(html or "") or REVIEW_TEXT_LINK_PATTERN.search(html or "")
+    review_url = None
+    if review_match:
+        review_url = review_match.group(1).replace('&amp;', '&')
+        if review_url.startswith('//'):
+            review_url = 'https:' + review_url
+
+    return PageSnapshot(
+        url,
+        title=unescape(title_match.group(1).strip()) if title_match else "",
+        page_source=html,
+        js_data=extract_grp15_from_source(html),
+        review_url=review_url,
+        final_url=final_url,
+        tier=TIER_HTTP
+    )
+
+
+class SnapshotCache:
+    def __init__(self, max_entries=8, fetcher=None):
+        """
+        URLごとのスナップショットを保持し、同じページの再読み込みを防ぐ
+
+        Args:
+            max_entries (int): 保持する最大件数
+            fetcher (TieredFetcher): Chromeより先にHTTPでの取得を試す取得エンジン（省略時はChromeのみ）
+        """
+        self.max_entries = max_entries
+        self.fetcher = fetcher
+        self.entries = OrderedDict()
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        """
+        保持しているスナップショットを取得
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            PageSnapshot: スナップショット（ない場合はNone）
+        """
+        with self.lock:
+            snapshot = self.entries.get(url)
+            if snapshot is not None:
+                self.entries.move_to_end(url)
+            return snapshot
+
+    def put(self, snapshot):
+        """
+        スナップショットを保存
+
+        Args:
+            snapshot (PageSnapshot): 保存するスナップショット
+        """
+        with self.lock:
+            self.entries[snapshot.url] = snapshot
+            self.entries.move_to_end(snapshot.url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_html(self, url):
+        """
+        HTTPで取得したページのHTMLを取得（同じURLは1回だけ取得し、取得できなかった結果も保持する）
+
+        スナップショットの作成と商品ページの項目の抽出で同じHTMLを使い、HTTPで二重に取得しない
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            tuple: (HTML, リダイレクト後のURL)。取得できない場合は(None, None)
+        """
+        if self.fetcher is None or not url:
+            return None, None
+
+        with self.lock:
+            page = self.pages.get(url)
+            if page is not None:
+                self.pages.move_to_end(url)
+                return page
+
+        page = self.fetcher.fetch_html(url)
+        with self.lock:
+            self.pages[url] = page
+            while len(self.pages) > self.max_entries:
+                self.pages.popitem(last=False)
+        return page
+
+    def get_or_fetch(self, url):
+        """
+        保持しているスナップショットを取得し、なければHTTPで取得したHTMLから作成
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            PageSnapshot: スナップショット（Chromeでの読み込みが必要な場合はNone）
+        """
+        snapshot = self.get(url)
+        if snapshot is not None or self.fetcher is None:
+            return snapshot
+
+        html, final_url = self.get_html(url)
+        snapshot = self.fetcher.snapshot_from_page(url, html, final_url)
+        if snapshot is not None:
+            self.put(snapshot)
+        return snapshot
+
+    def get_or_load(self, browser, url, ready=None, live=False):
+        """
+        スナップショットを取得し、なければページを1回だけ読み込んで作成
+
+        Args:
+            browser (RakutenInit): ページを読み込むブラウザ
+            url (str): ページのURL
+            ready (callable): 読み込み完了条件
+            live (bool): ブラウザがそのページを表示している必要があるか（DOMを直接参照する場合）
+
+        Returns:
+            PageSnapshot: スナップショット
+        """
+        snapshot = self.get(url)
+        if snapshot is not None and (not live or browser.loaded_url == url):
+            return snapshot
+
+        browser.load_page(url, ready=ready)
+        snapshot = capture_snapshot(browser.driver, url)
+        if self.fetcher is not None:
+            self.fetcher.record(url, 'js_data', TIER_BROWSER if snapshot.js_data else None)
+        self.put(snapshot)
+        return snapshot
+
+    def clear(self):
+        """
+        保持しているスナップショットとHTMLをすべて削除
+        """
+        with self.lock:
+            self.entries.clear()
+            self.pages.clear()
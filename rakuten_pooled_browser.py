@@ -0,0 +1,151 @@
+from rakuten_driver_pool import get_driver_pool
+from rakuten_page_ready import ITEM_PAGE_READY
+from rakuten_page_extractor import fill_missing_fields
+from rakuten_html_parser import completed
+from rakuten_tab_loader import get_tab_count
+
+
+class PooledBrowserMixin:
+    """
+    共有ドライバープールのブラウザを借りて商品ページのスナップショットを取得する処理（各スクレイパー共通）
+
+    使用するクラスは __init__ で browser, driver_pool, headless, scrape_profile, snapshots を設定する
+    """
+
+    # ブラウザで表示中の商品ページの解析待ちの情報（要素からの補完が済んでいないもの）
+    _live_pending = None
+
+    def _acquire_driver(self, headless=None):
+        """
+        共有ドライバープールからドライバーを借りる
+
+        Args:
+            headless (bool): ヘッドレスモードで実行するかどうか（省略時はself.headless）
+
+        Returns:
+            WebDriver: Seleniumドライバー
+        """
+        if headless is None:
+            headless = self.headless
+        if self.browser is None:
+            self.driver_pool = get_driver_pool(headless=headless, scrape_profile=self.scrape_profile)
+            self.browser = self.driver_pool.checkout()
+        return self.driver
+
+    def _release_driver(self):
+        """
+        借りたドライバーをプールに返却
+        """
+        if self.browser is not None:
+            self._finish_live_page()
+            self.driver_pool.checkin(self.browser)
+        self.browser = None
+
+    @property
+    def driver(self):
+        """
+        借りているブラウザのドライバー（再起動された場合も現在のドライバーを返す）
+        """
+        return self.browser.driver if self.browser is not None else None
+
+    def _get_snapshot(self, url, ready=ITEM_PAGE_READY, live=False):
+        """
+        商品ページのスナップショットを取得（同じURLは1回だけ読み込み、可能ならHTTPで取得する）
+
+        Args:
+            url (str): 商品ページのURL
+            ready (callable): 読み込み完了条件
+            live (bool): ブラウザがそのページを表示している必要があるか（DOMを直接参照する場合）
+
+        Returns:
+            PageSnapshot: スナップショット
+        """
+        # DOMを直接参照しない場合は、HTTPで取得したHTMLで足りればChromeを使わない
+        if not live:
+            snapshot = self.snapshots.get_or_fetch(url)
+            if snapshot is not None:
+                return snapshot
+
+        self._finish_live_page(url)
+        self._acquire_driver()
+        return self.snapshots.get_or_load(self.browser, url, ready=ready, live=live)
+
+    def _prefetch_pages(self, urls):
+        """
+        これから処理する商品ページのうち、HTTPで取得できないページをChromeの別のタブで読み込み始める
+
+        読み込んだタブは、そのページを_get_snapshotで読み込むときにそのまま表示中のページになるため、
+        要素から取得する処理もページを読み込み直さずに使える（環境変数 RAKUTEN_TABS が2以上の場合のみ）
+
+        Args:
+            urls (list): これから処理する順の商品ページのURL
+        """
+        tabs = get_tab_count()
+        if tabs <= 1:
+            return
+        missing = [url for url in urls[:tabs] if url and self.snapshots.get_or_fetch(url) is None]
+        if not missing and self.browser is None:
+            return
+        self._acquire_driver()
+        self.browser.prefetch_pages(missing)
+
+    def _track_live_page(self, pending):
+        """
+        ブラウザで表示中の商品ページから解析を依頼した情報を記録する
+
+        HTMLの解析は次のページの読み込みと並行して行うが、解析できなかった項目を要素から補う処理は
+        ブラウザが別のページに移動する前（_finish_live_page）に済ませる
+
+        Args:
+            pending (dict): load_additional_infoの解析待ちの情報
+        """
+        self._finish_live_page(pending['url'])
+        self._live_pending = pending
+
+    def _finish_live_page(self, url=None):
+        """
+        ブラウザが別のページに移動する前に、表示中の商品ページで解析できなかった項目を要素から補う
+
+        Args:
+            url (str): 次に表示するページのURL（表示中のページと同じ場合は何もしない）
+        """
+        pending = self._live_pending
+        if pending is None or (url is not None and url == pending['url']):
+            return
+        self._page_data(pending)
+
+    def _page_data(self, pending):
+        """
+        商品ページの解析結果を取得（解析できなかった項目は、ブラウザがまだ同じページを表示していれば要素から取得）
+
+        一度補った結果はpendingに保存し、ブラウザが別のページに移動した後も使う
+
+        Args:
+            pending (dict): load_additional_infoの解析待ちの情報
+
+        Returns:
+            dict: 抽出結果（extract_item_pageと同じ形式）
+        """
+        if self._live_pending is pending:
+            self._live_pending = None
+        if pending['page'] is None:
+            return {}
+
+        page_data = {}
+        try:
+            page_data = pending['page'].result()
+        except Exception as e:
+            print(f"HTMLの解析中にエラーが発生しました: {e}")
+
+        if not pending.get('filled') and self.browser is not None and self.browser.loaded_url == pending['url']:
+            page_data = fill_missing_fields(self.driver, page_data, **pending['selectors'])
+        pending['page'] = completed(page_data)
+        pending['filled'] = True
+        return page_data
+
+    def close(self):
+        """
+        リソースを解放（ドライバーはプールに返却して再利用する）
+        """
+        self._release_driver()
+        self.snapshots.clear()
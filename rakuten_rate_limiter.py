@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    # Windowsなどfcntlが使えない環境ではプロセス内のみで制限する
+    fcntl = None
+
+# ホストごとのリクエスト予算（1秒あたりのリクエスト数, バースト上限）
+DEFAULT_HOST_BUDGETS = {
+    "app.rakuten.co.jp": (1.0, 1),
+    "item.rakuten.co.jp": (2.0, 2),
+    "review.rakuten.co.jp": (2.0, 2),
+}
+
+# 上記以外のホストに適用する予算
+DEFAULT_BUDGET = (2.0, 2)
+
+
+class TokenBucket:
+    def __init__(self, name, rate, capacity, state_dir=None):
+        """
+        トークンバケットの初期化
+
+        state_dirを指定するとバケットの状態をファイルに保存し、
+        ファイルロックで排他することで複数プロセス間で予算を共有する
+
+        Args:
+            name (str): バケット名（ホスト名）
+            rate (float): 1秒あたりに補充されるトークン数
+            capacity (int): バケットの最大トークン数（バースト上限）
+            state_dir (str): 状態ファイルを保存するディレクトリ（Noneの場合はプロセス内のみ）
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.time()
+        self.lock = threading.Lock()
+        self.state_path = None
+
+        if state_dir and fcntl is not None:
+            os.makedirs(state_dir, exist_ok=True)
+            self.state_path = os.path.join(state_dir, f"{name}.bucket")
+
+    def _take(self, tokens, state):
+        """
+        状態を補充したうえでトークンを取り出す
+
+        Args:
+            tokens (float): 取り出すトークン数
+            state (dict): {"tokens": 残量, "updated_at": 最終更新時刻}
+
+        Returns:
+            float: 待機が必要な秒数（0の場合は取得成功）
+        """
+        now = time.time()
+        elapsed = max(0.0, now - state["updated_at"])
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * self.rate)
+        state["updated_at"] = now
+
+        if state["tokens"] >= tokens:
+            state["tokens"] -= tokens
+            return 0.0
+        return (tokens - state["tokens"]) / self.rate
+
+    def _try_acquire_shared(self, tokens):
+        """
+        ファイルロックで排他しながら共有状態からトークンを取り出す
+        """
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 256)
+            try:
+                state = json.loads(raw.decode("utf-8")) if raw else None
+            except ValueError:
+                state = None
+            if not state:
+                state = {"tokens": self.capacity, "updated_at": time.time()}
+
+            wait = self._take(tokens, state)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode("utf-8"))
+            return wait
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _try_acquire_local(self, tokens):
+        """
+        プロセス内の状態からトークンを取り出す
+        """
+        state = {"tokens": self.tokens, "updated_at": self.updated_at}
+        wait = self._take(tokens, state)
+        self.tokens = state["tokens"]
+        self.updated_at = state["updated_at"]
+        return wait
+
+    def acquire(self, tokens=1):
+        """
+        トークンが取得できるまで待機
+
+        Args:
+            tokens (float): 取得するトークン数
+
+        Returns:
+            float: 待機した合計秒数
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                if self.state_path:
+                    wait = self._try_acquire_shared(tokens)
+                else:
+                    wait = self._try_acquire_local(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimiter:
+    def __init__(self, budgets=None, default_budget=DEFAULT_BUDGET, state_dir=None):
+        """
+        ホスト別トークンバケットによるレート制限の初期化
+
+        Args:
+            budgets (dict): ホスト名 -> (1秒あたりのリクエスト数, バースト上限)
+            default_budget (tuple): 未登録ホストに適用する予算
+            state_dir (str): プロセス間で状態を共有するディレクトリ
+        """
+        self.budgets = dict(DEFAULT_HOST_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self.state_dir = state_dir
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, host):
+        """
+        ホストに対応するトークンバケットを取得
+
+        Args:
+            host (str): ホスト名
+
+        Returns:
+            TokenBucket: トークンバケット
+        """
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, capacity = self.budgets.get(host, self.default_budget)
+                bucket = TokenBucket(host, rate, capacity, state_dir=self.state_dir)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host, tokens=1):
+        """
+        URLまたはホスト名の予算からトークンを取得するまで待機
+
+        Args:
+            url_or_host (str): リクエスト先のURLまたはホスト名
+            tokens (float): 取得するトークン数
+
+        Returns:
+            float: 待機した合計秒数
+        """
+        host = urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host
+        return self.get_bucket(host or "").acquire(tokens)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    共有レート制限を取得
+
+    状態ファイルは環境変数 RAKUTEN_RATE_LIMIT_DIR（未設定時は一時ディレクトリ）に置かれ、
+    同じマシン上のスレッド・ワーカープロセス間で予算が共有される
+
+    Returns:
+        RateLimiter: 共有レート制限
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                state_dir = os.environ.get('RAKUTEN_RATE_LIMIT_DIR') or os.path.join(tempfile.gettempdir(), "rakuten_rate_limit")
+                _shared_limiter = RateLimiter(state_dir=state_dir)
+    return _shared_limiter
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# キャッシュ設定（環境変数で上書き可能）
+DEFAULT_CACHE_DIR = os.path.join(".cache", "rakuten_search")
+DEFAULT_TTL = 6 * 60 * 60  # 6時間
+DEFAULT_MAX_ENTRIES = 5000
+
+# キャッシュキーから除外するパラメータ
+EXCLUDED_PARAMS = ("applicationId", "affiliateId")
+
+
+def make_cache_key(url, params):
+    """
+    リクエストURLと正規化したパラメータからキャッシュキーを生成
+
+    Args:
+        url (str): リクエスト先URL
+        params (dict): クエリパラメータ
+
+    Returns:
+        str: キャッシュキー
+    """
+    normalized = sorted(
+        (str(key), str(value))
+        for key, value in (params or {}).items()
+        if key not in EXCLUDED_PARAMS and value is not None
+    )
+    raw = json.dumps([url, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        API応答をSQLiteに保存するTTL/LRUキャッシュの初期化
+
+        Args:
+            path (str): キャッシュファイルのパス
+            ttl (float): 有効期限（秒）
+            max_entries (int): 保持する最大件数（超えた分は最終参照の古い順に削除）
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body TEXT,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self.conn.commit()
+
+    def get(self, url, params):
+        """
+        キャッシュから応答を取得
+
+        Args:
+            url (str): リクエスト先URL
+            params (dict): クエリパラメータ
+
+        Returns:
+            dict: キャッシュされたAPI応答（ないか期限切れの場合はNone）
+        """
+        key = make_cache_key(url, params)
+        now = time.time()
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, url, params, body):
+        """
+        応答をキャッシュに保存し、上限を超えた分を削除
+
+        Args:
+            url (str): リクエスト先URL
+            params (dict): クエリパラメータ
+            body (dict): API応答
+        """
+        key = make_cache_key(url, params)
+        now = time.time()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, url, json.dumps(body, ensure_ascii=False), now, now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """
+        期限切れの応答と、最大件数を超えた最終参照の古い応答を削除
+        """
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        """
+        キャッシュをすべて削除
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def stats(self):
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            dict: ヒット数、ミス数、ヒット率、保存件数
+        """
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries
+        }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    共有レスポンスキャッシュを取得
+
+    環境変数 RAKUTEN_CACHE_DIR / RAKUTEN_CACHE_TTL / RAKUTEN_CACHE_MAX_ENTRIES で設定を変更できる
+
+    Returns:
+        ResponseCache: 共有レスポンスキャッシュ
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                cache_dir = os.environ.get('RAKUTEN_CACHE_DIR', DEFAULT_CACHE_DIR)
+                _shared_cache = ResponseCache(
+                    os.path.join(cache_dir, "api_responses.sqlite3"),
+                    ttl=float(os.environ.get('RAKUTEN_CACHE_TTL', DEFAULT_TTL)),
+                    max_entries=int(os.environ.get('RAKUTEN_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+                )
+    return _shared_cache
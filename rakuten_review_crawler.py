@@ -0,0 +1,225 @@
+import os
+import re
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# レビュー取得の設定（環境変数で上書き可能）
+DEFAULT_MAX_REVIEWS = 20  # 商品ごとの分析で取得するレビュー数
+DEFAULT_REVIEW_PAGE_WORKERS = 4
+REVIEW_PAGE_LIMIT = 100  # 1ページから取り出す最大件数（1ページの表示件数より十分大きい値）
+
+# 新しい順に並べるときのレビューページの並び順（URLのページ番号の後の値）
+NEWEST_FIRST_SORT = 6
+
+# ページ番号をパスに含むレビューページのURL（例: https://review.rakuten.co.jp/item/1/shop_item/2.1/）
+REVIEW_PAGE_PATTERN = re.compile(r'^(https?://review\.rakuten\.co\.jp/item/\d+/[^/?#]+/)(\d+)\.(\d+)(/?.*)$')
+
+
+def get_review_page_workers(workers=None):
+    """
+    同時に取得するレビューページ数を決定
+
+    Args:
+        workers (int): 指定されたページ数（省略時は環境変数 RAKUTEN_REVIEW_PAGE_WORKERS、既定は4）
+
+    Returns:
+        int: ページ数（1の場合は順に取得する）
+    """
+    if workers is None:
+        workers = int(os.environ.get('RAKUTEN_REVIEW_PAGE_WORKERS', DEFAULT_REVIEW_PAGE_WORKERS))
+    return max(1, int(workers))
+
+
+def review_page_number(url):
+    """
+    レビューページのURLからページ番号を取得（ページ番号を含まないURLの場合はNone）
+    """
+    match = REVIEW_PAGE_PATTERN.match(url or "")
+    return int(match.group(2)) if match else None
+
+
+def review_page_url(url, page, sort=None):
+    """
+    レビューページのURLのページ番号（と並び順）を置き換える
+
+    Args:
+        url (str): ページ番号を含むレビューページのURL
+        page (int): ページ番号
+        sort (int): 並び順（省略時は元のURLのまま）
+
+    Returns:
+        str: 指定したページのURL（ページ番号を含まないURLの場合はNone）
+    """
+    match = REVIEW_PAGE_PATTERN.match(url or "")
+    if not match:
+        return None
+    prefix, _, current_sort, rest = match.groups()
+    return f"{prefix}{page}.{current_sort if sort is None else sort}{rest}"
+
+
+def _review_key(review):
+    """
+    同じページを二度取得していないか確認するためのレビューの識別値
+    """
+    return (review.get("date"), review.get("rating"), (review.get("comment") or "")[:100])
+
+
+class ReviewCrawler:
+    def __init__(self, load_page, fetch_page=None, max_reviews=None, workers=None):
+        """
+        レビューページを順に辿り、1ページずつレビューを返すクローラー
+
+        ページ番号をURLで指定できる場合は、先のページをHTTPで同時に取得しておく。
+        取得済みのページは順番が来るまでしか保持しないため、レビューが多い商品でもメモリを使い切らない
+
+        Args:
+            load_page (callable): レビューページを取得する関数（URL, 最大件数）。HTTPで取得できなければChromeで読み込む
+            fetch_page (callable): HTTPだけでレビューページを取得する関数（URL, 最大件数）。スレッドから呼ばれる
+            max_reviews (int): 取得する最大件数（Noneの場合はすべて）
+            workers (int): 同時に取得するページ数（省略時は環境変数 RAKUTEN_REVIEW_PAGE_WORKERS）
+        """
+        self.load_page = load_page
+        self.fetch_page = fetch_page
+        self.max_reviews = max_reviews
+        self.workers = get_review_page_workers(workers)
+        self.stopped = threading.Event()
+        self.review_count = 0
+        self.page_count = 0
+        self.reached_end = False
+
+    def stop(self):
+        """
+        取得を中止する（ほかのスレッドやコールバックからも呼べる）
+        """
+        self.stopped.set()
+
+    def _remaining(self):
+        """
+        あと何件取得するか
+        """
+        if self.max_reviews is None:
+            return REVIEW_PAGE_LIMIT
+        return min(REVIEW_PAGE_LIMIT, self.max_reviews - self.review_count)
+
+    def _pages_ahead(self, page_size):
+        """
+        先読みするページ数（残りの件数を取得するのに必要なページ数まで）
+
+        Args:
+            page_size (int): 直前に取得したページのレビュー数
+
+        Returns:
+            int: 先読みするページ数
+        """
+        if self.max_reviews is None or page_size <= 0:
+            return self.workers
+        return min(self.workers, math.ceil((self.max_reviews - self.review_count) / page_size))
+
+    def _load(self, url):
+        """
+        レビューページを1ページ取得（失敗した場合はNone）
+        """
+        try:
+            return self.load_page(url, self._remaining())
+        except Exception as e:
+            print(f"レビューページの取得中にエラー: {e}")
+            return None
+
+    def crawl(self, url):
+        """
+        レビューページを辿り、1ページずつレビューを返す
+
+        呼び出し側はループを抜ける（またはstopを呼ぶ）だけで、先読み中のページも含めて取得を中止できる。
+        最終ページまで辿った場合だけ reached_end がTrueになる（中止・件数の上限・取得の失敗ではFalseのまま）
+
+        Args:
+            url (str): 最初のレビューページのURL
+
+        Yields:
+            dict: {"page": ページ番号（1から）, "url": ページのURL, "reviews": [...]}
+        """
+        self.review_count = 0
+        self.page_count = 0
+        self.reached_end = False
+        executor = None
+        ahead = deque()
+        seen = set()
+        prefetch = self.fetch_page is not None and self.workers > 1
+
+        try:
+            page_url = url
+            review_page = self._load(page_url)
+            while review_page and review_page['reviews'] and not self.stopped.is_set():
+                reviews = review_page['reviews'][:self._remaining()]
+
+                # 最終ページを過ぎると1ページ目に戻るサイトがあるため、同じレビューが出たら終了
+                key = _review_key(reviews[0])
+                if key in seen:
+                    self.reached_end = True
+                    break
+                seen.add(key)
+
+                self.page_count += 1
+                self.review_count += len(reviews)
+                yield {"page": self.page_count, "url": page_url, "reviews": reviews}
+
+                if self.stopped.is_set() or (self.max_reviews is not None and self.review_count >= self.max_reviews):
+                    break
+                if not review_page['next_url']:
+                    self.reached_end = True
+                    break
+
+                # 先のページをHTTPで同時に取得しておく（ページ番号をURLで指定できる場合のみ）
+                number = review_page_number(page_url)
+                base_url = page_url
+                if number is None:
+                    base_url = review_page['next_url']
+                    number = review_page_number(base_url)
+                    number = number - 1 if number is not None else None
+                if prefetch and number is not None:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=self.workers)
+                    planned = number + 1 + len(ahead)
+                    while len(ahead) < self._pages_ahead(len(review_page['reviews'])):
+                        ahead_url = review_page_url(base_url, planned)
+                        ahead.append((ahead_url, executor.submit(self.fetch_page, ahead_url, REVIEW_PAGE_LIMIT)))
+                        planned += 1
+
+                if ahead:
+                    page_url, future = ahead.popleft()
+                    try:
+                        review_page = future.result()
+                    except Exception as e:
+                        print(f"レビューページの先読み中にエラー: {e}")
+                        review_page = None
+                    if review_page is None:
+                        # HTTPで取得できなかったページは通常の読み込みで取得し、以降の先読みはやめる
+                        for _, pending in ahead:
+                            pending.cancel()
+                        ahead.clear()
+                        prefetch = False
+                        review_page = self._load(page_url)
+                    continue
+
+                page_url = review_page['next_url']
+                review_page = self._load(page_url)
+        finally:
+            for _, pending in ahead:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def reviews(self, url):
+        """
+        レビューを1件ずつ返す（crawlのページを展開したもの）
+
+        Args:
+            url (str): 最初のレビューページのURL
+
+        Yields:
+            dict: レビュー
+        """
+        for page in self.crawl(url):
+            yield from page['reviews']
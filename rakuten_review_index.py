@@ -0,0 +1,363 @@
+import os
+import re
+import sys
+import glob
+import time
+import sqlite3
+import threading
+import unicodedata
+import pandas as pd
+from rakuten_response_cache import DEFAULT_CACHE_DIR
+
+# 索引の対象とするレビューCSV（save_reviews_to_csvが保存するファイル）
+REVIEW_FILE_PATTERN = "rakuten_*_reviews_*.csv"
+
+# レビューCSVの列と索引の列の対応
+REVIEW_CSV_COLUMNS = {
+    'keyword': 'keyword',
+    'item_name': 'item_name',
+    'shop_name': 'shop_name',
+    'review_rating': 'rating',
+    'review_title': 'title',
+    'review_comment': 'comment',
+    'review_date': 'date'
+}
+
+# 索引の形式のバージョン（変わった場合は索引を作り直す）
+INDEX_VERSION = 2
+
+# 候補を絞り込むときに使うn-gramの数（出現件数の少ない順）
+CANDIDATE_GRAMS = 3
+
+# 一度に確認する候補の件数
+CANDIDATE_BATCH = 500
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    検索用に文字列を正規化（全角英数字・半角カナの統一、小文字化、空白の圧縮）
+    """
+    text = unicodedata.normalize('NFKC', str(text or '')).lower()
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def bigrams(text):
+    """
+    正規化した文字列の文字bigramの集合（空白をまたがない）
+
+    形態素解析を使わずに日本語を検索できるように、2文字ずつ区切って索引を作る
+
+    Args:
+        text (str): normalize_textで正規化した文字列
+
+    Returns:
+        set: 文字bigramの集合
+    """
+    grams = set()
+    for segment in text.split(' '):
+        for i in range(len(segment) - 1):
+            grams.add(segment[i:i + 2])
+    return grams
+
+
+def index_grams(text):
+    """
+    索引に登録するn-gramの集合（文字bigramと、1文字の検索語に使う文字unigram）
+
+    Args:
+        text (str): normalize_textで正規化した文字列
+
+    Returns:
+        set: n-gramの集合
+    """
+    grams = bigrams(text)
+    grams.update(char for char in text if char != ' ')
+    return grams
+
+
+def query_grams(term):
+    """
+    検索語1つの候補を絞り込むn-gramの集合（1文字の語は文字unigram）
+    """
+    return bigrams(term) if len(term) > 1 else {term}
+
+
+class ReviewIndex:
+    def __init__(self, path):
+        """
+        レビューCSVのタイトルと本文の転置索引（文字bigramと文字unigram）をSQLiteに保存する
+
+        形式の古い索引は空にして、次のupdateで作り直す
+
+        Args:
+            path (str): 索引ファイルのパス
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime REAL,
+                size INTEGER,
+                indexed_at REAL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                id INTEGER PRIMARY KEY,
+                path TEXT,
+                keyword TEXT,
+                item_name TEXT,
+                shop_name TEXT,
+                rating REAL,
+                title TEXT,
+                comment TEXT,
+                date TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_path ON reviews(path)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                gram TEXT,
+                review_id INTEGER,
+                PRIMARY KEY (gram, review_id)
+            ) WITHOUT ROWID
+        """)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM reviews")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.commit()
+
+    def _remove_file(self, path):
+        """
+        ファイルのレビューを索引から削除（ロックを取得して呼ぶ）
+
+        n-gramを作り直して削除するため、索引全体を走査しない
+        """
+        rows = self.conn.execute("SELECT id, title, comment FROM reviews WHERE path = ?", (path,)).fetchall()
+        self.conn.executemany(
+            "DELETE FROM postings WHERE gram = ? AND review_id = ?",
+            (
+                (gram, review_id)
+                for review_id, title, comment in rows
+                for gram in index_grams(normalize_text(f"{title} {comment}"))
+            )
+        )
+        self.conn.execute("DELETE FROM reviews WHERE path = ?", (path,))
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def add_file(self, path):
+        """
+        レビューCSVを1ファイル索引に追加（すでにある場合は入れ替える）
+
+        Args:
+            path (str): レビューCSVのパス
+
+        Returns:
+            int: 追加したレビュー数
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        df = pd.read_csv(path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+        df = df.reindex(columns=list(REVIEW_CSV_COLUMNS)).rename(columns=REVIEW_CSV_COLUMNS).fillna('')
+        df = df[(df['title'] != '') | (df['comment'] != '')]
+        df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+
+        with self.lock:
+            self._remove_file(path)
+            next_id = (self.conn.execute("SELECT MAX(id) FROM reviews").fetchone()[0] or 0) + 1
+            ids = range(next_id, next_id + len(df))
+            self.conn.executemany(
+                "INSERT INTO reviews (id, path, keyword, item_name, shop_name, rating, title, comment, date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (review_id, path, row.keyword, row.item_name, row.shop_name,
+                     None if pd.isna(row.rating) else float(row.rating), row.title, row.comment, row.date)
+                    for review_id, row in zip(ids, df.itertuples(index=False))
+                )
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO postings (gram, review_id) VALUES (?, ?)",
+                (
+                    (gram, review_id)
+                    for review_id, title, comment in zip(ids, df['title'], df['comment'])
+                    for gram in index_grams(normalize_text(f"{title} {comment}"))
+                )
+            )
+            self.conn.execute(
+                "INSERT INTO files (path, mtime, size, indexed_at) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, time.time())
+            )
+            self.conn.commit()
+        return len(df)
+
+    def update(self, directory="output", pattern=REVIEW_FILE_PATTERN):
+        """
+        ディレクトリのレビューCSVと索引を同期（新しいファイル・変更されたファイルだけ索引を作り直す）
+
+        Args:
+            directory (str): レビューCSVのディレクトリ
+            pattern (str): 対象とするファイル名のパターン
+
+        Returns:
+            dict: added（追加・更新したファイル数）, removed（削除したファイル数）, reviews（追加したレビュー数）
+        """
+        with self.lock:
+            indexed = {
+                path: (mtime, size)
+                for path, mtime, size in self.conn.execute("SELECT path, mtime, size FROM files")
+            }
+
+        result = {"added": 0, "removed": 0, "reviews": 0}
+        paths = {os.path.abspath(path) for path in glob.glob(os.path.join(directory, pattern))}
+        for path in sorted(paths):
+            stat = os.stat(path)
+            if indexed.get(path) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                result["reviews"] += self.add_file(path)
+                result["added"] += 1
+            except Exception as e:
+                print(f"レビューCSVの索引作成中にエラー: {path}: {e}")
+
+        # 削除されたファイルのレビューは索引からも削除
+        directory = os.path.abspath(directory)
+        for path in indexed:
+            if os.path.dirname(path) == directory and path not in paths:
+                with self.lock:
+                    self._remove_file(path)
+                    self.conn.commit()
+                result["removed"] += 1
+
+        if result["added"] or result["removed"]:
+            print(f"レビューの索引を更新しました: {result}")
+        return result
+
+    def _candidate_ids(self, grams):
+        """
+        すべてのn-gramを含むレビューのID（出現件数の少ないn-gramから絞り込む）
+        """
+        counts = sorted(
+            (self.conn.execute("SELECT COUNT(*) FROM postings WHERE gram = ?", (gram,)).fetchone()[0], gram)
+            for gram in grams
+        )
+        if not counts or counts[0][0] == 0:
+            return []
+        rarest = [gram for _, gram in counts[:CANDIDATE_GRAMS]]
+        sql = " INTERSECT ".join(["SELECT review_id FROM postings WHERE gram = ?"] * len(rarest))
+        return [row[0] for row in self.conn.execute(f"{sql} ORDER BY review_id DESC", rarest)]
+
+    def search(self, query, limit=50, keyword=None):
+        """
+        レビューのタイトル・本文を検索（空白区切りの語はすべて含むものを返す）
+
+        Args:
+            query (str): 検索語
+            limit (int): 返す最大件数
+            keyword (str): 検索キーワード（CSVのkeyword列）で絞り込む
+
+        Returns:
+            list: レビューの辞書（keyword, item_name, shop_name, rating, title, comment, date, file）のリスト（新しいファイルの順）
+        """
+        terms = normalize_text(query).split(' ')
+        terms = [term for term in terms if term]
+        if not terms:
+            return []
+
+        grams = set()
+        for term in terms:
+            grams |= query_grams(term)
+
+        columns = "id, keyword, item_name, shop_name, rating, title, comment, date, path"
+        results = []
+        with self.lock:
+            ids = self._candidate_ids(grams)
+            batches = (ids[i:i + CANDIDATE_BATCH] for i in range(0, len(ids), CANDIDATE_BATCH))
+            rows = (
+                row
+                for batch in batches
+                for row in self.conn.execute(
+                    f"SELECT {columns} FROM reviews WHERE id IN ({','.join('?' * len(batch))}) ORDER BY id DESC",
+                    batch
+                )
+            )
+
+            # n-gramがすべて含まれていても語として含まれているとは限らないため、本文で確認する
+            for row in rows:
+                if keyword and row[1] != keyword:
+                    continue
+                text = normalize_text(f"{row[5]} {row[6]}")
+                if all(term in text for term in terms):
+                    results.append({
+                        "keyword": row[1],
+                        "item_name": row[2],
+                        "shop_name": row[3],
+                        "rating": row[4],
+                        "title": row[5],
+                        "comment": row[6],
+                        "date": row[7],
+                        "file": os.path.basename(row[8])
+                    })
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def stats(self):
+        """
+        索引の統計情報を取得
+
+        Returns:
+            dict: ファイル数、レビュー数
+        """
+        with self.lock:
+            files = self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            reviews = self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        return {"files": files, "reviews": reviews}
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_review_index():
+    """
+    共有のレビュー索引を取得
+
+    環境変数 RAKUTEN_CACHE_DIR で保存先を変更できる
+
+    Returns:
+        ReviewIndex: 共有のレビュー索引
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                cache_dir = os.environ.get('RAKUTEN_CACHE_DIR', DEFAULT_CACHE_DIR)
+                _shared_index = ReviewIndex(os.path.join(cache_dir, "review_index.sqlite3"))
+    return _shared_index
+
+
+# 使用例
+if __name__ == "__main__":
+    index = get_review_index()
+    index.update()
+    if len(sys.argv) > 1:
+        start = time.perf_counter()
+        found = index.search(" ".join(sys.argv[1:]))
+        elapsed = (time.perf_counter() - start) * 1000
+        for review in found:
+            print(f"[{review['file']}] ⭐{review['rating']} {review['item_name'][:30]}: {review['comment'][:80]}")
+        print(f"{len(found)}件（{elapsed:.1f}ミリ秒）")
+    else:
+        print(index.stats())
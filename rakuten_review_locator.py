@@ -0,0 +1,159 @@
+import os
+import time
+import sqlite3
+import threading
+from rakuten_url_utils import build_review_url, item_key
+from rakuten_response_cache import DEFAULT_CACHE_DIR
+
+# 解決済みのレビューURLの有効期限（環境変数で上書き可能）
+DEFAULT_REVIEW_URL_TTL = 30 * 24 * 60 * 60  # 30日
+
+# grp15_ias_prmでショップIDと商品IDに使われる項目名の候補（優先順）
+SHOP_ID_KEYS = ("shopId", "shop_id", "shopid")
+ITEM_ID_KEYS = ("itemId", "item_id", "itemid")
+
+
+def review_url_from_js_data(js_data):
+    """
+    商品ページのgrp15_ias_prmのショップIDと商品IDからレビューページのURLを組み立てる
+
+    Args:
+        js_data (dict): grp15_ias_prmのデータ
+
+    Returns:
+        str: レビューページのURL（IDが見つからない場合はNone）
+    """
+    if not isinstance(js_data, dict):
+        return None
+    shop_id = next((js_data[key] for key in SHOP_ID_KEYS if js_data.get(key)), None)
+    item_id = next((js_data[key] for key in ITEM_ID_KEYS if js_data.get(key)), None)
+    return build_review_url(shop_id, item_id)
+
+
+class ReviewLocator:
+    def __init__(self, path, ttl=DEFAULT_REVIEW_URL_TTL):
+        """
+        商品ごとに解決したレビューページのURLをSQLiteに保存するキャッシュの初期化
+
+        Args:
+            path (str): キャッシュファイルのパス
+            ttl (float): 有効期限（秒）
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS review_urls (
+                item_key TEXT PRIMARY KEY,
+                review_url TEXT,
+                resolved_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, key):
+        """
+        キャッシュからレビューページのURLを取得
+
+        Args:
+            key (str): 商品のキー（"ショップコード:商品コード"）
+
+        Returns:
+            str: レビューページのURL（ないか期限切れの場合はNone）
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT review_url, resolved_at FROM review_urls WHERE item_key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def set(self, key, review_url):
+        """
+        解決したレビューページのURLを保存
+
+        Args:
+            key (str): 商品のキー（"ショップコード:商品コード"）
+            review_url (str): レビューページのURL
+        """
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO review_urls (item_key, review_url, resolved_at) VALUES (?, ?, ?)",
+                (key, review_url, time.time())
+            )
+            self.conn.commit()
+
+    def locate(self, item_url, item_code=None, resolve=None):
+        """
+        商品のレビューページのURLを取得（キャッシュにない場合だけresolveで調べる）
+
+        Args:
+            item_url (str): 商品ページのURL
+            item_code (str): APIのitemCode（省略時は商品ページのURLから求める）
+            resolve (callable): キャッシュにない場合にレビューページのURLを調べる関数（商品ページのURL）
+
+        Returns:
+            str: レビューページのURL（見つからない場合はNone）
+        """
+        key = item_key(item_url, item_code)
+        if key is not None:
+            review_url = self.get(key)
+            if review_url:
+                return review_url
+
+        review_url = resolve(item_url) if resolve is not None else None
+        # 商品ページへのフォールバックなど、レビューページ以外のURLは保存しない
+        if review_url and key is not None and 'review.rakuten.co.jp' in review_url:
+            self.set(key, review_url)
+        return review_url
+
+    def stats(self):
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            dict: ヒット数、ミス数、ヒット率
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+_shared_locator = None
+_shared_locator_lock = threading.Lock()
+
+
+def get_review_locator():
+    """
+    共有のレビューURLキャッシュを取得
+
+    環境変数 RAKUTEN_CACHE_DIR / RAKUTEN_REVIEW_URL_TTL で設定を変更できる
+
+    Returns:
+        ReviewLocator: 共有のレビューURLキャッシュ
+    """
+    global _shared_locator
+    if _shared_locator is None:
+        with _shared_locator_lock:
+            if _shared_locator is None:
+                cache_dir = os.environ.get('RAKUTEN_CACHE_DIR', DEFAULT_CACHE_DIR)
+                _shared_locator = ReviewLocator(
+                    os.path.join(cache_dir, "review_urls.sqlite3"),
+                    ttl=float(os.environ.get('RAKUTEN_REVIEW_URL_TTL', DEFAULT_REVIEW_URL_TTL))
+                )
+    return _shared_locator
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+from urllib.parse import urljoin
+from rakuten_page_ready import REVIEW_LIST_SELECTOR
+from rakuten_page_snapshot import TIER_BROWSER, TIER_NETWORK
+from rakuten_page_extractor import (
+    REVIEW_RATING_SELECTOR, REVIEW_DATE_SELECTOR, REVIEW_TITLE_SELECTOR, REVIEW_BODY_SELECTORS, build_review, extract_reviews
+)
+from rakuten_html_parser import HTML_PARSER_BACKEND, run_parse, _parse, _select, _select_first, _text, _attr
+
+# レビュー1件の項目とセレクタ（優先順）
+REVIEW_FIELD_SELECTORS = (
+    ("rating", (REVIEW_RATING_SELECTOR,)),
+    ("date", (REVIEW_DATE_SELECTOR,)),
+    ("title", (REVIEW_TITLE_SELECTOR,)),
+    ("comment", tuple(REVIEW_BODY_SELECTORS)),
+)
+
+# 次ページへのリンクの文字列
+NEXT_PAGE_TEXTS = ("次へ", "次の")
+
+# 解析速度の計測に使うレビューページのHTML
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "review_page.html")
+
+
+def _next_page_url(root, base_url):
+    """
+    レビューページの次ページのURL（ない場合はNone）
+    """
+    link = _select_first(root, "a[href*='page=2']")
+    if link is None:
+        link = next((
+            node for node in _select(root, "a")
+            if any(text in _text(node) for text in NEXT_PAGE_TEXTS) or 'next' in _attr(node, "class")
+        ), None)
+    if link is not None and _attr(link, "href"):
+        return urljoin(base_url, _attr(link, "href"))
+    return None
+
+
+def parse_review_html(html, base_url, limit):
+    """
+    レビューページのHTMLからレビュー一覧と次ページのURLを抽出
+
+    HTMLを1回解析し、レビューの要素ごとに各項目の最初の要素だけを探す。
+    HTTPで取得したページ・ブラウザで読み込んだページのどちらもこの関数で解析する
+
+    Args:
+        html (str): レビューページのHTML
+        base_url (str): 相対URLを解決するためのページURL
+        limit (int): 取得する最大件数
+
+    Returns:
+        dict: {"reviews": [...], "next_url": ...}（レビューはrating, title, comment, dateのみの辞書）
+    """
+    root = _parse(html)
+
+    reviews = []
+    for container in _select(root, REVIEW_LIST_SELECTOR)[:limit]:
+        raw = {}
+        for key, selectors in REVIEW_FIELD_SELECTORS:
+            for selector in selectors:
+                node = _select_first(container, selector)
+                if node is not None:
+                    raw[key] = _text(node)
+                    break
+
+        review = build_review(raw)
+        if review:
+            reviews.append(review)
+
+    return {"reviews": reviews, "next_url": _next_page_url(root, base_url)}
+
+
+def parse_live_review_page(browser, url, limit):
+    """
+    ブラウザで表示中のレビューページからレビュー一覧を取得
+
+    ページが読み込んだレビューのJSONがあればそのまま使い、なければHTMLを解析する（結果をすぐに使うためこのプロセスで解析）。
+    パーサーがない場合や解析に失敗した場合はブラウザ上で1回のスクリプト実行で抽出する
+
+    Args:
+        browser (RakutenInit): レビューページを表示しているRakutenInit
+        url (str): レビューページのURL
+        limit (int): 取得する最大件数
+
+    Returns:
+        tuple: ({"reviews": [...], "next_url": ...}, 取得方法（取得できなかった場合はNone）)
+    """
+    if browser.network_capture is not None:
+        review_page = browser.network_capture.capture_reviews(limit)
+        if review_page is not None:
+            return review_page, TIER_NETWORK
+
+    review_page = None
+    future = run_parse(parse_review_html, browser.driver.page_source, url, limit)
+    if future is not None:
+        try:
+            review_page = future.result()
+        except Exception as e:
+            print(f"レビューページの解析中にエラーが発生しました: {e}")
+    if not review_page or not review_page['reviews']:
+        review_page = extract_reviews(browser.driver, limit)
+    return review_page, TIER_BROWSER if review_page['reviews'] else None
+
+
+def benchmark_parse(path=FIXTURE_PATH, runs=200, limit=100):
+    """
+    レビューページのHTMLの解析速度を計測
+
+    Args:
+        path (str): レビューページのHTMLファイル
+        runs (int): 解析する回数
+        limit (int): 1ページから取得する最大件数
+
+    Returns:
+        dict: 1ページあたりの平均解析時間（ミリ秒）、1ページのレビュー数、解析に使ったライブラリ
+    """
+    if HTML_PARSER_BACKEND is None:
+        print("selectolaxまたはlxmlがインストールされていないため計測できません")
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+
+    review_count = len(parse_review_html(html, "https://review.rakuten.co.jp/", limit)['reviews'])
+    start = time.perf_counter()
+    for _ in range(runs):
+        parse_review_html(html, "https://review.rakuten.co.jp/", limit)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "backend": HTML_PARSER_BACKEND,
+        "reviews_per_page": review_count,
+        "ms_per_page": elapsed / runs * 1000
+    }
+    print(
+        f"{HTML_PARSER_BACKEND}: 1ページ {result['ms_per_page']:.2f}ミリ秒"
+        f"（レビュー{review_count}件、{runs}回の平均）"
+    )
+    return result
+
+
+# 使用例
+if __name__ == "__main__":
+    benchmark_parse(*sys.argv[1:2], runs=int(sys.argv[2]) if len(sys.argv) > 2 else 200)
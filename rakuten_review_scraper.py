@@ -0,0 +1,182 @@
+from rakuten_page_snapshot import TIER_HTTP
+from rakuten_page_ready import REVIEW_PAGE_READY
+from rakuten_review_parser import parse_live_review_page
+from rakuten_review_crawler import ReviewCrawler, DEFAULT_MAX_REVIEWS, NEWEST_FIRST_SORT, review_page_url
+from rakuten_review_sync import new_reviews
+from rakuten_review_locator import review_url_from_js_data
+from rakuten_url_utils import item_key
+
+
+class ReviewScraperMixin:
+    """
+    商品のレビューページを探してレビューを取得する処理（RakutenCompetitorAnalysis・RakutenItemInfo共通）
+
+    PooledBrowserMixinと組み合わせて使い、__init__ で fetcher, review_locator, review_sync, incremental_reviews を設定する
+    """
+
+    def _load_review_page(self, url, limit):
+        """
+        レビューページのレビュー一覧を取得（HTTPで取得できなければChromeで読み込む）
+
+        Args:
+            url (str): レビューページのURL
+            limit (int): 取得する最大件数
+
+        Returns:
+            dict: {"reviews": [...], "next_url": ...}
+        """
+        review_page = self.fetcher.fetch_reviews(url, limit)
+        if review_page is not None:
+            return review_page
+
+        self._acquire_driver()
+        if self.browser.loaded_url != url:
+            self._finish_live_page(url)
+            print(f"レビューページに直接アクセス: {url}")
+            # レビュー一覧が描画されるまで待機
+            self.browser.load_page(url, ready=REVIEW_PAGE_READY)
+
+        # ページが読み込んだJSON、または描画後のHTMLからレビュー一覧と次ページのURLを取得
+        review_page, tier = parse_live_review_page(self.browser, url, limit)
+        self.fetcher.record(url, 'reviews', tier)
+        return review_page
+
+    def _resolve_review_url(self, item_url):
+        """
+        商品ページのスナップショットからレビューページのURLを調べる（読み込み済みなら再訪問しない）
+
+        Args:
+            item_url (str): 商品ページのURL
+
+        Returns:
+            str: レビューページのURL（見つからない場合はNone）
+        """
+        snapshot = self._get_snapshot(item_url)
+        review_url = snapshot.review_url or review_url_from_js_data(snapshot.js_data)
+
+        # HTTPで取得したHTMLにレビューへのリンクがなければChromeで読み込んで探す
+        if not review_url and snapshot.tier == TIER_HTTP:
+            snapshot = self._get_snapshot(item_url, live=True)
+            review_url = snapshot.review_url or review_url_from_js_data(snapshot.js_data)
+        return review_url
+
+    def _find_review_url(self, item_url, item_code=None):
+        """
+        商品のレビューページのURLを取得（解決済みのURLがあれば商品ページを読み込まない）
+
+        Args:
+            item_url (str): 商品ページのURL
+            item_code (str): APIのitemCode（省略時は商品ページのURLから求める）
+
+        Returns:
+            str: レビューページのURL（見つからない場合は商品ページのURL）
+        """
+        review_url = self.review_locator.locate(item_url, item_code, resolve=self._resolve_review_url)
+        if review_url:
+            print(f"レビューURL発見: {review_url}")
+        return review_url or item_url
+
+    def _start_review_crawl(self, item_url, max_reviews=None, workers=None, item_code=None, newest_first=False):
+        """
+        商品のレビューページのクローラーと最初のページのURLを用意
+
+        Args:
+            item_url (str): 商品ページのURL
+            max_reviews (int): 取得する最大件数（Noneの場合はすべて）
+            workers (int): 同時に取得するレビューページ数（省略時は環境変数 RAKUTEN_REVIEW_PAGE_WORKERS）
+            item_code (str): APIのitemCode（解決済みのレビューURLを探すのに使う）
+            newest_first (bool): 新しい順に並べたページを辿るかどうか
+
+        Returns:
+            tuple: (ReviewCrawler, 最初のページのURL, 新しい順に並べたかどうか（URLで並び順を指定できない場合はFalse）)
+        """
+        review_url = self._find_review_url(item_url, item_code)
+        newest_url = review_page_url(review_url, 1, NEWEST_FIRST_SORT) if newest_first else None
+        crawler = ReviewCrawler(self._load_review_page, self.fetcher.fetch_reviews, max_reviews, workers)
+        return crawler, newest_url or review_url, newest_url is not None
+
+    def iter_review_pages(self, item_url, max_reviews=None, workers=None, item_code=None, newest_first=False):
+        """
+        商品のレビューをページごとに取得して返す（全件をまとめて保持しない）
+
+        Args:
+            item_url (str): 商品ページのURL
+            max_reviews (int): 取得する最大件数（Noneの場合はすべて）
+            workers (int): 同時に取得するレビューページ数（省略時は環境変数 RAKUTEN_REVIEW_PAGE_WORKERS）
+            item_code (str): APIのitemCode（解決済みのレビューURLを探すのに使う）
+            newest_first (bool): 新しい順に並べたページを辿るかどうか（URLで並び順を指定できない場合は元の並び順）
+
+        Yields:
+            dict: {"page": ページ番号, "url": ページのURL, "reviews": [...]}（ループを抜けると取得を中止する）
+        """
+        crawler, review_url, _ = self._start_review_crawl(item_url, max_reviews, workers, item_code, newest_first)
+        yield from crawler.crawl(review_url)
+
+    def _get_new_reviews(self, item_url, key, item_code=None):
+        """
+        前回までに取得していない新着レビューを取得し、取得位置を更新する
+
+        件数の上限なしで新しい順に辿り、既知のレビュー・前回より古いレビュー・最終ページのいずれかに達した場合だけ
+        取得位置を更新する（途中で失敗した場合に更新すると、取得できなかったレビューを次回以降も取得しなくなるため）
+
+        Args:
+            item_url (str): 商品ページのURL
+            key (str): 商品のキー（"ショップコード:商品コード"）
+            item_code (str): APIのitemCode（解決済みのレビューURLを探すのに使う）
+
+        Returns:
+            list: 新しいレビュー（新しい順に並べられない場合はNone）
+        """
+        crawler, review_url, newest_first = self._start_review_crawl(item_url, item_code=item_code, newest_first=True)
+        if not newest_first:
+            print("レビューページを新しい順に並べられないため、新着レビューではなく通常どおり取得します")
+            return None
+
+        mark = self.review_sync.get_mark(key)
+        reviews, caught_up = new_reviews(crawler.crawl(review_url), mark)
+        if caught_up or crawler.reached_end:
+            self.review_sync.update_mark(key, reviews, mark)
+        else:
+            print("最後までレビューを辿れなかったため、取得位置は更新しません")
+        print(f"新着レビュー {len(reviews)} 件を取得しました")
+        return reviews
+
+    def get_reviews_from_page(self, item_url, max_reviews=DEFAULT_MAX_REVIEWS, item_code=None, incremental=None):
+        """
+        商品ページからレビュー情報を取得
+
+        Args:
+            item_url (str): 商品ページのURL
+            max_reviews (int): 取得する最大レビュー数（Noneの場合はすべて。新着レビューだけを取得する場合は使わない）
+            item_code (str): APIのitemCode（解決済みのレビューURLを探すのに使う）
+            incremental (bool): 前回までに取得していない新着レビューだけを取得するかどうか（省略時はincremental_reviews）
+
+        Returns:
+            dict: レビュー情報（件数、レビューテキスト一覧）
+        """
+        if incremental is None:
+            incremental = self.incremental_reviews
+        key = item_key(item_url, item_code) if incremental else None
+
+        try:
+            reviews = []
+            try:
+                found = self._get_new_reviews(item_url, key, item_code) if key is not None else None
+                if found is not None:
+                    reviews.extend(found)
+                else:
+                    for page in self.iter_review_pages(item_url, max_reviews, item_code=item_code):
+                        print(f"{page['page']}ページ目で{len(page['reviews'])}件のレビューを取得")
+                        reviews.extend(page['reviews'])
+            except Exception as e:
+                print(f"レビュー解析中にエラー: {e}")
+
+            print(f"合計 {len(reviews)} 件のレビューを取得しました")
+            return {
+                "review_count": len(reviews),
+                "reviews": reviews
+            }
+
+        except Exception as e:
+            print(f"レビュー取得中にエラー: {e}")
+            return {"review_count": 0, "reviews": []}
@@ -0,0 +1,197 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from rakuten_response_cache import DEFAULT_CACHE_DIR
+
+# 商品ごとに保存する既知のレビューの識別値の数（新しい順）
+MAX_FINGERPRINTS = 50
+
+DATE_PATTERN = re.compile(r'(\d{4})\D+(\d{1,2})\D+(\d{1,2})')
+
+
+def is_incremental_enabled():
+    """
+    新着レビューだけを取得するかどうか（環境変数 RAKUTEN_INCREMENTAL_REVIEWS、既定は無効）
+    """
+    return os.environ.get('RAKUTEN_INCREMENTAL_REVIEWS', '0') != '0'
+
+
+def normalize_review_date(date):
+    """
+    レビューの日付を比較できる形式（YYYY-MM-DD）に変換
+
+    Args:
+        date (str): レビューの日付（例: 2024/01/05）
+
+    Returns:
+        str: YYYY-MM-DD形式の日付（解釈できない場合はNone）
+    """
+    match = DATE_PATTERN.search(date or "")
+    if not match:
+        return None
+    year, month, day = match.groups()
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+def review_fingerprint(review):
+    """
+    レビューを識別する値（日付・評価・タイトル・本文から作る）
+
+    Args:
+        review (dict): レビュー
+
+    Returns:
+        str: レビューの識別値
+    """
+    raw = json.dumps([
+        normalize_review_date(review.get("date")) or review.get("date") or "",
+        review.get("rating"),
+        review.get("title") or "",
+        review.get("comment") or ""
+    ], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def new_reviews(pages, mark):
+    """
+    新しい順に並んだレビューページから、前回までに取得していないレビューだけを取り出す
+
+    既知のレビュー、または前回の最新日より古いレビューに達した時点でページを辿るのをやめる。
+    前回の最新日と同じ日のレビューは、既知の識別値に含まれないものを新しいレビューとして扱う
+
+    Args:
+        pages (iterator): レビューページ（ReviewCrawler.crawlの戻り値）
+        mark (dict): 前回の取得位置（ReviewSyncState.get_markの戻り値、初回はNone）
+
+    Returns:
+        tuple: (新しいレビューのリスト, 前回取得済みのレビューに達したかどうか)
+    """
+    known = set((mark or {}).get("fingerprints") or [])
+    latest_date = (mark or {}).get("latest_date")
+    reviews = []
+    try:
+        for page in pages:
+            for review in page['reviews']:
+                date = normalize_review_date(review.get("date"))
+                if review_fingerprint(review) in known or (latest_date and date and date < latest_date):
+                    print(f"前回取得済みのレビューに達したため取得を終了します（{page['page']}ページ目）")
+                    return reviews, True
+                reviews.append(review)
+        return reviews, False
+    finally:
+        # 途中で終了した場合も先読み中のページを中止する
+        close = getattr(pages, "close", None)
+        if close is not None:
+            close()
+
+
+class ReviewSyncState:
+    def __init__(self, path):
+        """
+        商品ごとのレビューの取得位置（最新の日付と既知のレビューの識別値）をSQLiteに保存する
+
+        Args:
+            path (str): 保存先のファイルのパス
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS review_marks (
+                item_key TEXT PRIMARY KEY,
+                latest_date TEXT,
+                fingerprints TEXT,
+                synced_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def get_mark(self, key):
+        """
+        商品の前回の取得位置を取得
+
+        Args:
+            key (str): 商品のキー（"ショップコード:商品コード"）
+
+        Returns:
+            dict: latest_date, fingerprints, synced_at（初回の場合はNone）
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT latest_date, fingerprints, synced_at FROM review_marks WHERE item_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"latest_date": row[0], "fingerprints": json.loads(row[1] or "[]"), "synced_at": row[2]}
+
+    def update_mark(self, key, reviews, mark=None):
+        """
+        新しく取得したレビューで取得位置を更新
+
+        取得位置より新しいレビューをすべて取得できた場合だけ呼ぶ（途中で終了した取得で更新すると、残りのレビューを取得しなくなる）
+
+        Args:
+            key (str): 商品のキー（"ショップコード:商品コード"）
+            reviews (list): 新しく取得したレビュー（新しい順）
+            mark (dict): 前回の取得位置
+        """
+        mark = mark or {}
+        fingerprints = [review_fingerprint(review) for review in reviews]
+        fingerprints = list(dict.fromkeys(fingerprints + list(mark.get("fingerprints") or [])))[:MAX_FINGERPRINTS]
+        dates = [date for date in (normalize_review_date(review.get("date")) for review in reviews) if date]
+        if mark.get("latest_date"):
+            dates.append(mark["latest_date"])
+        latest_date = max(dates) if dates else None
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO review_marks (item_key, latest_date, fingerprints, synced_at) VALUES (?, ?, ?, ?)",
+                (key, latest_date, json.dumps(fingerprints), time.time())
+            )
+            self.conn.commit()
+
+    def clear(self, key=None):
+        """
+        取得位置を削除（次回はすべてのレビューを取得する）
+
+        Args:
+            key (str): 商品のキー（省略時はすべての商品）
+        """
+        with self.lock:
+            if key is None:
+                self.conn.execute("DELETE FROM review_marks")
+            else:
+                self.conn.execute("DELETE FROM review_marks WHERE item_key = ?", (key,))
+            self.conn.commit()
+
+
+_shared_state = None
+_shared_state_lock = threading.Lock()
+
+
+def get_review_sync_state():
+    """
+    共有のレビュー取得位置を取得
+
+    環境変数 RAKUTEN_CACHE_DIR で保存先を変更できる
+
+    Returns:
+        ReviewSyncState: 共有のレビュー取得位置
+    """
+    global _shared_state
+    if _shared_state is None:
+        with _shared_state_lock:
+            if _shared_state is None:
+                cache_dir = os.environ.get('RAKUTEN_CACHE_DIR', DEFAULT_CACHE_DIR)
+                _shared_state = ReviewSyncState(os.path.join(cache_dir, "review_sync.sqlite3"))
+    return _shared_state
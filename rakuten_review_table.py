@@ -0,0 +1,119 @@
+import re
+import pandas as pd
+
+# レビューの項目（縦持ちの表の列と、横持ちの列名 review_{番号}_{項目} の項目）
+REVIEW_FIELDS = ("rating", "title", "comment", "date")
+
+# 横持ちに展開するときの1商品あたりの最大レビュー数
+DEFAULT_WIDE_REVIEWS = 20
+
+WIDE_COLUMN_PATTERN = re.compile(r'^review_(\d+)_(' + '|'.join(REVIEW_FIELDS) + r')$')
+
+
+def build_review_table(df, key_columns, reviews_column="reviews"):
+    """
+    商品ごとのレビューのリストを縦持ちの表（1行1レビュー）に変換
+
+    explodeで一度に展開するため、商品数・レビュー数が多くても列ごとに走査しない。
+    表のインデックスは元のデータフレームの行のインデックスのまま（横持ちに戻すときに使う）
+
+    Args:
+        df (pandas.DataFrame): 商品ごとの結果（reviews列にレビューの辞書のリスト）
+        key_columns (list): 商品を識別する列（dfにない列は空欄）
+        reviews_column (str): レビューのリストを持つ列
+
+    Returns:
+        pandas.DataFrame: 商品の識別列, review_no（1から）, rating, title, comment, date
+    """
+    key_columns = list(key_columns)
+    columns = key_columns + ["review_no"] + list(REVIEW_FIELDS)
+    if df.empty or reviews_column not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    exploded = df[[reviews_column]].explode(reviews_column).dropna()
+    exploded = exploded[exploded[reviews_column].map(lambda review: isinstance(review, dict))]
+    if exploded.empty:
+        return pd.DataFrame(columns=columns)
+
+    table = pd.DataFrame(exploded[reviews_column].tolist(), index=exploded.index)
+    table = table.reindex(columns=list(REVIEW_FIELDS))
+    table.insert(0, "review_no", table.groupby(level=0).cumcount() + 1)
+    keys = df.reindex(columns=key_columns).loc[table.index]
+    return pd.concat([keys, table], axis=1)[columns]
+
+
+def wide_review_view(review_table, max_reviews=DEFAULT_WIDE_REVIEWS):
+    """
+    縦持ちのレビューの表を商品ごとの横持ち（review_{番号}_{項目} の列）に変換
+
+    Args:
+        review_table (pandas.DataFrame): build_review_tableの戻り値
+        max_reviews (int): 1商品あたりに展開する最大レビュー数
+
+    Returns:
+        pandas.DataFrame: 元のデータフレームの行のインデックスごとのレビュー列
+    """
+    table = review_table[review_table["review_no"] <= max_reviews]
+    if table.empty:
+        return pd.DataFrame(index=review_table.index.unique())
+
+    wide = table.pivot(columns="review_no", values=list(REVIEW_FIELDS))
+    numbers = sorted(wide.columns.get_level_values(1).unique())
+    wide = wide[[(field, number) for number in numbers for field in REVIEW_FIELDS]]
+    wide.columns = [f"review_{number}_{field}" for field, number in wide.columns]
+    return wide.infer_objects()
+
+
+def long_reviews_from_wide(df, key_columns):
+    """
+    横持ちのレビュー列（review_{番号}_{項目}）を持つデータフレームを縦持ちの表に変換
+
+    以前の形式で保存したCSVや、wide=Trueで取得した結果を読み込む場合に使う
+
+    Args:
+        df (pandas.DataFrame): 横持ちのレビュー列を持つデータフレーム
+        key_columns (list): 縦持ちの表に含める商品の識別列
+
+    Returns:
+        pandas.DataFrame: build_review_tableと同じ形式の表（コメントのないレビューは除く）
+    """
+    key_columns = list(key_columns)
+    columns = key_columns + ["review_no"] + list(REVIEW_FIELDS)
+    review_columns = [column for column in df.columns if WIDE_COLUMN_PATTERN.match(str(column))]
+    if df.empty or not review_columns:
+        return pd.DataFrame(columns=columns)
+
+    melted = df[review_columns].melt(ignore_index=False, var_name="column").dropna(subset=["value"])
+    parts = melted["column"].str.extract(WIDE_COLUMN_PATTERN)
+    melted["review_no"] = parts[0].astype(int)
+    melted["field"] = parts[1]
+    table = melted.reset_index().pivot(index=["index", "review_no"], columns="field", values="value")
+    table = table.reindex(columns=list(REVIEW_FIELDS)).reset_index(level="review_no").rename_axis(None)
+    table = table[table["comment"].notna()]
+
+    keys = df.reindex(columns=key_columns).loc[table.index]
+    return pd.concat([keys, table], axis=1)[columns].infer_objects().reset_index(drop=True)
+
+
+def split_reviews(df, key_columns, wide=False, max_reviews=DEFAULT_WIDE_REVIEWS, reviews_column="reviews"):
+    """
+    結果のデータフレームからレビューのリストを取り出し、縦持ちの表に分ける
+
+    Args:
+        df (pandas.DataFrame): 商品ごとの結果
+        key_columns (list): 縦持ちの表に含める商品の識別列
+        wide (bool): 従来の横持ちのレビュー列を結果に追加するかどうか
+        max_reviews (int): 横持ちに展開する最大レビュー数
+        reviews_column (str): レビューのリストを持つ列
+
+    Returns:
+        tuple: (レビューの列を除いた結果, 縦持ちのレビューの表)
+    """
+    review_table = build_review_table(df, key_columns, reviews_column)
+    if reviews_column not in df.columns:
+        return df, review_table
+
+    df = df.drop(columns=[reviews_column])
+    if wide and not review_table.empty:
+        df = df.join(wide_review_view(review_table, max_reviews))
+    return df, review_table.reset_index(drop=True)
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import itertools
+from rakuten_page_ready import PageBudget, POLL_INTERVAL
+
+try:
+    import websocket
+except ImportError:
+    # websocket-clientがない環境ではタブを使わずに1つのタブで順に読み込む
+    websocket = None
+
+# 1つのChromeで先に読み込んでおくタブ数（環境変数 RAKUTEN_TABS で変更可能、1の場合は使わない）
+DEFAULT_TABS = 1
+
+# タブのCDP接続でコマンドの応答を待つ秒数
+CDP_TIMEOUT = 10
+
+# タブでナビゲーションが始まり、DOMの構築が終わったか（読み込み前のabout:blankは除く）
+TAB_READY_SCRIPT = "return location.href !== 'about:blank' && document.readyState !== 'loading';"
+
+
+def get_tab_count(tabs=None):
+    """
+    先に読み込んでおくタブ数を決定
+
+    Args:
+        tabs (int): 指定されたタブ数（省略時は環境変数 RAKUTEN_TABS、既定は1）
+
+    Returns:
+        int: タブ数（1の場合はタブを使わずに順に読み込む）
+    """
+    if tabs is None:
+        tabs = int(os.environ.get('RAKUTEN_TABS', DEFAULT_TABS))
+    return max(1, int(tabs))
+
+
+class CdpError(Exception):
+    """
+    タブのCDPコマンド・スクリプトの実行に失敗した
+    """
+
+
+class CdpTab:
+    def __init__(self, target_id, websocket_url):
+        """
+        ChromeのタブにDevToolsのWebSocketで直接接続し、ドライバーを切り替えずにコマンドを送る
+
+        Args:
+            target_id (str): タブのターゲットID（Target.createTargetの戻り値）
+            websocket_url (str): タブのDevToolsのWebSocket URL
+        """
+        self.target_id = target_id
+        self.ids = itertools.count(1)
+        self.ws = websocket.create_connection(websocket_url, timeout=CDP_TIMEOUT, suppress_origin=True)
+
+    def send(self, method, params=None, wait=True):
+        """
+        CDPコマンドを送る
+
+        Args:
+            method (str): コマンド名
+            params (dict): コマンドの引数
+            wait (bool): 応答を待つかどうか（Page.navigateのように応答まで時間がかかるコマンドは待たない）
+
+        Returns:
+            dict: コマンドの結果（待たない場合はNone）
+        """
+        message_id = next(self.ids)
+        self.ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        if not wait:
+            return None
+        while True:
+            message = json.loads(self.ws.recv())
+            # イベントと、応答を待たなかったコマンドの結果は読み捨てる
+            if message.get("id") != message_id:
+                continue
+            if "error" in message:
+                raise CdpError(f"{method}: {message['error'].get('message')}")
+            return message.get("result") or {}
+
+    def execute_script(self, script, *args):
+        """
+        WebDriverのexecute_scriptと同じ形式でタブのスクリプトを実行
+
+        rakuten_page_readyの読み込み完了条件を、このタブに切り替えずにそのまま判定できる
+
+        Args:
+            script (str): 関数本体のスクリプト（arguments[0]...で引数を参照）
+            *args: JSONに変換できる引数
+
+        Returns:
+            スクリプトの戻り値
+        """
+        expression = f"(function() {{\n{script}\n}}).apply(null, {json.dumps(list(args), ensure_ascii=False)})"
+        result = self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True})
+        if "exceptionDetails" in result:
+            raise CdpError(result["exceptionDetails"].get("text") or "スクリプトの実行に失敗しました")
+        return (result.get("result") or {}).get("value")
+
+    def close(self):
+        """
+        WebSocketの接続を閉じる（タブは閉じない）
+        """
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class TabLoader:
+    def __init__(self, browser, tabs=None, blocked_urls=None):
+        """
+        これから処理するページを1つのChromeの別のタブで先に読み込んでおくローダー
+
+        タブの作成とナビゲーションはCDP（Target.createTarget・Page.navigate）で行い、読み込みの完了もCDPでタブに問い合わせる。
+        switch_to.windowは読み込み中のタブではDOMContentLoadedまで待つため、読み込みが終わるまでタブには切り替えない。
+        読み込んだページを処理するときは、そのタブをドライバーの操作対象にして元のタブを閉じるため、
+        要素から取得する処理もページを読み込み直さずにそのまま使える
+
+        Args:
+            browser (RakutenInit): ドライバーを保持するRakutenInit
+            tabs (int): 先に読み込んでおくタブ数（省略時は環境変数 RAKUTEN_TABS）
+            blocked_urls (list): 新しいタブで読み込みをブロックするURLパターン（スクレイププロファイル用）
+        """
+        self.browser = browser
+        self.tabs = get_tab_count(tabs)
+        self.blocked_urls = blocked_urls
+        self.loading = {}
+
+    @staticmethod
+    def debugger_address(driver):
+        """
+        ChromeのDevToolsのアドレス（取得できない場合はNone）
+        """
+        try:
+            return (driver.capabilities.get('goog:chromeOptions') or {}).get('debuggerAddress')
+        except Exception:
+            return None
+
+    @classmethod
+    def is_supported(cls, driver):
+        """
+        タブにCDPで接続できるか（websocket-clientがあり、DevToolsのアドレスがわかる場合）
+        """
+        return websocket is not None and driver is not None and bool(cls.debugger_address(driver))
+
+    def _open(self, url):
+        """
+        新しいタブを作成してページの読み込みを開始（読み込み完了は待たない）
+
+        Returns:
+            CdpTab: 読み込み中のタブ（開けない場合はNone）
+        """
+        driver = self.browser.driver
+        target_id = None
+        tab = None
+        try:
+            target_id = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "background": True})["targetId"]
+            tab = CdpTab(target_id, f"ws://{self.debugger_address(driver)}/devtools/page/{target_id}")
+            # URLブロックの設定は接続ごとなので、読み込み前に新しいタブにも設定する
+            if self.blocked_urls:
+                tab.send("Network.enable")
+                tab.send("Network.setBlockedURLs", {"urls": self.blocked_urls})
+            self.browser.rate_limiter.acquire(url)
+            tab.send("Page.navigate", {"url": url}, wait=False)
+            return tab
+        except Exception as e:
+            print(f"タブでの読み込み開始に失敗しました: {e}")
+            if tab is not None:
+                tab.close()
+            if target_id is not None:
+                self._close_target(target_id)
+            return None
+
+    def _close_target(self, target_id):
+        """
+        タブを閉じる（ドライバーの操作対象は変えない）
+        """
+        try:
+            self.browser.driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target_id})
+        except Exception as e:
+            print(f"タブを閉じる際にエラー: {e}")
+
+    def _close(self, tab):
+        """
+        タブの接続を閉じてタブを閉じる
+        """
+        tab.close()
+        self._close_target(tab.target_id)
+
+    def _is_ready(self, tab, ready):
+        """
+        タブのページが読み込み完了条件を満たしているか（CDPで判定し、タブには切り替えない）
+        """
+        try:
+            if not tab.execute_script(TAB_READY_SCRIPT):
+                return False
+            return ready is None or bool(ready(tab))
+        except Exception:
+            return False
+
+    def prefetch(self, urls):
+        """
+        これから処理する順のページをタブ数まで別のタブで読み込み始める
+
+        一覧にないページのタブは、もう使わないため閉じる
+
+        Args:
+            urls (list): これから処理する順のページのURL
+        """
+        urls = [url for url in dict.fromkeys(urls) if url and url != self.browser.loaded_url][:self.tabs]
+        for url in [url for url in self.loading if url not in urls]:
+            self._close(self.loading.pop(url))
+        for url in urls:
+            if url not in self.loading:
+                tab = self._open(url)
+                if tab is not None:
+                    self.loading[url] = tab
+
+    def has(self, url):
+        """
+        ページを読み込んでいるタブがあるか
+        """
+        return url in self.loading
+
+    def activate(self, url, ready=None, budget=None):
+        """
+        タブで読み込んだページをドライバーの操作対象にする（元のタブは閉じる）
+
+        Args:
+            url (str): ページのURL（prefetchで読み込みを始めたもの）
+            ready (callable): 読み込み完了条件（rakuten_page_readyの条件）
+            budget (PageBudget): このページで待機できる時間
+
+        Returns:
+            bool: 切り替えた場合はTrue（Falseの場合は呼び出し側で通常どおり読み込む）
+        """
+        tab = self.loading.pop(url)
+        budget = budget or PageBudget()
+        driver = self.browser.driver
+        try:
+            while not self._is_ready(tab, ready):
+                if budget.remaining() <= 0:
+                    print(f"タブの読み込み完了条件を満たす前に待機時間を超えました: {url}")
+                    break
+                time.sleep(POLL_INTERVAL)
+
+            handle = next((handle for handle in driver.window_handles if handle.endswith(tab.target_id)), None)
+            if handle is None:
+                raise CdpError(f"タブのウィンドウが見つかりません: {tab.target_id}")
+
+            # DOMの構築が終わったタブに切り替え、元のタブを閉じる（読み込み済みのタブへの切り替えは待たされない）
+            driver.close()
+            driver.switch_to.window(handle)
+            tab.close()
+            return True
+        except Exception as e:
+            print(f"タブへの切り替えに失敗しました: {e}")
+            self._close(tab)
+            try:
+                if driver.window_handles:
+                    driver.switch_to.window(driver.window_handles[0])
+            except Exception:
+                pass
+            return False
+
+    def close_all(self):
+        """
+        読み込み中・読み込み済みのタブをすべて閉じる
+        """
+        for tab in self.loading.values():
+            self._close(tab)
+        self.loading.clear()
@@ -0,0 +1,222 @@
+import os
+import threading
+from collections import Counter
+from rakuten_api_client import get_api_client
+from rakuten_page_snapshot import TIER_HTTP, TIER_BROWSER, snapshot_from_html
+from rakuten_html_parser import HTML_PARSER_BACKEND, parse_item_page
+from rakuten_review_parser import parse_review_html
+
+# 商品ページのHTMLを取得するときのヘッダー（APIクライアントのJSON用ヘッダーを上書き）
+HTML_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ja,en-US;q=0.8,en;q=0.6",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# extract_item_pageのセレクタ引数と抽出結果の項目名の対応
+ITEM_PAGE_FIELDS = {
+    'review_selectors': 'review',
+    'description_selectors': 'description',
+    'seller_selectors': 'seller_info',
+    'image_selectors': 'images'
+}
+
+
+class TieredFetcher:
+    def __init__(self, api_client=None, enabled=None):
+        """
+        まずHTTPで取得したHTMLから抽出し、足りない項目がある場合だけChromeで読み込むための取得エンジン
+
+        Args:
+            api_client (RakutenApiClient): HTMLの取得に使う共有クライアント（省略時は共有インスタンス）
+            enabled (bool): HTTPでの取得を試すかどうか（省略時は環境変数 RAKUTEN_HTTP_FIRST、既定で有効）
+        """
+        self.api_client = api_client or get_api_client()
+        if enabled is None:
+            enabled = os.environ.get('RAKUTEN_HTTP_FIRST', '1') != '0'
+        self.enabled = enabled
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def fetch_html(self, url):
+        """
+        HTTPでページのHTMLを取得
+
+        Args:
+            url (str): ページのURL
+
+        Returns:
+            tuple: (HTML, リダイレクト後のURL)。取得できない場合は(None, None)
+        """
+        if not self.enabled or not url:
+            return None, None
+
+        try:
+            response = self.api_client.get(url, headers=HTML_HEADERS)
+        except Exception as e:
+            print(f"HTTPでのページ取得中にエラー: {e}")
+            return None, None
+
+        if not response.ok:
+            print(f"HTTPでのページ取得に失敗しました（{response.status_code}）: {url}")
+            return None, None
+
+        # 文字コードがヘッダーにない場合は本文から推定（EUC-JPのページがあるため）
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        return response.text, response.url
+
+    def record(self, url, field, tier):
+        """
+        項目ごとにどの取得方法で取得できたかを記録
+
+        バッチ処理でも大きくならないように、項目・取得方法ごとの件数だけを集計する
+
+        Args:
+            url (str): ページのURL
+            field (str): 項目名
+            tier (str): 取得方法（TIER_HTTP / TIER_BROWSER / TIER_NETWORK、取得できなかった場合はNone）
+        """
+        with self.lock:
+            self.counts[(field, tier)] += 1
+
+    def merge_counts(self, counts):
+        """
+        ほかのプロセスで集計した取得方法の件数を合算
+
+        Args:
+            counts (dict): (項目名, 取得方法) -> 件数
+        """
+        with self.lock:
+            self.counts.update(counts)
+
+    def stats(self):
+        """
+        項目・取得方法ごとの件数
+
+        Returns:
+            dict: "項目名:取得方法" -> 件数
+        """
+        with self.lock:
+            return {f"{field}:{tier}": count for (field, tier), count in self.counts.items()}
+
+    def fetch_snapshot(self, url):
+        """
+        HTTPで取得したHTMLからスナップショットを作成（grp15_ias_prmが含まれる場合のみ）
+
+        Args:
+            url (str): 商品ページのURL
+
+        Returns:
+            PageSnapshot: スナップショット（Chromeでの読み込みが必要な場合はNone）
+        """
+        html, final_url = self.fetch_html(url)
+        return self.snapshot_from_page(url, html, final_url)
+
+    def snapshot_from_page(self, url, html, final_url=None):
+        """
+        取得済みの商品ページのHTMLからスナップショットを作成（grp15_ias_prmが含まれる場合のみ）
+
+        Args:
+            url (str): 商品ページのURL
+            html (str): fetch_htmlで取得したHTML（取得できなかった場合はNone）
+            final_url (str): リダイレクト後のURL
+
+        Returns:
+            PageSnapshot: スナップショット（Chromeでの読み込みが必要な場合はNone）
+        """
+        if html is None:
+            return None
+
+        snapshot = snapshot_from_html(url, html, final_url=final_url)
+        if not snapshot.js_data:
+            print(f"HTMLにgrp15_ias_prmが含まれていないため、Chromeで読み込みます: {url}")
+            return None
+
+        self.record(url, 'js_data', TIER_HTTP)
+        if snapshot.review_url:
+            self.record(url, 'review_url', TIER_HTTP)
+        return snapshot
+
+    def fetch_item_page(self, url, page=None, **selectors):
+        """
+        HTTPで取得した商品ページのHTMLから項目を抽出
+
+        Args:
+            url (str): 商品ページのURL
+            page (tuple): 取得済みの(HTML, リダイレクト後のURL)（SnapshotCache.get_htmlの戻り値。省略時はHTTPで取得）
+            **selectors: extract_item_pageと同じセレクタ引数
+
+        Returns:
+            tuple: (抽出結果, 取得できなかった項目名のリスト)
+        """
+        wanted = [field for key, field in ITEM_PAGE_FIELDS.items() if selectors.get(key)]
+        if HTML_PARSER_BACKEND is None:
+            return {}, wanted
+
+        html, final_url = page if page is not None else self.fetch_html(url)
+        if html is None:
+            return {}, wanted
+
+        try:
+            page_data = parse_item_page(html, final_url or url, **selectors)
+        except Exception as e:
+            print(f"HTMLの解析中にエラーが発生しました: {e}")
+            return {}, wanted
+
+        # 値がない項目は結果から外し、Chromeで取得する
+        page_data = {key: value for key, value in page_data.items() if value}
+        return page_data, [field for field in wanted if field not in page_data]
+
+    def merge_item_page(self, url, http_data, browser_data, selectors):
+        """
+        HTTPで取得できた項目を優先し、足りない項目だけChromeの結果で補う
+
+        Args:
+            url (str): 商品ページのURL
+            http_data (dict): HTTPで取得した抽出結果
+            browser_data (dict): Chromeで取得した抽出結果
+            selectors (dict): extract_item_pageと同じセレクタ引数（指定された項目の取得方法を記録する）
+
+        Returns:
+            dict: 統合した抽出結果
+        """
+        fields = [field for key, field in ITEM_PAGE_FIELDS.items() if selectors.get(key)]
+        page_data = dict(browser_data or {})
+        page_data.update(http_data or {})
+        for field in fields:
+            if (http_data or {}).get(field):
+                self.record(url, field, TIER_HTTP)
+            else:
+                self.record(url, field, TIER_BROWSER if page_data.get(field) else None)
+        return page_data
+
+    def fetch_reviews(self, url, limit):
+        """
+        HTTPで取得したレビューページのHTMLからレビュー一覧を抽出
+
+        Args:
+            url (str): レビューページのURL
+            limit (int): 取得する最大件数
+
+        Returns:
+            dict: {"reviews": [...], "next_url": ...}（レビューを取得できない場合はNone）
+        """
+        if HTML_PARSER_BACKEND is None:
+            return None
+
+        html, final_url = self.fetch_html(url)
+        if html is None:
+            return None
+
+        try:
+            review_page = parse_review_html(html, final_url or url, limit)
+        except Exception as e:
+            print(f"レビューページの解析中にエラーが発生しました: {e}")
+            return None
+
+        if not review_page['reviews']:
+            return None
+
+        self.record(url, 'reviews', TIER_HTTP)
+        return review_page
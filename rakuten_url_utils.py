@@ -0,0 +1,91 @@
+import re
+from urllib.parse import urlparse, unquote
+
+# 楽天市場の商品ページのホスト
+ITEM_HOSTS = ("item.rakuten.co.jp",)
+
+# ショップコード・商品コードとして許可する文字
+CODE_PATTERN = re.compile(r'^[A-Za-z0-9_\-\.]+$')
+
+# レビューページのURL（ショップIDと商品IDは数値のID）
+REVIEW_URL_TEMPLATE = "https://review.rakuten.co.jp/item/1/{shop_id}_{item_id}/{page}.{sort}/"
+
+# 数値のIDとして許可する文字
+NUMERIC_ID_PATTERN = re.compile(r'^\d+$')
+
+
+def parse_item_url(url):
+    """
+    商品ページのURLからショップコードと商品コードを抽出
+
+    例: https://item.rakuten.co.jp/cosmeland/4589596694672/ -> ("cosmeland", "4589596694672")
+
+    Args:
+        url (str): 商品ページのURL
+
+    Returns:
+        tuple: (ショップコード, 商品コード)。解析できない場合はNone
+    """
+    if not url:
+        return None
+
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+
+    if parsed.hostname not in ITEM_HOSTS:
+        return None
+
+    parts = [unquote(part) for part in parsed.path.split('/') if part]
+    if len(parts) < 2:
+        return None
+
+    shop_code, item_code = parts[0], parts[1]
+    if item_code.endswith('.html'):
+        item_code = item_code[:-len('.html')]
+
+    if not CODE_PATTERN.match(shop_code) or not CODE_PATTERN.match(item_code):
+        return None
+
+    return shop_code, item_code
+
+
+def build_review_url(shop_id, item_id, page=1, sort=1):
+    """
+    ショップIDと商品IDからレビューページのURLを組み立てる
+
+    例: (123456, 10000001) -> https://review.rakuten.co.jp/item/1/123456_10000001/1.1/
+
+    Args:
+        shop_id (str): ショップID（数値）
+        item_id (str): 商品ID（数値）
+        page (int): ページ番号
+        sort (int): 並び順
+
+    Returns:
+        str: レビューページのURL。IDが数値でない場合はNone
+    """
+    shop_id, item_id = str(shop_id or '').strip(), str(item_id or '').strip()
+    if not NUMERIC_ID_PATTERN.match(shop_id) or not NUMERIC_ID_PATTERN.match(item_id):
+        return None
+    return REVIEW_URL_TEMPLATE.format(shop_id=shop_id, item_id=item_id, page=page, sort=sort)
+
+
+def item_key(item_url=None, item_code=None):
+    """
+    商品を識別するキー（APIのitemCodeと同じ "ショップコード:商品コード" の形式）
+
+    Args:
+        item_url (str): 商品ページのURL
+        item_code (str): APIのitemCode
+
+    Returns:
+        str: 商品のキー（特定できない場合はNone）
+    """
+    if item_code:
+        return str(item_code)
+    parsed = parse_item_url(item_url)
+    if parsed:
+        return f"{parsed[0]}:{parsed[1]}"
+    return None
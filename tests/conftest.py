@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# リポジトリ直下のモジュールをimportできるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """
+    time.time / time.sleep の代わりに使う、手動で進める時計
+    """
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """
+    共有キャッシュの保存先を一時ディレクトリに変更
+    """
+    monkeypatch.setenv("RAKUTEN_CACHE_DIR", str(tmp_path))
+    return tmp_path
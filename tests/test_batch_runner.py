@@ -0,0 +1,102 @@
+import os
+import time
+from collections import Counter
+
+import pytest
+
+from rakuten_batch_runner import BatchRunner
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.counts = Counter()
+
+
+class FakeScraper:
+    """
+    ワーカーで動かすスクレイパーの代わり（商品ごとの動作を商品の値で決める）
+    """
+
+    def __init__(self, marker_dir):
+        self.marker_dir = marker_dir
+        self.fetcher = FakeFetcher()
+
+    def process(self, item):
+        name, behavior = item
+        self.fetcher.counts[("item", "http")] += 1
+        if behavior == "slow":
+            time.sleep(0.3)
+        elif behavior == "fail":
+            raise RuntimeError(f"{name} failed")
+        elif behavior == "error":
+            return {"name": name, "error": "not found"}
+        elif behavior in ("flaky", "crash"):
+            # 最初の試行だけ失敗する（印のファイルでワーカーをまたいで記録する）
+            marker = os.path.join(self.marker_dir, name)
+            if not os.path.exists(marker):
+                open(marker, "w").close()
+                if behavior == "crash":
+                    os._exit(1)
+                raise RuntimeError(f"{name} failed once")
+        return {"name": name, "pid": os.getpid()}
+
+    def close(self):
+        pass
+
+
+def run(tmp_path, items, workers=2, **kwargs):
+    runner = BatchRunner(FakeScraper, args=(str(tmp_path),), workers=workers)
+    # CPU数で制限されないように直接指定する
+    runner.workers = workers
+    results = runner.run("process", items, describe=lambda item: item[0], **kwargs)
+    return runner, results
+
+
+def test_results_keep_input_order(tmp_path):
+    items = [("a", "slow"), ("b", "ok"), ("c", "ok"), ("d", "slow"), ("e", "ok")]
+
+    runner, results = run(tmp_path, items)
+
+    assert [result["name"] for result in results] == ["a", "b", "c", "d", "e"]
+    assert runner.counts[("item", "http")] == 5
+
+
+def test_failed_item_is_retried(tmp_path):
+    _, results = run(tmp_path, [("a", "flaky"), ("b", "ok")])
+
+    assert [result["name"] for result in results] == ["a", "b"]
+    assert "error" not in results[0]
+
+
+def test_crashed_worker_is_replaced_and_item_retried(tmp_path):
+    _, results = run(tmp_path, [("a", "crash"), ("b", "ok"), ("c", "ok")])
+
+    assert [result["name"] for result in results] == ["a", "b", "c"]
+
+
+def test_on_failure_builds_the_row_after_all_attempts(tmp_path):
+    failures = []
+
+    def on_failure(item, error):
+        failures.append(item[0])
+        return {"name": item[0], "error": error}
+
+    _, results = run(tmp_path, [("a", "ok"), ("b", "fail")], on_failure=on_failure)
+
+    assert failures == ["b"]
+    assert results[0] == {"name": "a", "pid": results[0]["pid"]}
+    assert results[1]["error"] == "b failed"
+
+
+def test_error_results_are_retried_then_kept(tmp_path):
+    _, results = run(tmp_path, [("a", "error")])
+
+    assert results == [{"name": "a", "error": "not found"}]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_without_on_failure_failed_items_are_none(tmp_path, workers):
+    _, results = run(tmp_path, [("a", "fail"), ("b", "ok")], workers=workers)
+
+    assert results[0] is None
+    assert results[1]["name"] == "b"
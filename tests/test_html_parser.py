@@ -0,0 +1,38 @@
+import pytest
+
+from rakuten_html_parser import HTML_PARSER_BACKEND, run_parse, parse_item_page
+
+pytestmark = pytest.mark.skipif(HTML_PARSER_BACKEND is None, reason="selectolaxまたはlxmlが必要")
+
+ITEM_HTML = """
+<html><head><title>テスト商品</title></head><body>
+<span class="revRating">4.5点 (1,234件)</span>
+<div class="item-description"><p>説明1</p><p>説明2</p></div>
+<div class="image-gallery"><img data-src="/img/a.jpg"><img src="https://example.com/b.jpg"></div>
+</body></html>
+"""
+
+
+def test_run_parse_returns_result_in_process():
+    future = run_parse(
+        parse_item_page, ITEM_HTML, "https://item.rakuten.co.jp/shop/item/",
+        review_selectors=["span[itemprop='aggregateRating']", "span.revRating"],
+        description_selectors=["div.item-description"],
+        image_selectors=["div.image-gallery img"]
+    )
+
+    page = future.result()
+    assert page["title"] == "テスト商品"
+    assert page["review"] == {"selector": "span.revRating", "text": "4.5点 (1,234件)"}
+    assert page["description"]["text"] == "説明1\n説明2"
+    assert page["images"]["urls"] == ["https://item.rakuten.co.jp/img/a.jpg", "https://example.com/b.jpg"]
+
+
+def test_run_parse_keeps_the_exception_on_the_future():
+    def broken(html):
+        raise ValueError(html)
+
+    future = run_parse(broken, "<html></html>")
+
+    with pytest.raises(ValueError):
+        future.result()
@@ -0,0 +1,45 @@
+import os
+
+import rakuten_browser_profile
+import rakuten_init
+from rakuten_init import benchmark_startup, save_driver_cache
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_count = 0
+
+    def quit(self):
+        self.quit_count += 1
+
+
+def test_benchmark_quits_through_wrapper_and_clears_cache_for_cold_runs(tmp_path, monkeypatch):
+    cache_path = tmp_path / "chromedriver.json"
+    driver_path = tmp_path / "chromedriver"
+    driver_path.write_text("")
+    driver_path.chmod(0o755)
+    monkeypatch.setenv("RAKUTEN_DRIVER_CACHE", str(cache_path))
+    monkeypatch.setenv("RAKUTEN_PERSISTENT_PROFILE", "1")
+    monkeypatch.setenv("RAKUTEN_PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(rakuten_init, "_driver_cache", None)
+
+    started = []
+    drivers = []
+
+    def fake_start_chrome(chrome_options):
+        # 計測開始時にキャッシュファイルがあるかどうか（コールドスタートではない）
+        started.append(os.path.exists(cache_path))
+        save_driver_cache(str(driver_path), "1.0")
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(rakuten_init, "start_chrome", fake_start_chrome)
+
+    result = benchmark_startup(runs=2)
+
+    assert started == [False, True, False, True]
+    assert [driver.quit_count for driver in drivers] == [1, 1, 1, 1]
+    assert len(result["timings"]["cold"]) == 2
+    # 永続プロファイルは毎回解放され、同じスロットを使い回す
+    assert rakuten_browser_profile._held_slots == set()
+    assert sorted(os.listdir(tmp_path / "profiles")) == ["profile-0", "profile-0.lock"]
@@ -0,0 +1,77 @@
+import rakuten_item_details
+import rakuten_pooled_browser
+from rakuten_html_parser import completed
+from rakuten_item_details import RakutenItemDetails
+
+
+class FakeDriver:
+    page_source = "<html></html>"
+
+
+class FakeBrowser:
+    """
+    最後に読み込んだURLだけを覚えているブラウザ
+    """
+
+    def __init__(self):
+        self.loaded_url = None
+        self.driver = FakeDriver()
+        self.page_budget = None
+        self.history = []
+
+
+class FakeSnapshot:
+    title = "テスト商品"
+
+
+class FakeSnapshots:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def get_html(self, url):
+        return None, None
+
+    def get_or_load(self, browser, url, ready=None, live=False):
+        browser.loaded_url = url
+        browser.history.append(url)
+        return FakeSnapshot()
+
+    def clear(self):
+        pass
+
+
+class FakePool:
+    def checkin(self, browser):
+        pass
+
+
+def test_live_dom_fallback_runs_for_every_item_before_navigating(monkeypatch):
+    scraper = RakutenItemDetails(None)
+    browser = FakeBrowser()
+    scraper.browser = browser
+    scraper.driver_pool = FakePool()
+    scraper.snapshots = FakeSnapshots(browser)
+    scraper.fetch_item_info = lambda item_id, debug=False: {
+        'itemId': item_id, 'itemUrl': f"https://item.rakuten.co.jp/shop/{item_id}/"
+    }
+    # HTTPではレビューが取得できず、描画後のHTMLの解析でも見つからない
+    monkeypatch.setattr(scraper.fetcher, "fetch_item_page", lambda url, page=None, **selectors: ({}, ['review']))
+    monkeypatch.setattr(rakuten_item_details, "wait_until", lambda *args, **kwargs: True)
+    monkeypatch.setattr(rakuten_item_details, "submit_parse", lambda func, *args, **kwargs: completed({}))
+
+    filled = []
+
+    def fake_fill_missing_fields(driver, page_data, **selectors):
+        filled.append(browser.loaded_url)
+        return {'review': {'selector': 'span.revRating', 'text': f"4.5点 ({len(filled)}件)"}}
+
+    monkeypatch.setattr(rakuten_pooled_browser, "fill_missing_fields", fake_fill_missing_fields)
+
+    df = scraper.get_items_details(["a", "b", "c"])
+
+    urls = [f"https://item.rakuten.co.jp/shop/{item_id}/" for item_id in "abc"]
+    assert browser.history == urls
+    # 各商品のページを表示している間に要素から補う
+    assert filled == urls
+    assert df['reviewCount'].tolist() == [1, 2, 3]
+    assert df['rating'].tolist() == [4.5, 4.5, 4.5]
@@ -0,0 +1,50 @@
+import pytest
+
+from rakuten_item_info import RakutenItemInfo
+
+ITEM_URL = "https://item.rakuten.co.jp/shop/item-a/"
+
+
+class FakeItemInfo(RakutenItemInfo):
+    """
+    API・商品ページ・レビューページを読み込まずにanalyze_itemを実行するRakutenItemInfo
+    """
+
+    def __init__(self, api_items, js_data):
+        super().__init__(None)
+        self.api_items = api_items
+        self.js_data = js_data
+
+    def get_item_by_code(self, shop_code, item_code):
+        return self.api_items.get(f"{shop_code}:{item_code}")
+
+    def get_item_by_id(self, item_id):
+        return next(iter(self.api_items.values()), None)
+
+    def extract_js_data_from_url(self, url):
+        return self.js_data
+
+    def load_additional_info(self, item_url, background=True):
+        return {'url': item_url}
+
+    def build_additional_info(self, pending):
+        return {'js_itemid': self.js_data['itemid']} if self.js_data else {}
+
+    def get_reviews_from_page(self, item_url, *args, **kwargs):
+        return {"review_count": 0, "reviews": []}
+
+
+@pytest.mark.parametrize("api_items", [
+    # URLから解決できる場合
+    {"shop:item-a": {"itemCode": "shop:item-a", "itemName": "商品A"}},
+    # 解決できずにブラウザのitemidから検索する場合
+    {"other:code": {"itemCode": "shop:item-a", "itemName": "商品A"}},
+])
+def test_item_id_is_numeric_on_both_paths(cache_dir, api_items):
+    scraper = FakeItemInfo(api_items, {"itemid": "10000123", "shopid": "456"})
+
+    result = scraper.analyze_item(ITEM_URL)
+
+    assert result["itemId"] == "10000123"
+    assert result["itemCode"] == "shop:item-a"
+    assert result["api_itemName"] == "商品A"
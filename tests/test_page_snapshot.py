@@ -0,0 +1,28 @@
+from rakuten_page_snapshot import snapshot_from_html, TIER_HTTP
+
+
+def test_review_link_prefers_review_host():
+    html = (
+        '<a href="https://item.rakuten.co.jp/shop/other/">みんなのレビュー</a>'
+        '<a href="//review.rakuten.co.jp/item/1/shop_item/1.1/?a=1&amp;b=2">もっと見る</a>'
+    )
+    snapshot = snapshot_from_html("https://item.rakuten.co.jp/shop/item/", html)
+
+    assert snapshot.review_url == "https://review.rakuten.co.jp/item/1/shop_item/1.1/?a=1&b=2"
+    assert snapshot.tier == TIER_HTTP
+
+
+def test_review_link_falls_back_to_link_text():
+    html = (
+        '<a href="https://item.rakuten.co.jp/shop/">ショップトップ</a>'
+        '<a class="link" href="https://item.rakuten.co.jp/shop/reviews/"><span>レビュー(12件)</span></a>'
+    )
+    snapshot = snapshot_from_html("https://item.rakuten.co.jp/shop/item/", html)
+
+    assert snapshot.review_url == "https://item.rakuten.co.jp/shop/reviews/"
+
+
+def test_no_review_link():
+    snapshot = snapshot_from_html("https://item.rakuten.co.jp/shop/item/", '<a href="/top">トップ</a>')
+
+    assert snapshot.review_url is None
@@ -0,0 +1,96 @@
+import pytest
+
+import rakuten_api_client
+import rakuten_rate_limiter
+from rakuten_api_client import RakutenApiClient
+from rakuten_rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rakuten_rate_limiter, "time", clock)
+    monkeypatch.setattr(rakuten_api_client, "time", clock)
+
+
+def test_burst_then_wait_for_refill(clock):
+    bucket = TokenBucket("example.com", rate=2.0, capacity=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket("example.com", rate=1.0, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.advance(60)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+@pytest.mark.skipif(rakuten_rate_limiter.fcntl is None, reason="fcntlが使えない環境")
+def test_shared_state_is_shared_between_buckets(tmp_path, clock):
+    # 別プロセスのバケットと同じく、状態ファイルを通して予算を共有する
+    first = TokenBucket("example.com", rate=1.0, capacity=1, state_dir=str(tmp_path))
+    second = TokenBucket("example.com", rate=1.0, capacity=1, state_dir=str(tmp_path))
+
+    assert first.acquire() == 0
+    assert second.acquire() == pytest.approx(1.0)
+    assert (tmp_path / "example.com.bucket").exists()
+
+
+def test_rate_limiter_uses_host_budget():
+    limiter = RateLimiter(budgets={"app.rakuten.co.jp": (1.0, 1)}, default_budget=(5.0, 3))
+
+    assert limiter.get_bucket("app.rakuten.co.jp").capacity == 1
+    assert limiter.get_bucket("other.example.com").capacity == 3
+    assert limiter.get_bucket("app.rakuten.co.jp") is limiter.get_bucket("app.rakuten.co.jp")
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.urls = []
+
+    def acquire(self, url, tokens=1):
+        self.urls.append(url)
+        return 0.0
+
+
+def make_client(responses, max_retries=2):
+    limiter = RecordingLimiter()
+    client = RakutenApiClient(rate_limiter=limiter, max_retries=max_retries)
+    responses = iter(responses)
+    client.session.get = lambda url, **kwargs: next(responses)
+    return client, limiter
+
+
+def test_429_is_retried_through_the_rate_limiter(clock):
+    client, limiter = make_client([FakeResponse(429), FakeResponse(429, {"Retry-After": "3"}), FakeResponse(200)])
+
+    response = client.get("https://app.rakuten.co.jp/api")
+
+    assert response.status_code == 200
+    assert len(limiter.urls) == 3
+    assert clock.sleeps == [1.0, 3.0]
+
+
+def test_429_is_returned_after_max_retries(clock):
+    client, limiter = make_client([FakeResponse(429)] * 3, max_retries=1)
+
+    response = client.get("https://app.rakuten.co.jp/api")
+
+    assert response.status_code == 429
+    assert len(limiter.urls) == 2
@@ -0,0 +1,67 @@
+import pytest
+
+import rakuten_response_cache
+from rakuten_response_cache import ResponseCache, make_cache_key
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rakuten_response_cache, "time", clock)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "responses.sqlite3"), ttl=60, max_entries=3)
+
+
+def test_key_ignores_credentials_and_param_order():
+    first = make_cache_key("https://example.com", {"keyword": "a", "page": 1, "applicationId": "x"})
+    second = make_cache_key("https://example.com", {"page": 1, "keyword": "a", "applicationId": "y"})
+
+    assert first == second
+    assert first != make_cache_key("https://example.com", {"keyword": "a", "page": 2})
+
+
+def test_hit_before_ttl_and_miss_after(cache, clock):
+    cache.set("https://example.com", {"q": 1}, {"Items": [1]})
+
+    clock.advance(59)
+    assert cache.get("https://example.com", {"q": 1}) == {"Items": [1]}
+
+    clock.advance(2)
+    assert cache.get("https://example.com", {"q": 1}) is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_access_does_not_extend_ttl(cache, clock):
+    cache.set("https://example.com", {"q": 1}, {"a": 1})
+    clock.advance(40)
+    assert cache.get("https://example.com", {"q": 1}) is not None
+
+    clock.advance(40)
+    assert cache.get("https://example.com", {"q": 1}) is None
+
+
+def test_evicts_least_recently_accessed(cache, clock):
+    for q in range(3):
+        cache.set("https://example.com", {"q": q}, {"q": q})
+        clock.advance(1)
+
+    # q=0 を参照して最近使ったことにする
+    assert cache.get("https://example.com", {"q": 0}) == {"q": 0}
+    clock.advance(1)
+    cache.set("https://example.com", {"q": 3}, {"q": 3})
+
+    assert cache.get("https://example.com", {"q": 1}) is None
+    assert cache.get("https://example.com", {"q": 0}) == {"q": 0}
+    assert cache.get("https://example.com", {"q": 2}) == {"q": 2}
+    assert cache.stats()["entries"] == 3
+
+
+def test_set_removes_expired_entries(cache, clock):
+    cache.set("https://example.com", {"q": 1}, {"q": 1})
+    clock.advance(61)
+    cache.set("https://example.com", {"q": 2}, {"q": 2})
+
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from rakuten_review_crawler import ReviewCrawler, review_page_url
+
+BASE_URL = "https://review.rakuten.co.jp/item/1/456_123/1.1/"
+PAGE_SIZE = 15
+
+
+class FakeReviewSite:
+    """
+    ページ番号ごとにレビューを返すレビューページ（load_page / fetch_page の呼び出しを記録する）
+    """
+
+    def __init__(self, page_count, http_failures=(), loop_back_after=None):
+        self.page_count = page_count
+        self.http_failures = set(http_failures)
+        self.loop_back_after = loop_back_after
+        self.loaded = []
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def page(self, url, limit):
+        number = int(url.rstrip("/").rsplit("/", 1)[1].split(".")[0])
+        if number > self.page_count:
+            return {"reviews": [], "next_url": None}
+        if self.loop_back_after is not None and number > self.loop_back_after:
+            number = 1
+        reviews = [
+            {"rating": 5, "title": f"{number}-{i}", "comment": f"ページ{number}のレビュー{i}", "date": "2024/01/01"}
+            for i in range(PAGE_SIZE)
+        ][:limit]
+        next_url = review_page_url(url, number + 1) if number < self.page_count else None
+        return {"reviews": reviews, "next_url": next_url}
+
+    def load_page(self, url, limit):
+        self.loaded.append(url)
+        return self.page(url, limit)
+
+    def fetch_page(self, url, limit):
+        with self.lock:
+            self.fetched.append(url)
+        if url in self.http_failures:
+            return None
+        return self.page(url, limit)
+
+
+def url_of(number):
+    return review_page_url(BASE_URL, number)
+
+
+def test_pages_are_returned_in_order():
+    site = FakeReviewSite(6)
+    crawler = ReviewCrawler(site.load_page, site.fetch_page, workers=3)
+
+    pages = list(crawler.crawl(BASE_URL))
+
+    assert [page["page"] for page in pages] == [1, 2, 3, 4, 5, 6]
+    assert [page["url"] for page in pages] == [url_of(n) for n in range(1, 7)]
+    assert [page["reviews"][0]["title"] for page in pages] == [f"{n}-0" for n in range(1, 7)]
+    assert site.loaded == [BASE_URL]
+    assert crawler.review_count == 6 * PAGE_SIZE
+
+
+def test_prefetch_is_bounded_by_remaining_reviews():
+    site = FakeReviewSite(10)
+    crawler = ReviewCrawler(site.load_page, site.fetch_page, max_reviews=20, workers=4)
+
+    pages = list(crawler.crawl(BASE_URL))
+
+    assert [len(page["reviews"]) for page in pages] == [15, 5]
+    assert site.loaded == [BASE_URL]
+    assert site.fetched == [url_of(2)]
+
+
+def test_stop_ends_the_crawl():
+    site = FakeReviewSite(10)
+    crawler = ReviewCrawler(site.load_page, site.fetch_page, workers=2)
+
+    pages = []
+    for page in crawler.crawl(BASE_URL):
+        pages.append(page)
+        crawler.stop()
+
+    assert [page["page"] for page in pages] == [1]
+
+
+def test_closing_the_crawl_does_not_wait_for_prefetch():
+    site = FakeReviewSite(10)
+    release = threading.Event()
+
+    def blocking_fetch(url, limit):
+        release.wait(5)
+        return site.fetch_page(url, limit)
+
+    crawler = ReviewCrawler(site.load_page, blocking_fetch, workers=2)
+    pages = crawler.crawl(BASE_URL)
+    assert next(pages)["page"] == 1
+
+    # 先読み中のページがあっても待たずに終了する
+    start = time.monotonic()
+    pages.close()
+    assert time.monotonic() - start < 1
+    release.set()
+
+
+def test_http_failure_falls_back_to_load_page():
+    site = FakeReviewSite(5, http_failures={url_of(3)})
+    crawler = ReviewCrawler(site.load_page, site.fetch_page, workers=2)
+
+    pages = list(crawler.crawl(BASE_URL))
+
+    assert [page["page"] for page in pages] == [1, 2, 3, 4, 5]
+    assert [page["url"] for page in pages] == [url_of(n) for n in range(1, 6)]
+    # 失敗したページから後は先読みせずに通常の読み込みで取得する
+    assert site.loaded == [BASE_URL, url_of(3), url_of(4), url_of(5)]
+
+
+def test_loop_back_to_first_page_ends_the_crawl():
+    site = FakeReviewSite(5, loop_back_after=3)
+    crawler = ReviewCrawler(site.load_page, workers=1)
+
+    pages = list(crawler.crawl(BASE_URL))
+
+    assert [page["page"] for page in pages] == [1, 2, 3]
@@ -0,0 +1,131 @@
+import os
+
+import pandas as pd
+import pytest
+
+import rakuten_review_index
+from rakuten_review_index import INDEX_VERSION, ReviewIndex, get_review_index
+
+
+def write_reviews(path, rows, keyword="シャンプー"):
+    pd.DataFrame([
+        {
+            "keyword": keyword,
+            "item_name": "テスト商品",
+            "shop_name": "テストショップ",
+            "review_rating": rating,
+            "review_title": title,
+            "review_comment": comment,
+            "review_date": "2024/01/01"
+        }
+        for rating, title, comment in rows
+    ]).to_csv(path, index=False, encoding="utf-8-sig")
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    directory = tmp_path / "output"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def index(cache_dir):
+    index = ReviewIndex(os.path.join(cache_dir, "review_index.sqlite3"))
+    yield index
+    index.conn.close()
+
+
+def posting_count(index):
+    return index.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+def test_update_indexes_new_files_once(index, output_dir):
+    write_reviews(output_dir / "rakuten_a_reviews_1.csv", [(5, "最高", "香りがとても良い"), (2, "残念", "泡立ちが悪い")])
+
+    assert index.update(str(output_dir)) == {"added": 1, "removed": 0, "reviews": 2}
+    assert index.update(str(output_dir)) == {"added": 0, "removed": 0, "reviews": 0}
+    assert index.stats() == {"files": 1, "reviews": 2}
+
+
+def test_search_requires_every_term(index, output_dir):
+    write_reviews(output_dir / "rakuten_a_reviews_1.csv", [(5, "最高", "香りがとても良い"), (4, "良い", "香りは普通")])
+    index.update(str(output_dir))
+
+    assert [review["title"] for review in index.search("香り")] == ["良い", "最高"]
+    assert [review["title"] for review in index.search("香り とても")] == ["最高"]
+    assert index.search("泡立ち") == []
+    assert index.search("  ") == []
+
+
+def test_single_character_terms_use_the_index(index, output_dir):
+    write_reviews(output_dir / "rakuten_a_reviews_1.csv", [(5, "最高", "香りが良い"), (3, "普通", "泡が多い")])
+    index.update(str(output_dir))
+
+    assert [review["title"] for review in index.search("泡")] == ["普通"]
+    assert [review["title"] for review in index.search("良 香り")] == ["最高"]
+    assert index.search("x") == []
+
+
+def test_search_filters_by_keyword_and_limit(index, output_dir):
+    write_reviews(output_dir / "rakuten_a_reviews_1.csv", [(5, "a", "香りが良い")] * 3, keyword="シャンプー")
+    write_reviews(output_dir / "rakuten_b_reviews_1.csv", [(5, "b", "香りが良い")], keyword="リンス")
+    index.update(str(output_dir))
+
+    assert [review["keyword"] for review in index.search("香り", keyword="リンス")] == ["リンス"]
+    assert len(index.search("香り", limit=2)) == 2
+
+
+def test_changed_file_is_reindexed(index, output_dir):
+    path = output_dir / "rakuten_a_reviews_1.csv"
+    write_reviews(path, [(5, "最高", "香りが良い")])
+    index.update(str(output_dir))
+
+    write_reviews(path, [(1, "最悪", "泡立ちが悪い"), (2, "残念", "泡が少ない")])
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert index.update(str(output_dir)) == {"added": 1, "removed": 0, "reviews": 2}
+    assert index.search("香り") == []
+    assert [review["title"] for review in index.search("泡")] == ["残念", "最悪"]
+    assert index.stats() == {"files": 1, "reviews": 2}
+
+
+def test_removed_file_leaves_the_index(index, output_dir):
+    path = output_dir / "rakuten_a_reviews_1.csv"
+    write_reviews(path, [(5, "最高", "香りが良い")])
+    index.update(str(output_dir))
+    assert posting_count(index) > 0
+
+    os.remove(path)
+
+    assert index.update(str(output_dir)) == {"added": 0, "removed": 1, "reviews": 0}
+    assert index.search("香り") == []
+    assert index.stats() == {"files": 0, "reviews": 0}
+    assert posting_count(index) == 0
+
+
+def test_old_index_format_is_rebuilt(cache_dir, output_dir):
+    path = os.path.join(cache_dir, "review_index.sqlite3")
+    write_reviews(output_dir / "rakuten_a_reviews_1.csv", [(5, "最高", "泡が多い")])
+    index = ReviewIndex(path)
+    index.update(str(output_dir))
+    index.conn.execute(f"PRAGMA user_version = {INDEX_VERSION - 1}")
+    index.conn.commit()
+    index.conn.close()
+
+    index = ReviewIndex(path)
+    assert index.stats() == {"files": 0, "reviews": 0}
+    assert index.update(str(output_dir))["added"] == 1
+    assert [review["title"] for review in index.search("泡")] == ["最高"]
+    index.conn.close()
+
+
+def test_shared_index_uses_cache_dir(cache_dir, monkeypatch):
+    monkeypatch.setattr(rakuten_review_index, "_shared_index", None)
+
+    index = get_review_index()
+
+    assert index.path == os.path.join(str(cache_dir), "review_index.sqlite3")
+    assert get_review_index() is index
+    index.conn.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from rakuten_html_parser import HTML_PARSER_BACKEND, _parse, _select, _select_first
+from rakuten_page_ready import REVIEW_LIST_SELECTOR
+from rakuten_review_parser import FIXTURE_PATH, parse_review_html
+
+pytestmark = pytest.mark.skipif(HTML_PARSER_BACKEND is None, reason="selectolaxまたはlxmlが必要")
+
+PAGE_URL = "https://review.rakuten.co.jp/item/1/123456_10000001/1.1/"
+
+
+@pytest.fixture
+def fixture_html():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fixture_page_parses_to_thirty_reviews(fixture_html):
+    page = parse_review_html(fixture_html, PAGE_URL, 100)
+
+    assert len(page["reviews"]) == 30
+    assert page["reviews"][0] == {
+        "rating": 4.0,
+        "title": "リピート決定",
+        "comment": "香りがとても良く、髪がしっとりまとまります。リピートしています。\n"
+                   "期待していたほどではありませんでした。香りが少し強めです。",
+        "date": "2024/03/22"
+    }
+    for review in page["reviews"]:
+        assert set(review) == {"rating", "title", "comment", "date"}
+        assert isinstance(review["rating"], float)
+        assert review["title"] and review["comment"] and review["date"]
+    assert page["next_url"] == "https://review.rakuten.co.jp/item/1/123456_10000001/2.1/"
+
+
+def test_limit_caps_the_reviews(fixture_html):
+    page = parse_review_html(fixture_html, PAGE_URL, 5)
+
+    assert page["reviews"] == parse_review_html(fixture_html, PAGE_URL, 100)["reviews"][:5]
+
+
+def test_last_page_has_no_next_url():
+    html = "<html><body><div><a href='/item/1/123456_10000001/1.1/'>1</a></div></body></html>"
+
+    assert parse_review_html(html, PAGE_URL, 100) == {"reviews": [], "next_url": None}
+
+
+@pytest.mark.parametrize("selector", [REVIEW_LIST_SELECTOR, "a", "a[href*='page=2'], nav a", "div span", "table"])
+def test_select_first_matches_the_first_selected_node(fixture_html, selector):
+    root = _parse(fixture_html)
+    nodes = _select(root, selector)
+
+    first = _select_first(root, selector)
+
+    if nodes:
+        assert first is nodes[0]
+    else:
+        assert first is None
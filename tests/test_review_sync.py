@@ -0,0 +1,142 @@
+import pytest
+
+from rakuten_review_crawler import review_page_url
+from rakuten_review_scraper import ReviewScraperMixin
+from rakuten_review_sync import ReviewSyncState, new_reviews, review_fingerprint
+
+ITEM_URL = "https://item.rakuten.co.jp/shop/item/"
+ITEM_CODE = "shop:item"
+REVIEW_URL = "https://review.rakuten.co.jp/item/1/456_123/1.1/"
+PAGE_SIZE = 3
+
+
+def review(number, date):
+    return {"rating": 5, "title": f"レビュー{number}", "comment": f"本文{number}", "date": date}
+
+
+class FakeReviewSite:
+    """
+    新しい順のレビューを1ページ PAGE_SIZE 件ずつ返すレビューページ
+    """
+
+    def __init__(self, reviews, failures=()):
+        self.reviews = reviews
+        self.failures = set(failures)
+        self.requested = []
+
+    def load_page(self, url, limit):
+        self.requested.append(url)
+        number = int(url.rstrip("/").rsplit("/", 1)[1].split(".")[0])
+        if number in self.failures:
+            return None
+        start = (number - 1) * PAGE_SIZE
+        reviews = self.reviews[start:start + PAGE_SIZE]
+        next_url = review_page_url(url, number + 1) if start + PAGE_SIZE < len(self.reviews) else None
+        return {"reviews": reviews[:limit], "next_url": next_url}
+
+
+class FakeFetcher:
+    def __init__(self, site):
+        self.fetch_reviews = site.load_page
+
+
+class FakeLocator:
+    def __init__(self, review_url):
+        self.review_url = review_url
+
+    def locate(self, item_url, item_code=None, resolve=None):
+        return self.review_url
+
+
+class FakeReviewScraper(ReviewScraperMixin):
+    def __init__(self, site, sync, review_url=REVIEW_URL):
+        self.site = site
+        self.fetcher = FakeFetcher(site)
+        self.review_locator = FakeLocator(review_url)
+        self.review_sync = sync
+        self.incremental_reviews = True
+
+    def _load_review_page(self, url, limit):
+        return self.site.load_page(url, limit)
+
+
+@pytest.fixture
+def sync(tmp_path):
+    return ReviewSyncState(str(tmp_path / "review_sync.sqlite3"))
+
+
+def pages_of(reviews):
+    return iter([{"page": 1, "url": REVIEW_URL, "reviews": reviews}])
+
+
+def test_same_day_reviews_are_new_until_a_known_one():
+    known = review(1, "2024/01/05")
+    mark = {"latest_date": "2024-01-05", "fingerprints": [review_fingerprint(known)]}
+    same_day = review(2, "2024/01/05")
+
+    found, caught_up = new_reviews(pages_of([same_day, known, review(0, "2024/01/04")]), mark)
+
+    assert found == [same_day]
+    assert caught_up
+
+
+def test_older_date_ends_the_walk():
+    mark = {"latest_date": "2024-01-05", "fingerprints": []}
+    same_day = review(2, "2024/01/05")
+
+    found, caught_up = new_reviews(pages_of([same_day, review(1, "2024/01/04")]), mark)
+
+    assert found == [same_day]
+    assert caught_up
+
+
+def test_walk_without_known_review_is_not_caught_up():
+    found, caught_up = new_reviews(pages_of([review(1, "2024/01/05")]), None)
+
+    assert len(found) == 1
+    assert not caught_up
+
+
+def test_incremental_fetch_reads_all_new_reviews_and_updates_mark(sync):
+    reviews = [review(n, f"2024/01/{n:02d}") for n in range(10, 0, -1)]
+    scraper = FakeReviewScraper(FakeReviewSite(reviews), sync)
+
+    # 初回は件数の上限なしで最終ページまで辿る
+    result = scraper.get_reviews_from_page(ITEM_URL, max_reviews=2, item_code=ITEM_CODE)
+    assert result["reviews"] == reviews
+    assert scraper.site.requested[0] == review_page_url(REVIEW_URL, 1, 6)
+    assert sync.get_mark(ITEM_CODE)["latest_date"] == "2024-01-10"
+
+    # 次回は新しいレビューだけを取得する
+    newer = [review(12, "2024/01/12"), review(11, "2024/01/11")]
+    scraper.site.reviews = newer + reviews
+    result = scraper.get_reviews_from_page(ITEM_URL, item_code=ITEM_CODE)
+    assert result["reviews"] == newer
+    assert sync.get_mark(ITEM_CODE)["latest_date"] == "2024-01-12"
+
+
+def test_truncated_walk_does_not_advance_mark(sync):
+    reviews = [review(n, f"2024/01/{n:02d}") for n in range(10, 0, -1)]
+    scraper = FakeReviewScraper(FakeReviewSite(reviews, failures={3}), sync)
+
+    result = scraper.get_reviews_from_page(ITEM_URL, item_code=ITEM_CODE)
+    assert result["reviews"] == reviews[:6]
+    assert sync.get_mark(ITEM_CODE) is None
+
+    # 取得できるようになれば、前回取得できなかったレビューも取得する
+    scraper.site.failures.clear()
+    result = scraper.get_reviews_from_page(ITEM_URL, item_code=ITEM_CODE)
+    assert result["reviews"] == reviews
+    assert sync.get_mark(ITEM_CODE)["latest_date"] == "2024-01-10"
+
+
+def test_unsorted_review_url_falls_back_to_full_fetch(sync):
+    reviews = [review(n, f"2024/01/{n:02d}") for n in range(10, 0, -1)]
+    site = FakeReviewSite(reviews)
+    site.load_page = lambda url, limit: {"reviews": reviews[:limit], "next_url": None}
+    scraper = FakeReviewScraper(site, sync, review_url=ITEM_URL)
+
+    result = scraper.get_reviews_from_page(ITEM_URL, max_reviews=4, item_code=ITEM_CODE)
+
+    assert result["reviews"] == reviews[:4]
+    assert sync.get_mark(ITEM_CODE) is None
@@ -0,0 +1,206 @@
+import json
+
+import rakuten_tab_loader
+from rakuten_init import RakutenInit
+from rakuten_page_ready import document_ready, element_present
+from rakuten_page_snapshot import SnapshotCache
+from rakuten_tab_loader import CdpTab, TabLoader, TAB_READY_SCRIPT
+
+URLS = [f"https://item.rakuten.co.jp/shop/item-{name}/" for name in "abc"]
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        assert handle in self.driver.windows
+        self.driver.current_window_handle = handle
+        self.driver.switched.append((handle, self.driver.windows[handle]['polls']))
+
+
+class FakeChromeDriver:
+    """
+    タブごとのページを保持するChrome（CDPでのタブ作成・削除と、ウィンドウの切り替えだけを扱う）
+    """
+
+    capabilities = {'goog:chromeOptions': {'debuggerAddress': "localhost:9222"}}
+
+    def __init__(self):
+        self.windows = {"MAIN": {'url': "about:blank", 'polls': 0}}
+        self.current_window_handle = "MAIN"
+        self.switch_to = FakeSwitchTo(self)
+        self.switched = []
+        self.navigated = []
+        self.cdp = []
+        self.next_id = 0
+
+    @property
+    def window_handles(self):
+        return list(self.windows)
+
+    @property
+    def page_source(self):
+        return f"<html><title>{self.windows[self.current_window_handle]['url']}</title></html>"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append(cmd)
+        if cmd == "Target.createTarget":
+            self.next_id += 1
+            target_id = f"TARGET{self.next_id}"
+            self.windows[target_id] = {'url': params['url'], 'polls': 0}
+            return {'targetId': target_id}
+        if cmd == "Target.closeTarget":
+            del self.windows[params['targetId']]
+        return {}
+
+    def execute_script(self, script, *args):
+        return 1 if script == "return 1" else {}
+
+    def get(self, url):
+        self.navigated.append(url)
+        self.windows[self.current_window_handle]['url'] = url
+
+    def close(self):
+        del self.windows[self.current_window_handle]
+
+
+class FakeTab:
+    """
+    CDPで接続したタブ（TAB_READY_SCRIPTが指定回数目で読み込み完了になる）
+    """
+
+    ready_after = 3
+
+    def __init__(self, driver, target_id):
+        self.driver = driver
+        self.target_id = target_id
+        self.window = driver.windows[target_id]
+        self.scripts = []
+        self.closed = False
+
+    def send(self, method, params=None, wait=True):
+        if method == "Page.navigate":
+            assert wait is False
+            self.window['url'] = params['url']
+        return {}
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        self.window['polls'] += 1
+        if script == TAB_READY_SCRIPT:
+            return self.window['polls'] >= self.ready_after
+        if script == "return document.readyState":
+            return "complete"
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, url):
+        self.acquired.append(url)
+
+
+def make_browser(monkeypatch, tabs=2):
+    browser = RakutenInit(None)
+    browser.driver = FakeChromeDriver()
+    browser.rate_limiter = FakeLimiter()
+    browser.tab_loader = TabLoader(browser, tabs)
+    opened = []
+
+    def open_tab(target_id, websocket_url):
+        assert websocket_url == f"ws://localhost:9222/devtools/page/{target_id}"
+        opened.append(FakeTab(browser.driver, target_id))
+        return opened[-1]
+
+    monkeypatch.setattr(rakuten_tab_loader, "CdpTab", open_tab)
+    monkeypatch.setattr(rakuten_tab_loader.time, "sleep", lambda seconds: None)
+    return browser, opened
+
+
+def test_prefetched_tab_becomes_the_current_page_without_reloading(monkeypatch):
+    browser, opened = make_browser(monkeypatch)
+    driver = browser.driver
+    snapshots = SnapshotCache()
+
+    browser.prefetch_pages(URLS)
+    assert [tab.window['url'] for tab in opened] == URLS[:2]
+    assert browser.rate_limiter.acquired == URLS[:2]
+
+    snapshot = snapshots.get_or_load(browser, URLS[0], ready=element_present("h1"), live=True)
+
+    # メインのタブでは読み込まず、読み込み済みのタブが表示中のページになる
+    assert driver.navigated == []
+    assert driver.current_window_handle == "TARGET1"
+    assert driver.window_handles == ["TARGET1", "TARGET2"]
+    assert browser.loaded_url == URLS[0]
+    assert browser.pages_loaded == 1
+    assert snapshot.page_source == driver.page_source
+    assert URLS[0] in snapshot.page_source
+    assert opened[0].closed
+    # 読み込み完了条件はCDPでタブに問い合わせて判定し、満たしてから切り替える
+    assert (TAB_READY_SCRIPT, ()) in opened[0].scripts
+    assert any(args == (["h1"],) for script, args in opened[0].scripts)
+    assert driver.switched[-1] == ("TARGET1", opened[0].window['polls'])
+    assert opened[0].window['polls'] > FakeTab.ready_after
+
+
+def test_stale_tabs_are_closed_and_unprefetched_pages_load_normally(monkeypatch):
+    browser, opened = make_browser(monkeypatch)
+    driver = browser.driver
+
+    browser.prefetch_pages(URLS[:2])
+    browser.prefetch_pages(URLS[2:])
+
+    # もう処理しないページのタブは閉じる
+    assert [tab.target_id for tab in opened] == ["TARGET1", "TARGET2", "TARGET3"]
+    assert opened[0].closed and opened[1].closed
+    assert driver.window_handles == ["MAIN", "TARGET3"]
+
+    browser.load_page(URLS[0], ready=document_ready)
+
+    assert driver.navigated == [URLS[0]]
+    assert driver.current_window_handle == "MAIN"
+    assert browser.rate_limiter.acquired == URLS + [URLS[0]]
+
+    browser.close_tabs()
+    assert driver.window_handles == ["MAIN"]
+
+
+def test_cdp_tab_evaluates_scripts_with_arguments(monkeypatch):
+    class FakeWebSocket:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, message):
+            self.sent.append(json.loads(message))
+
+        def recv(self):
+            message = self.sent[-1]
+            # 応答の前に届くイベントは読み捨てる
+            if not getattr(self, 'event_sent', False):
+                self.event_sent = True
+                return json.dumps({"method": "Page.frameNavigated", "params": {}})
+            return json.dumps({"id": message["id"], "result": {"result": {"type": "boolean", "value": True}}})
+
+    class FakeWebSocketModule:
+        def create_connection(self, url, timeout=None, suppress_origin=False):
+            assert suppress_origin
+            self.ws = FakeWebSocket()
+            return self.ws
+
+    module = FakeWebSocketModule()
+    monkeypatch.setattr(rakuten_tab_loader, "websocket", module)
+
+    tab = CdpTab("TARGET1", "ws://localhost:9222/devtools/page/TARGET1")
+    assert element_present("h1", "#item")(tab) is True
+
+    message = module.ws.sent[-1]
+    assert message["method"] == "Runtime.evaluate"
+    assert message["params"]["returnByValue"] is True
+    assert message["params"]["expression"].endswith('.apply(null, [["h1", "#item"]])')
@@ -0,0 +1,99 @@
+import pytest
+
+from rakuten_html_parser import HTML_PARSER_BACKEND
+from rakuten_page_snapshot import SnapshotCache, TIER_HTTP
+from rakuten_tiered_fetcher import TieredFetcher
+
+ITEM_URL = "https://item.rakuten.co.jp/shop/item/"
+
+ITEM_HTML = """
+<html><head><title>テスト商品</title>
+<script>var grp15_ias_prm = {"itemid": "123", "shopid": "456"};</script>
+</head><body>
+<span class="revRating">4.5点 (10件)</span>
+<a href="https://review.rakuten.co.jp/item/1/456_123/1.1/">レビュー</a>
+</body></html>
+"""
+
+
+class CountingFetcher(TieredFetcher):
+    def __init__(self, pages):
+        super().__init__(api_client=object(), enabled=True)
+        self.pages = pages
+        self.requested = []
+
+    def fetch_html(self, url):
+        self.requested.append(url)
+        html = self.pages.get(url)
+        return (html, url) if html is not None else (None, None)
+
+
+def test_snapshot_and_item_fields_share_one_http_fetch():
+    fetcher = CountingFetcher({ITEM_URL: ITEM_HTML})
+    snapshots = SnapshotCache(fetcher=fetcher)
+
+    snapshot = snapshots.get_or_fetch(ITEM_URL)
+    assert snapshot.tier == TIER_HTTP
+    assert snapshot.js_data == {"itemid": "123", "shopid": "456"}
+
+    if HTML_PARSER_BACKEND is not None:
+        page_data, missing = fetcher.fetch_item_page(
+            ITEM_URL, page=snapshots.get_html(ITEM_URL), review_selectors=["span.revRating"]
+        )
+        assert page_data["review"]["text"] == "4.5点 (10件)"
+        assert missing == []
+
+    assert fetcher.requested == [ITEM_URL]
+
+
+def test_failed_fetch_is_not_repeated():
+    fetcher = CountingFetcher({})
+    snapshots = SnapshotCache(fetcher=fetcher)
+
+    assert snapshots.get_or_fetch(ITEM_URL) is None
+    assert snapshots.get_html(ITEM_URL) == (None, None)
+    assert fetcher.requested == [ITEM_URL]
+
+
+def test_page_without_js_data_needs_the_browser():
+    fetcher = CountingFetcher({ITEM_URL: "<html><title>x</title></html>"})
+    snapshots = SnapshotCache(fetcher=fetcher)
+
+    assert snapshots.get_or_fetch(ITEM_URL) is None
+    assert snapshots.get_html(ITEM_URL)[0] == "<html><title>x</title></html>"
+    assert fetcher.requested == [ITEM_URL]
+
+
+def test_cached_pages_are_bounded_and_cleared():
+    pages = {f"{ITEM_URL}{i}": ITEM_HTML for i in range(5)}
+    fetcher = CountingFetcher(pages)
+    snapshots = SnapshotCache(max_entries=2, fetcher=fetcher)
+
+    for url in pages:
+        snapshots.get_html(url)
+    assert len(snapshots.pages) == 2
+
+    snapshots.clear()
+    assert len(snapshots.pages) == 0
+
+
+def test_record_keeps_only_counts():
+    fetcher = TieredFetcher(api_client=object(), enabled=False)
+    for i in range(100):
+        fetcher.record(f"{ITEM_URL}{i}", "reviews", TIER_HTTP)
+    fetcher.record(ITEM_URL, "reviews", None)
+
+    assert fetcher.stats() == {"reviews:http": 100, "reviews:None": 1}
+
+
+@pytest.mark.skipif(HTML_PARSER_BACKEND is None, reason="selectolaxまたはlxmlが必要")
+def test_item_page_reports_missing_fields():
+    fetcher = CountingFetcher({})
+
+    page_data, missing = fetcher.fetch_item_page(
+        ITEM_URL, page=(ITEM_HTML, ITEM_URL), review_selectors=["span.revRating"], description_selectors=["div.desc"]
+    )
+
+    assert set(page_data) >= {"review", "title"}
+    assert missing == ["description"]
+    assert fetcher.requested == []